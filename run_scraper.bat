@@ -2,9 +2,8 @@
 REM Whop Scraper Full Pipeline Script (Windows)
 REM This script runs the complete scraping pipeline:
 REM 1. Sets up environment and dependencies
-REM 2. Extracts URLs from sitemaps (explore.py)
-REM 3. Scrapes community data (scrape_new.py)
-REM 4. Ranks and analyzes data (rank.py)
+REM 2. Runs "whop_scraper pipeline", which streams sitemap discovery -> scraping ->
+REM    merge/dedup -> ranking in a single unattended process
 
 echo ==========================================
 echo WHOP SCRAPER FULL PIPELINE
@@ -46,29 +45,13 @@ echo ✅ Output directory ready
 
 echo.
 
-REM Step 4: Run explore.py to extract URLs from sitemaps
-echo 🔍 Step 1/3: Running explore.py to extract community URLs...
-echo This will fetch all XML sitemaps and extract product URLs...
-python explore.py
-
-if not exist "output\sample_discovery.txt" (
-    echo ❌ Error: sample_discovery.txt not created by explore.py
-    pause
-    exit /b 1
-)
-
-for /f %%i in ('find /c /v "" ^< output\sample_discovery.txt') do set URL_COUNT=%%i
-echo ✅ Found %URL_COUNT% product sitemap URLs
-
-echo.
-
-REM Step 5: Run scrape_new.py to scrape community data
-echo 🕷️  Step 2/3: Running scrape_new.py to scrape community data...
-echo This will extract community URLs from product sitemaps and scrape each page...
-python scrape_new.py
+REM Step 4: Run the streaming pipeline (discover -^> scrape -^> merge -^> rank)
+echo 🕷️  Running the pipeline: discover, scrape, merge and rank...
+echo Communities are scraped as soon as their sitemap URLs are discovered...
+python -m whop_scraper pipeline %*
 
 if not exist "output\raw_communities.json" (
-    echo ❌ Error: raw_communities.json not created by scrape_new.py
+    echo ❌ Error: raw_communities.json not created by the pipeline
     pause
     exit /b 1
 )
@@ -76,14 +59,8 @@ if not exist "output\raw_communities.json" (
 for /f %%i in ('python -c "import json; data=json.load(open('output/raw_communities.json')); print(len(data))"') do set COMMUNITY_COUNT=%%i
 echo ✅ Scraped %COMMUNITY_COUNT% communities
 
-echo.
-
-REM Step 6: Run rank.py to analyze and rank data
-echo 📊 Step 3/3: Running rank.py to rank and analyze communities...
-python rank.py
-
 if not exist "output\ranked_communities.csv" (
-    echo ❌ Error: ranked_communities.csv not created by rank.py
+    echo ❌ Error: ranked_communities.csv not created by the pipeline
     pause
     exit /b 1
 )
@@ -92,17 +69,15 @@ echo ✅ Rankings generated
 
 echo.
 
-REM Step 7: Summary
+REM Step 5: Summary
 echo ==========================================
 echo 🎉 PIPELINE COMPLETED SUCCESSFULLY!
 echo ==========================================
 echo Completed at: %date% %time%
 echo.
 echo 📋 RESULTS SUMMARY:
-echo    • Product sitemaps processed: %URL_COUNT%
 echo    • Communities scraped: %COMMUNITY_COUNT%
 echo    • Output files created:
-echo      - output\sample_discovery.txt (product sitemap URLs)
 echo      - output\raw_communities.json (scraped community data)
 echo      - output\ranked_communities.csv (top ranked communities)
 echo      - output\all_communities_ranked.json (full ranked data)
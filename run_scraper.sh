@@ -3,9 +3,8 @@
 # Whop Scraper Full Pipeline Script
 # This script runs the complete scraping pipeline:
 # 1. Sets up environment and dependencies
-# 2. Extracts URLs from sitemaps (explore.py)
-# 3. Scrapes community data (scrape_new.py)
-# 4. Ranks and analyzes data (rank.py)
+# 2. Runs "whop_scraper pipeline", which streams sitemap discovery -> scraping ->
+#    merge/dedup -> ranking in a single unattended process
 
 set -e  # Exit on any error
 
@@ -49,42 +48,21 @@ echo "✅ Output directory ready"
 
 echo ""
 
-# Step 4: Run explore.py to extract URLs from sitemaps
-echo "🔍 Step 1/3: Running explore.py to extract community URLs..."
-echo "This will fetch all XML sitemaps and extract product URLs..."
-python explore.py
-
-if [ ! -f "output/sample_discovery.txt" ]; then
-    echo "❌ Error: sample_discovery.txt not created by explore.py"
-    exit 1
-fi
-
-URL_COUNT=$(wc -l < output/sample_discovery.txt)
-echo "✅ Found $URL_COUNT product sitemap URLs"
-
-echo ""
-
-# Step 5: Run scrape_new.py to scrape community data
-echo "🕷️  Step 2/3: Running scrape_new.py to scrape community data..."
-echo "This will extract community URLs from product sitemaps and scrape each page..."
-python scrape_new.py
+# Step 4: Run the streaming pipeline (discover -> scrape -> merge -> rank)
+echo "🕷️  Running the pipeline: discover -> scrape -> merge -> rank..."
+echo "Communities are scraped as soon as their sitemap URLs are discovered..."
+python -m whop_scraper pipeline "$@"
 
 if [ ! -f "output/raw_communities.json" ]; then
-    echo "❌ Error: raw_communities.json not created by scrape_new.py"
+    echo "❌ Error: raw_communities.json not created by the pipeline"
     exit 1
 fi
 
 COMMUNITY_COUNT=$(python -c "import json; data=json.load(open('output/raw_communities.json')); print(len(data))")
 echo "✅ Scraped $COMMUNITY_COUNT communities"
 
-echo ""
-
-# Step 6: Run rank.py to analyze and rank data
-echo "📊 Step 3/3: Running rank.py to rank and analyze communities..."
-python rank.py
-
 if [ ! -f "output/ranked_communities.csv" ]; then
-    echo "❌ Error: ranked_communities.csv not created by rank.py"
+    echo "❌ Error: ranked_communities.csv not created by the pipeline"
     exit 1
 fi
 
@@ -92,17 +70,15 @@ echo "✅ Rankings generated"
 
 echo ""
 
-# Step 7: Summary
+# Step 5: Summary
 echo "=========================================="
 echo "🎉 PIPELINE COMPLETED SUCCESSFULLY!"
 echo "=========================================="
 echo "Completed at: $(date)"
 echo ""
 echo "📋 RESULTS SUMMARY:"
-echo "   • Product sitemaps processed: $URL_COUNT"
 echo "   • Communities scraped: $COMMUNITY_COUNT"
 echo "   • Output files created:"
-echo "     - output/sample_discovery.txt (product sitemap URLs)"
 echo "     - output/raw_communities.json (scraped community data)"
 echo "     - output/ranked_communities.csv (top ranked communities)"
 echo "     - output/all_communities_ranked.json (full ranked data)"
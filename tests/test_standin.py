@@ -0,0 +1,108 @@
+"""
+Stand-in checks as tests: every fault profile against the fault-free crawl,
+plus the fault schedule and the degraded-record comparison on their own
+"""
+
+import pytest
+
+from whop_scraper.standin import (
+    FAULT_PROFILES,
+    FaultSchedule,
+    MISSING_VALUES,
+    assess,
+    comparable,
+    degraded_as_expected,
+    run_profile,
+)
+
+# Configuration
+COMMUNITIES = 30
+MIN_PAGES_PER_SECOND = 0.5  # The slowest profile (429 with Retry-After) manages about 1.1
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    results, _, _, _ = run_profile("none", [], communities=COMMUNITIES)
+    baseline = {url: comparable(record) for url, record in results.items()}
+    assert sum(record is not None for record in baseline.values()) == COMMUNITIES
+    return baseline
+
+
+@pytest.mark.parametrize("name", [name for name in FAULT_PROFILES if name != "none"])
+def test_profile_loses_nothing(name, baseline):
+    results, dead_letters, schedule, elapsed = run_profile(name, FAULT_PROFILES[name], communities=COMMUNITIES)
+    outcome = assess(results, dead_letters, schedule, baseline)
+    assert sum(schedule.injected.values()) > 0
+    assert outcome["wrong"] == outcome["lost"] == 0, dict(outcome)
+    scraped = sum(record is not None for record in results.values())
+    assert scraped / elapsed >= MIN_PAGES_PER_SECOND
+
+
+def faults(schedule, paths, kind="community"):
+    return [schedule.next_fault(path, kind) is not None for path in paths]
+
+
+def test_next_fault_every():
+    schedule = FaultSchedule([{"fault": "429", "every": 3}])
+    assert faults(schedule, [f"/p{i}" for i in range(7)]) == [True, False, False, True, False, False, True]
+    assert schedule.requests == 7
+    assert schedule.injected["429"] == 3
+
+
+def test_next_fault_burst():
+    schedule = FaultSchedule([{"fault": "5xx", "every": 5, "burst": 2}])
+    assert faults(schedule, [f"/p{i}" for i in range(7)]) == [True, True, False, False, False, True, True]
+
+
+def test_next_fault_match_counts_only_matching_kinds():
+    schedule = FaultSchedule([{"fault": "stall", "match": "community", "every": 2}])
+    assert schedule.next_fault("/sitemaps/discover/1.xml", "discover") is None
+    assert faults(schedule, ["/a", "/b", "/c"]) == [True, False, True]
+
+
+def test_next_fault_sticky():
+    rule = {"fault": "redirect_loop", "every": 2, "sticky": True}
+    schedule = FaultSchedule([rule])
+    assert faults(schedule, ["/a", "/b"]) == [True, False]
+    # /a keeps its fault on every retry; the rest of the schedule moves on without it
+    assert schedule.next_fault("/a", "product") is rule
+    assert schedule.next_fault("/a", "product") is rule
+    assert faults(schedule, ["/c", "/d"]) == [True, False]
+    assert schedule.sticky == {"/a": rule, "/c": rule}
+
+
+EXPECTED = {
+    "url": "https://whop.com/discover/example/",
+    "name": "Example",
+    "description": "A community",
+    "average_rating": 4.5,
+    "reviews_count": 12,
+    "creator_name": "Someone",
+    "category": "Trading",
+    "price_monthly_usd": 49.0,
+    "price_display": "$49/month",
+    "is_free": False,
+}
+
+
+def test_degraded_as_expected_missing_removed_fields():
+    record = dict(EXPECTED, price_monthly_usd=0, price_display="", is_free=False)
+    assert degraded_as_expected(record, EXPECTED, {"pricing"})
+    assert all(record[field] in MISSING_VALUES for field in ("price_monthly_usd", "price_display"))
+
+
+def test_degraded_as_expected_rejects_a_value_in_a_removed_field():
+    # A price read from somewhere else on a page with no pricing section is a wrong price
+    record = dict(EXPECTED, price_monthly_usd=9.0, price_display="", is_free=False)
+    assert not degraded_as_expected(record, EXPECTED, {"pricing"})
+
+
+def test_degraded_as_expected_rejects_changes_outside_removed_sections():
+    record = dict(EXPECTED, price_monthly_usd=0, price_display="", name="Other")
+    assert not degraded_as_expected(record, EXPECTED, {"pricing"})
+
+
+def test_degraded_as_expected_json_ld():
+    record = dict(EXPECTED, description="", average_rating=0, reviews_count=0, creator_name="Unknown", category="Other")
+    assert degraded_as_expected(record, EXPECTED, {"json_ld"})
+    assert not degraded_as_expected(record, EXPECTED, {"pricing"})
@@ -0,0 +1,8 @@
+"""
+Whop communities scraper and ranker
+Discover product sitemaps, scrape community pages, merge batches and rank.
+Run `whop-scraper --help` (or `python -m whop_scraper --help`) for the commands.
+
+Submodules are deliberately not imported here, so importing the package
+stays cheap and each command loads only what it uses.
+"""
@@ -0,0 +1,5 @@
+"""Allow `python -m whop_scraper <command>`"""
+
+from .cli import main
+
+main()
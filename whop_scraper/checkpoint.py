@@ -0,0 +1,45 @@
+"""
+Per-batch resume checkpoints
+Written by the batch scraper after every save and read back on restart, by
+the supervisor and by the status command.
+"""
+
+import json
+import os
+from datetime import datetime
+
+from .common import OUTPUT_DIR, log_message
+
+
+def checkpoint_file_path(batch_number):
+    """Path of the resume checkpoint for a batch"""
+    return f"{OUTPUT_DIR}/checkpoint_batch_{batch_number}.json"
+
+
+def load_checkpoint(batch_number):
+    """Load a batch checkpoint, or None if the batch has not saved progress yet"""
+    path = checkpoint_file_path(batch_number)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        log_message(f"Error reading checkpoint {path}: {e}")
+        return None
+
+
+def save_checkpoint(batch_number, processed, total_urls, communities, complete=False):
+    """Record how many batch URLs have been processed with their results saved"""
+    checkpoint = {
+        'batch_number': batch_number,
+        'processed': processed,
+        'total_urls': total_urls,
+        'communities': communities,
+        'complete': complete,
+        'updated_at': datetime.now().isoformat()
+    }
+    path = checkpoint_file_path(batch_number)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(path + ".tmp", path)
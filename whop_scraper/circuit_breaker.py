@@ -0,0 +1,157 @@
+"""
+Circuit breaker and jittered exponential backoff for the HTTP layer
+When whop.com starts failing (errors, 5xx or 429s), the breaker opens and
+every caller blocks in before_request() instead of burning through URLs.
+After the cooldown a single half-open probe is let through: success closes
+the breaker, failure re-opens it with a doubled cooldown.
+"""
+
+import multiprocessing
+import random
+import threading
+import time
+
+# Configuration
+FAILURE_THRESHOLD = 10  # Failures within the window that open the breaker
+FAILURE_WINDOW = 30.0  # Seconds
+BASE_COOLDOWN = 30.0  # Seconds the breaker stays open the first time
+MAX_COOLDOWN = 600.0
+POLL_INTERVAL = 1.0  # How often blocked callers re-check the breaker
+
+BACKOFF_BASE = 1.0  # Seconds
+BACKOFF_CAP = 60.0
+
+CLOSED = 0
+OPEN = 1
+HALF_OPEN = 2
+STATE_NAMES = {CLOSED: "closed", OPEN: "open", HALF_OPEN: "half-open"}
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Full-jitter exponential backoff: random delay in [0, min(cap, base * 2^attempt)]"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class _LocalValue:
+    """Plain stand-in for multiprocessing.Value when the breaker isn't shared"""
+
+    def __init__(self, value):
+        self.value = value
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker shared by all requests
+
+    With shared=True the state lives in shared memory, so one breaker created
+    by the supervisor pauses every worker process at once.
+    """
+
+    def __init__(
+        self,
+        failure_threshold=FAILURE_THRESHOLD,
+        failure_window=FAILURE_WINDOW,
+        base_cooldown=BASE_COOLDOWN,
+        max_cooldown=MAX_COOLDOWN,
+        shared=False,
+        log=print,
+    ):
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.log = log
+
+        if shared:
+            self._lock = multiprocessing.Lock()
+            make_int = lambda value: multiprocessing.Value("i", value, lock=False)
+            make_float = lambda value: multiprocessing.Value("d", value, lock=False)
+        else:
+            self._lock = threading.Lock()
+            make_int = make_float = _LocalValue
+
+        self._state = make_int(CLOSED)
+        self._failures = make_int(0)
+        self._probe_in_flight = make_int(0)
+        self._window_start = make_float(0.0)
+        self._open_until = make_float(0.0)
+        self._cooldown = make_float(base_cooldown)
+
+    def __getstate__(self):
+        # The log callback may not be picklable; worker processes set their own
+        state = self.__dict__.copy()
+        state["log"] = print
+        return state
+
+    @property
+    def state(self):
+        return STATE_NAMES[self._state.value]
+
+    def before_request(self):
+        """
+        Block while the breaker is open; let one probe through when half-open
+
+        Returns True for the caller that got the probe: it must report its
+        outcome with record_success() / record_failure(), or hand the probe
+        back with release_probe() without sending.
+        """
+        while True:
+            with self._lock:
+                now = time.time()
+                if self._state.value == CLOSED:
+                    return False
+                if self._state.value == OPEN and now >= self._open_until.value:
+                    self._state.value = HALF_OPEN
+                    self._probe_in_flight.value = 0
+                if self._state.value == HALF_OPEN and not self._probe_in_flight.value:
+                    self._probe_in_flight.value = 1
+                    return True
+                wait = self._open_until.value - now
+
+            time.sleep(min(wait, POLL_INTERVAL) if wait > 0 else POLL_INTERVAL)
+
+    def release_probe(self):
+        """Hand back an unused probe, so the next caller probes instead"""
+        with self._lock:
+            if self._state.value == HALF_OPEN:
+                self._probe_in_flight.value = 0
+
+    def record_success(self):
+        with self._lock:
+            if self._state.value == HALF_OPEN:
+                self._state.value = CLOSED
+                self._failures.value = 0
+                self._probe_in_flight.value = 0
+                self._cooldown.value = self.base_cooldown
+                self.log("Circuit breaker closed - site recovered, resuming requests")
+
+    def record_failure(self, retry_after=None):
+        """Count an error / 5xx / 429; retry_after (seconds) extends the open period"""
+        with self._lock:
+            now = time.time()
+
+            if self._state.value == HALF_OPEN:
+                self._cooldown.value = min(self._cooldown.value * 2, self.max_cooldown)
+                self._open(now, retry_after)
+                self.log(f"Circuit breaker probe failed - staying open for {self._open_until.value - now:.0f}s")
+                return
+
+            if self._state.value == OPEN:
+                return
+
+            if now - self._window_start.value > self.failure_window:
+                self._window_start.value = now
+                self._failures.value = 0
+
+            self._failures.value += 1
+            if self._failures.value >= self.failure_threshold:
+                self._open(now, retry_after)
+                self.log(
+                    f"Circuit breaker opened after {self._failures.value} failures in "
+                    f"{now - self._window_start.value:.0f}s - pausing requests for {self._open_until.value - now:.0f}s"
+                )
+
+    def _open(self, now, retry_after=None):
+        self._state.value = OPEN
+        self._probe_in_flight.value = 0
+        self._open_until.value = now + max(self._cooldown.value, retry_after or 0)
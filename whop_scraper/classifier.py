@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Keyword category classifier for Whop communities
+Compiles a category taxonomy into a single regex so every category is scored
+in one pass over the text.
+
+Usage: whop-scraper classify <communities.json> [output.json] [--taxonomy taxonomy.json]
+       (reclassifies stored records in place unless an output file is given)
+"""
+
+import json
+import re
+import sys
+
+# Default taxonomy. Order is the tie-break priority when two categories score
+# the same, so more specific categories come before broader ones.
+DEFAULT_TAXONOMY = {
+    "Crypto": ["crypto", "cryptocurrency", "bitcoin", "ethereum", "nft"],
+    "Trading": ["trading", "forex", "stocks", "investment"],
+    "E-commerce": ["ecommerce", "e-commerce", "dropship", "amazon", "shopify"],
+    "Real Estate": ["real estate", "property", "realestate"],
+    "Finance": ["finance", "financial", "money", "wealth"],
+    "Education": ["education", "course", "learn", "tutorial", "training"],
+}
+DEFAULT_CATEGORY = "Other"
+
+
+class KeywordClassifier:
+    """
+    Multi-pattern keyword matcher over a {category: [keywords]} taxonomy
+
+    Keywords match at a word start and may be followed by more word
+    characters, so "course" also matches "courses" but not "discourse".
+    """
+
+    def __init__(self, taxonomy=None, default=DEFAULT_CATEGORY):
+        self.taxonomy = DEFAULT_TAXONOMY if taxonomy is None else validate_taxonomy(taxonomy)
+        self.default = default
+        self.priority = {category: i for i, category in enumerate(self.taxonomy)}
+
+        self.keyword_categories = {}
+        for category, keywords in self.taxonomy.items():
+            for keyword in keywords:
+                self.keyword_categories.setdefault(keyword.lower(), []).append(category)
+
+        # Longest keywords first so the alternation prefers the most specific match
+        keywords = sorted(self.keyword_categories, key=len, reverse=True)
+        self.pattern = re.compile(
+            r"\b(" + "|".join(re.escape(k) for k in keywords) + r")\w*", re.I
+        )
+
+    def scores(self, text):
+        """Keyword hit count per category, from a single scan of the text"""
+        scores = {}
+        for match in self.pattern.finditer(text):
+            for category in self.keyword_categories[match.group(1).lower()]:
+                scores[category] = scores.get(category, 0) + 1
+        return scores
+
+    def classify(self, text):
+        """Best scoring category, ties broken by taxonomy order"""
+        scores = self.scores(text)
+        if not scores:
+            return self.default
+        return min(scores, key=lambda category: (-scores[category], self.priority[category]))
+
+    def classify_community(self, community):
+        """Classify a community record from its description and name"""
+        text = community.get("description", "") + " " + community.get("community_name", "")
+        return self.classify(text)
+
+    def classify_records(self, communities):
+        """
+        Reclassify stored records in place without re-scraping
+
+        Returns the number of records whose category changed.
+        """
+        changed = 0
+        for community in communities:
+            category = self.classify_community(community)
+            if community.get("category") != category:
+                community["category"] = category
+                changed += 1
+        return changed
+
+
+def validate_taxonomy(taxonomy):
+    """
+    Check a {category: [keywords]} taxonomy and return it
+
+    Raises ValueError for an empty taxonomy, a category without keywords or
+    a blank keyword, any of which would compile into a pattern that matches
+    everywhere or nothing.
+    """
+    if not isinstance(taxonomy, dict) or not taxonomy:
+        raise ValueError("Taxonomy must be a non-empty {category: [keywords]} object")
+    for category, keywords in taxonomy.items():
+        if not isinstance(keywords, list) or not keywords:
+            raise ValueError(f"Taxonomy category {category!r} needs a non-empty list of keywords")
+        for keyword in keywords:
+            if not isinstance(keyword, str) or not keyword.strip():
+                raise ValueError(f"Taxonomy category {category!r} has a blank keyword: {keyword!r}")
+    return taxonomy
+
+
+def load_taxonomy(path):
+    """Load and validate a {category: [keywords]} taxonomy from a JSON file"""
+    with open(path, "r", encoding="utf-8") as f:
+        taxonomy = json.load(f)
+    try:
+        return validate_taxonomy(taxonomy)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+
+
+_default_classifier = None
+
+
+def get_default_classifier():
+    """Shared classifier for the default taxonomy, compiled on first use"""
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = KeywordClassifier()
+    return _default_classifier
+
+
+def main():
+    """Batch reclassification of stored community records"""
+    args = sys.argv[1:]
+    taxonomy = None
+    if "--taxonomy" in args:
+        position = args.index("--taxonomy")
+        if position + 1 >= len(args):
+            print(__doc__.strip())
+            sys.exit(1)
+        try:
+            taxonomy = load_taxonomy(args[position + 1])
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        del args[position : position + 2]
+
+    if not args:
+        print(__doc__.strip())
+        sys.exit(1)
+
+    input_file = args[0]
+    output_file = args[1] if len(args) > 1 else input_file
+
+    with open(input_file, "r", encoding="utf-8") as f:
+        communities = json.load(f)
+
+    classifier = KeywordClassifier(taxonomy)
+    changed = classifier.classify_records(communities)
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(communities, f, indent=2, ensure_ascii=False)
+
+    print(f"Reclassified {len(communities)} communities ({changed} changed)")
+    print(f"Saved to: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+whop-scraper command line
+Each subcommand maps to a module that is imported only when that subcommand
+runs, so light commands like `status` never load requests or BeautifulSoup.
+
+Usage: whop-scraper <command> [args...]
+       whop-scraper <command> --help
+"""
+
+import importlib
+import sys
+
+# Subcommand -> (module, summary). Modules parse their own arguments.
+COMMANDS = {
+    "discover": ("discover", "Collect product sitemap URLs into output/sample_discovery.txt"),
+    "scrape": ("scrape", "Scrape one batch: scrape <batch_number> [--bounded-memory] [--trace-memory [N]]"),
+    "merge": ("merge", "Merge batch files into output/raw_communities.json [--yes] [--force]"),
+    "rank": ("rank", "Score and rank merged communities, plus output/leaderboards/ [--incremental | --stream [file]]"),
+    "deep-pass": ("tiered", "Fully scrape tiered-crawl records that could reach the leaderboard"),
+    "status": ("status", "Show discovery, batch, checkpoint and dead-letter status (offline)"),
+    "pipeline": ("pipeline", "Discover, scrape, merge and rank in one process [--workers N] [--limit N] [--rate R]"),
+    "supervise": ("supervisor", "Run batches in parallel worker processes <workers> [--batches 1-5]"),
+    "dead-letter": ("dead_letter", "Failed URL status or retry pass: status | retry [--limit N]"),
+    "recrawl": ("recrawl", "Plan or run a value-aware recrawl: plan | run [--budget N]"),
+    "snapshots": ("snapshot_store", "Snapshot store: record <file> | history <url> | growth <url> <field>"),
+    "classify": ("classifier", "Reclassify stored records <file> [output] [--taxonomy t.json]"),
+    "egress": ("egress", "Egress pool tools: check [config] [url] | standin-proxy <port>"),
+    "standin": ("standin", "Fault-injecting local whop.com: serve [port] [--profile P] | check [--profile P]"),
+}
+
+
+def print_usage():
+    print(__doc__.strip())
+    print("\nCommands:")
+    for name, (_, summary) in COMMANDS.items():
+        print(f"  {name:<12} {summary}")
+
+
+def main(argv=None):
+    """Dispatch to the subcommand's module main()"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help", "help"):
+        print_usage()
+        return
+    if argv[0] not in COMMANDS:
+        print(f"Unknown command: {argv[0]}")
+        print_usage()
+        sys.exit(1)
+
+    command, args = argv[0], argv[1:]
+    module = importlib.import_module(f"{__package__}.{COMMANDS[command][0]}")
+
+    # Module entry points read sys.argv, so present them with their own arguments
+    sys.argv = [f"whop-scraper {command}"] + args
+    # Modules report failure with sys.exit; a return value (e.g. a count) is not an exit status
+    module.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Settings and logging shared by every stage
+Kept free of third-party imports so status checks and other light
+subcommands start quickly.
+"""
+
+import os
+from datetime import datetime
+
+from .frontier import Frontier, count_urls
+
+# Configuration
+BASE_URL = "https://whop.com"
+OUTPUT_DIR = "output"
+DISCOVERY_FILE = f"{OUTPUT_DIR}/sample_discovery.txt"
+LOG_FILE = f"{OUTPUT_DIR}/scrape_log.txt"
+DELAY_BETWEEN_REQUESTS = 1.5  # Seconds between requests
+BATCH_SIZE_URLS = 10000  # Process 10k URLs per batch
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+
+def ensure_output_dir():
+    """Create the output directory if it doesn't exist yet"""
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+
+def log_message(message):
+    """Simple logging to console and file"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    log_line = f"[{timestamp}] {message}"
+    print(log_line)
+    ensure_output_dir()
+    with open(LOG_FILE, "a", encoding="utf-8") as f:
+        f.write(log_line + "\n")
+
+
+def iter_discovery_urls(file_path=DISCOVERY_FILE):
+    """Yield product sitemap URLs from the discovery file line by line (raises FileNotFoundError)"""
+    with open(file_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("https://"):
+                yield line
+
+
+def open_discovery_frontier(file_path=DISCOVERY_FILE):
+    """The discovery file as an mmapped Frontier, indexing it first if needed (raises FileNotFoundError)"""
+    return Frontier(file_path)
+
+
+def read_discovery_urls(file_path=DISCOVERY_FILE, start=0, stop=None):
+    """Product sitemap URLs [start:stop] from the discovery file (raises FileNotFoundError)"""
+    with open_discovery_frontier(file_path) as frontier:
+        return list(frontier[start:stop])
+
+
+def count_discovery_urls(file_path=DISCOVERY_FILE):
+    """Number of product sitemap URLs in the discovery file (read-only: uses the index only if current)"""
+    return count_urls(file_path)
@@ -0,0 +1,215 @@
+"""
+Compact community record shared by scrape, merge and rank
+A Community stores the known fields in __slots__ instead of a per-record
+hash table, with category and price_display interned (a few dozen distinct
+values across the whole crawl). It keeps the dict interface the pipeline
+already uses (get, [], in, keys, dict(record)), so records can be passed to
+anything written for plain dicts, and serialises back to the same JSON.
+
+Scoring reads fields as attributes. The scoring inputs in DEFAULTS read as
+their default while absent (the values the scoring code used with
+dict.get), yet stay absent for `in`, get() and the JSON output; set those
+with community[key] = value. Other known fields can also be assigned as
+attributes. Keys outside FIELD_NAMES are kept in a small side dict.
+"""
+
+import sys
+
+from .streaming import iter_json_array
+
+# Known fields, in output order
+FIELD_NAMES = (
+    "url",
+    "url_slug",
+    "product_id",
+    "scraped_at",
+    "community_name",
+    "description",
+    "average_rating",
+    "reviews_count",
+    "creator_name",
+    "category",
+    "price_monthly_usd",
+    "price_display",
+    "is_free",
+    "tier",
+    "review_velocity",
+    "estimated_members",
+    "confidence",
+    "engagement_score",
+    "rank",
+)
+# Scoring inputs that may be missing from a record, with the value they read as
+DEFAULTS = {
+    "average_rating": 0,
+    "reviews_count": 0,
+    "category": "Other",
+    "price_monthly_usd": 0,
+    "review_velocity": 0,
+}
+INTERNED_FIELDS = frozenset(("category", "price_display"))
+
+
+class _Absent:
+    """Slot value of a known field that the record doesn't have"""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "<absent>"
+
+
+_ABSENT = _Absent()
+_BITS = {name: 1 << i for i, name in enumerate(DEFAULTS)}
+_KNOWN = frozenset(FIELD_NAMES)
+
+
+class Community:
+    """Slotted community record with a dict-compatible interface"""
+
+    __slots__ = FIELD_NAMES + ("_present", "_extra")
+
+    def __init__(self, data=None):
+        values = dict(_INITIAL)
+        present = 0
+        extra = None
+        if data:
+            for key, value in data.items():
+                if key not in _KNOWN:
+                    if extra is None:
+                        extra = {}
+                    extra[key] = value
+                    continue
+                if key in INTERNED_FIELDS and type(value) is str:
+                    value = sys.intern(value)
+                values[key] = value
+                present |= _BITS.get(key, 0)
+        for name, setter in _SETTER_ITEMS:
+            setter(self, values[name])
+        self._present = present
+        self._extra = extra
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data)
+
+    def __setitem__(self, key, value):
+        if key not in _KNOWN:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+            return
+        if key in INTERNED_FIELDS and type(value) is str:
+            value = sys.intern(value)
+        _SETTERS[key](self, value)
+        bit = _BITS.get(key)
+        if bit:
+            self._present |= bit
+
+    def _has(self, key):
+        bit = _BITS.get(key)
+        if bit:
+            return bool(self._present & bit)
+        return _GETTERS[key](self) is not _ABSENT
+
+    def __getitem__(self, key):
+        if key not in _KNOWN:
+            if self._extra is None:
+                raise KeyError(key)
+            return self._extra[key]
+        if not self._has(key):
+            raise KeyError(key)
+        return _GETTERS[key](self)
+
+    def get(self, key, default=None):
+        if key not in _KNOWN:
+            return default if self._extra is None else self._extra.get(key, default)
+        return _GETTERS[key](self) if self._has(key) else default
+
+    def __contains__(self, key):
+        if key not in _KNOWN:
+            return self._extra is not None and key in self._extra
+        return self._has(key)
+
+    def __delitem__(self, key):
+        if key not in _KNOWN:
+            if self._extra is None:
+                raise KeyError(key)
+            del self._extra[key]
+            return
+        if not self._has(key):
+            raise KeyError(key)
+        _SETTERS[key](self, _INITIAL[key])
+        self._present &= ~_BITS.get(key, 0)
+
+    def pop(self, key, *default):
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        del self[key]
+        return value
+
+    def keys(self):
+        keys = [name for name in FIELD_NAMES if self._has(name)]
+        if self._extra:
+            keys.extend(self._extra)
+        return keys
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def to_dict(self):
+        data = {name: _GETTERS[name](self) for name in FIELD_NAMES if self._has(name)}
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def copy(self):
+        return Community(self.to_dict())
+
+    def __eq__(self, other):
+        if isinstance(other, Community):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        Community.__init__(self, state)
+
+    def __repr__(self):
+        return f"Community({self.to_dict()!r})"
+
+
+_INITIAL = {name: DEFAULTS.get(name, _ABSENT) for name in FIELD_NAMES}
+_SETTERS = {name: Community.__dict__[name].__set__ for name in FIELD_NAMES}
+_SETTER_ITEMS = tuple(_SETTERS.items())
+_GETTERS = {name: Community.__dict__[name].__get__ for name in FIELD_NAMES}
+
+
+def json_default(obj):
+    """`default=` hook so json.dump(s) writes Community records like dicts"""
+    if isinstance(obj, Community):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def load_communities(path):
+    """Read a JSON array of community records as Community objects, one record at a time"""
+    return [Community(record) for record in iter_json_array(path)]
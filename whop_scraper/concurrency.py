@@ -0,0 +1,148 @@
+"""
+Adaptive concurrency limit for the fetch layer
+Caps how many requests are in flight at once and moves the cap with what
+the site is telling us, in the style of TCP Vegas: once per window of about
+`limit` responses, the window's mean latency is compared with the no-load
+baseline (the lowest window mean seen). The gap estimates how many of our
+requests are queued at the site - few queued and the limit grows by one,
+many and it shrinks by one - and a 429 or 5xx cuts it multiplicatively.
+The limit settles where latency starts to rise, near the most the site
+serves without throttling, so worker counts don't need hand tuning.
+
+The limit is per process; under the supervisor the shared rate limiter
+still caps the total across workers.
+"""
+
+import math
+import threading
+import time
+
+# Configuration
+INITIAL_LIMIT = 4
+MIN_LIMIT = 1
+MAX_LIMIT = 32
+QUEUE_ALPHA = 3  # Grow while fewer than this many requests look queued (scaled by log10 of the limit)
+QUEUE_BETA = 6  # Shrink once more than this many do
+BASELINE_WINDOWS = 100  # Windows over which the baseline drifts up to a site that got slower for good
+BACKOFF_RATIO = 0.7  # Limit multiplier on a 429 / 5xx / connection error
+MIN_RTT = 1e-6  # Floor on a latency sample, so the baseline ratio never divides by zero
+
+
+class AdaptiveLimiter:
+    """Thread-safe Vegas-style concurrency limiter: acquire() before a request, release() once its body is read"""
+
+    def __init__(
+        self,
+        initial_limit=INITIAL_LIMIT,
+        min_limit=MIN_LIMIT,
+        max_limit=MAX_LIMIT,
+        log=print,
+    ):
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.log = log
+
+        self.in_flight = 0
+        self.baseline_rtt = None
+        self.window_rtt = None
+        self.throttled = 0
+        self.dropped = 0
+        self._window_total = 0.0
+        self._window_samples = 0
+        self._window_peak = 0  # Most requests in flight during the window
+        self._last_backoff = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Wait for a free slot. Returns the start time (perf_counter) to pass to release()"""
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+            self._window_peak = max(self._window_peak, self.in_flight)
+        return time.perf_counter()
+
+    def try_acquire(self):
+        """Take a slot only if one is free right now. Returns the start time, or None"""
+        with self._condition:
+            if self.in_flight >= self.limit:
+                return None
+            self.in_flight += 1
+            self._window_peak = max(self._window_peak, self.in_flight)
+        return time.perf_counter()
+
+    def release(self, start, throttled=False, dropped=False, cancelled=False):
+        """
+        Report a finished request
+
+        throttled is a 429, dropped a 5xx or connection error; both shrink
+        the limit. cancelled only frees the slot (a request we cut short says
+        nothing about the site). Other responses feed their latency to the
+        current window.
+        """
+        rtt = max(time.perf_counter() - start, MIN_RTT)
+        with self._condition:
+            self.in_flight -= 1
+            if cancelled:
+                pass
+            elif throttled or dropped:
+                self._backoff(throttled, rtt)
+            else:
+                self._sample(rtt)
+            self._condition.notify_all()
+
+    def _backoff(self, throttled, rtt):
+        if throttled:
+            self.throttled += 1
+        else:
+            self.dropped += 1
+        # Requests that were already in flight fail together; one cut per round trip
+        now = time.perf_counter()
+        if now - self._last_backoff < max(self.window_rtt or 0, rtt):
+            return
+        self._last_backoff = now
+        previous = self.limit
+        self.limit = max(self.min_limit, int(self.limit * BACKOFF_RATIO))
+        self._reset_window()
+        if self.limit != previous:
+            reason = "HTTP 429" if throttled else "server error"
+            self.log(f"Concurrency limit {previous} -> {self.limit} after {reason}")
+
+    def _reset_window(self):
+        self._window_total = 0.0
+        self._window_samples = 0
+        self._window_peak = self.in_flight
+
+    def _sample(self, rtt):
+        self._window_total += rtt
+        self._window_samples += 1
+        if self._window_samples < self.limit:
+            return
+
+        self.window_rtt = self._window_total / self._window_samples
+        if self.baseline_rtt is None or self.window_rtt < self.baseline_rtt:
+            self.baseline_rtt = self.window_rtt
+        else:
+            self.baseline_rtt += (self.window_rtt - self.baseline_rtt) / BASELINE_WINDOWS
+
+        queued = self.limit * (1 - self.baseline_rtt / self.window_rtt)
+        scale = max(1.0, math.log10(self.limit))
+        # Only grow while the limit is actually being used
+        if queued < QUEUE_ALPHA * scale and self._window_peak >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1)
+        elif queued > QUEUE_BETA * scale:
+            self.limit = max(self.min_limit, self.limit - 1)
+        self._reset_window()
+
+    def stats(self):
+        """Current limit and signals, for metrics and status output"""
+        with self._condition:
+            return {
+                "concurrency_limit": self.limit,
+                "in_flight": self.in_flight,
+                "latency_ms": round(self.window_rtt * 1000, 1) if self.window_rtt is not None else None,
+                "baseline_latency_ms": round(self.baseline_rtt * 1000, 1) if self.baseline_rtt is not None else None,
+                "throttled": self.throttled,
+                "dropped": self.dropped,
+            }
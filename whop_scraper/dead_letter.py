@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Dead-letter store and retry pass for failed product sitemaps
+Failures are appended to output/dead_letter.jsonl with their reason and last
+error; the retry pass re-scrapes only those URLs, with per-reason backoff and
+attempt limits, so recovery costs work proportional to the failures.
+
+Usage: whop-scraper dead-letter status
+       whop-scraper dead-letter retry [--limit N]
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from .common import OUTPUT_DIR, log_message
+
+# Configuration
+DEAD_LETTER_FILE = f"{OUTPUT_DIR}/dead_letter.jsonl"
+RETRY_OUTPUT_FILE = f"{OUTPUT_DIR}/raw_communities_retry.json"
+
+# Failure reasons
+SITEMAP_FETCH_FAILED = "sitemap_fetch_failed"
+NO_COMMUNITY_URL = "no_community_url"
+SCRAPE_FAILED = "scrape_failed"
+PROCESSING_ERROR = "processing_error"
+
+# Per-reason retry policy: base backoff in seconds (doubled per attempt),
+# maximum attempts and priority (lower retries first). A missing community
+# URL is usually permanent, so it is retried rarely and last.
+RETRY_POLICY = {
+    SITEMAP_FETCH_FAILED: {"base_delay": 300, "max_attempts": 5, "priority": 0},
+    SCRAPE_FAILED: {"base_delay": 600, "max_attempts": 4, "priority": 1},
+    PROCESSING_ERROR: {"base_delay": 600, "max_attempts": 3, "priority": 2},
+    NO_COMMUNITY_URL: {"base_delay": 86400, "max_attempts": 2, "priority": 3},
+}
+
+
+def record_failure(sitemap_url, reason, error="", path=DEAD_LETTER_FILE):
+    """Append a failure event for a product sitemap URL"""
+    event = {
+        "event": "failed",
+        "sitemap_url": sitemap_url,
+        "reason": reason,
+        "error": str(error)[:500],
+        "ts": time.time(),
+    }
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(event) + "\n")
+
+
+def record_resolved(sitemap_urls, path=DEAD_LETTER_FILE):
+    """
+    Append resolved events so the URLs leave the retry queue
+
+    Only call this once the recovered records are on disk; a resolved URL
+    is never retried again.
+    """
+    now = time.time()
+    lines = [json.dumps({"event": "resolved", "sitemap_url": url, "ts": now}) + "\n" for url in sitemap_urls]
+    if lines:
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+
+def load_dead_letters(path=DEAD_LETTER_FILE):
+    """
+    Fold the event log into one entry per URL
+
+    Returns {sitemap_url: {reason, attempts, last_error, last_attempt, resolved}}.
+    """
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue  # Partially written line from a killed worker
+
+            entry = entries.setdefault(
+                event["sitemap_url"],
+                {"reason": "", "attempts": 0, "last_error": "", "last_attempt": 0.0, "resolved": False},
+            )
+            if event["event"] == "resolved":
+                entry["resolved"] = True
+            else:
+                entry["reason"] = event["reason"]
+                entry["attempts"] += 1
+                entry["last_error"] = event.get("error", "")
+                entry["last_attempt"] = event["ts"]
+                entry["resolved"] = False
+
+    return entries
+
+
+def open_dead_letter_urls(path=DEAD_LETTER_FILE):
+    """Failed URLs not yet resolved - a normal scrape that recovers one resolves it"""
+    return {url for url, entry in load_dead_letters(path).items() if not entry["resolved"]}
+
+
+def retry_policy(reason):
+    return RETRY_POLICY.get(reason, RETRY_POLICY[PROCESSING_ERROR])
+
+
+def is_exhausted(entry):
+    return entry["attempts"] >= retry_policy(entry["reason"])["max_attempts"]
+
+
+def next_retry_at(entry):
+    """Earliest time the entry may be retried (per-reason exponential backoff)"""
+    policy = retry_policy(entry["reason"])
+    return entry["last_attempt"] + policy["base_delay"] * (2 ** (entry["attempts"] - 1))
+
+
+def due_retries(entries, now=None):
+    """Unresolved, non-exhausted entries whose backoff has elapsed, in priority order"""
+    now = now or time.time()
+    due = [
+        (url, entry)
+        for url, entry in entries.items()
+        if not entry["resolved"] and not is_exhausted(entry) and next_retry_at(entry) <= now
+    ]
+    due.sort(key=lambda item: (retry_policy(item[1]["reason"])["priority"], item[1]["attempts"]))
+    return due
+
+
+def show_status(entries):
+    """Print a breakdown of the dead-letter store"""
+    print("\n=== DEAD-LETTER STATUS ===")
+    if not entries:
+        print("No failures recorded")
+        return
+
+    open_entries = [entry for entry in entries.values() if not entry["resolved"]]
+    resolved = len(entries) - len(open_entries)
+    exhausted = sum(1 for entry in open_entries if is_exhausted(entry))
+    due = len(due_retries(entries))
+
+    print(f"Failed URLs recorded: {len(entries)}")
+    print(f"Resolved: {resolved} | Waiting: {len(open_entries) - exhausted - due} | Due now: {due} | Exhausted: {exhausted}")
+
+    by_reason = {}
+    for entry in open_entries:
+        by_reason[entry["reason"]] = by_reason.get(entry["reason"], 0) + 1
+    for reason, count in sorted(by_reason.items(), key=lambda x: x[1], reverse=True):
+        print(f"  {reason}: {count}")
+
+
+def run_retry_pass(limit=None):
+    """
+    Re-scrape due dead letters and append recoveries to the retry output file
+
+    Returns (retried, recovered).
+    """
+    # Imported here so status checks don't pay for the HTTP/parsing stack
+    from . import scrape
+    from .fetch import pause_between_requests
+
+    due = due_retries(load_dead_letters())
+    if limit:
+        due = due[:limit]
+
+    log_message(f"Retry pass: {len(due)} failed URLs due for retry")
+    writer = scrape.BatchWriter(RETRY_OUTPUT_FILE, bounded_memory=True)
+    # Resolved as each save lands, so a crash can't drop an unsaved recovery
+    writer.resolve_urls = {sitemap_url for sitemap_url, _ in due}
+
+    recovered = 0
+    for i, (sitemap_url, entry) in enumerate(due, 1):
+        log_message(
+            f"Retrying {i}/{len(due)} ({entry['reason']}, attempt {entry['attempts'] + 1}): {sitemap_url}"
+        )
+        # scrape_sitemap records a new failure event itself if this attempt fails
+        community_data = scrape.scrape_sitemap(sitemap_url)
+        if community_data:
+            writer.add(community_data, sitemap_url)
+            recovered += 1
+
+        pause_between_requests()
+
+    writer.flush()
+    log_message(f"Retry pass complete: {recovered}/{len(due)} recovered, saved to {RETRY_OUTPUT_FILE}")
+    return len(due), recovered
+
+
+def main():
+    """Command line entry point"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ("status", "retry"):
+        print(__doc__.strip())
+        sys.exit(1)
+
+    if sys.argv[1] == "status":
+        show_status(load_dead_letters())
+        return
+
+    limit = None
+    if "--limit" in sys.argv:
+        limit = int(sys.argv[sys.argv.index("--limit") + 1])
+
+    print(f"Retry pass started at: {datetime.now()}")
+    run_retry_pass(limit)
+    print("\nTo include recovered communities, run: whop-scraper merge --yes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Whop Structure Explorer - Discovers the actual HTML structure
+Run this FIRST to understand the site structure before scraping
+Usage: whop-scraper discover
+"""
+
+import codecs
+import json
+import os
+import re
+import time
+
+from .common import DISCOVERY_FILE, ensure_output_dir
+from .fetch import STREAM_CHUNK_SIZE, get_page
+from .frontier import build_index
+
+# Configuration
+DISCOVER_SITEMAP_URL = "https://whop.com/sitemaps/discover/"
+DISCOVER_SITEMAP_COUNT = 11  # Discover sitemaps 1.xml to 11.xml
+LOC_PATTERN = re.compile(r"<loc>([^<]+)</loc>")
+
+
+def iter_sitemap_locs(response):
+    """
+    Yield each <loc> URL of a streamed sitemap response as soon as it arrives
+
+    Only the unparsed tail of the current chunk is kept, so a sitemap of any
+    size is read in constant memory.
+    """
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    tail = ""
+    try:
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            text = tail + decoder.decode(chunk)
+            end = 0
+            for match in LOC_PATTERN.finditer(text):
+                yield match.group(1)
+                end = match.end()
+            # Carry over an unfinished <loc> (or the start of one) into the next chunk
+            tail = text[end:]
+            start = tail.rfind("<loc>")
+            tail = tail[start:] if start != -1 else tail[-len("<loc>"):]
+    finally:
+        response.close()
+
+
+def iter_product_sitemap_urls():
+    """
+    Yield product sitemap URLs from each discover sitemap while it downloads
+
+    Consumers (the pipeline's scrape queue, the discovery file) see the first
+    URLs seconds after the first response starts, not after the whole
+    sitemap has been read.
+    """
+    # Fetch discover sitemap - all XML files from 1.xml to 11.xml
+    main_sitemap_url = DISCOVER_SITEMAP_URL
+
+    for i in range(1, DISCOVER_SITEMAP_COUNT + 1):
+        xml_url = f"{main_sitemap_url}{i}.xml"
+        print(f"\nFetching discover sitemap {i}/{DISCOVER_SITEMAP_COUNT}: {xml_url}")
+
+        # Longer timeout for XML files
+        locs = get_page(xml_url, timeout=30, reader=iter_sitemap_locs)
+        if locs is None:
+            print(f"Failed to fetch sitemap {i}.xml!")
+            continue
+
+        # Keep product sitemap URLs: https://whop.com/sitemaps/product/prod_XXX.xml
+        total_count = 0
+        product_count = 0
+        try:
+            for url in locs:
+                total_count += 1
+                if 'sitemaps/product/prod_' in url:
+                    product_count += 1
+                    yield url
+        except Exception as e:
+            print(f"Sitemap {i}.xml download failed part way: {e}")
+
+        print(f"Found {total_count} total URLs, {product_count} product sitemap URLs in sitemap {i}.xml")
+
+        # Small delay between requests to be respectful
+        time.sleep(1)
+
+
+def explore_sitemap():
+    """Extract community URLs from discover sitemap and save to file"""
+    print("\n" + "=" * 60)
+    print("EXTRACTING COMMUNITY URLs FROM DISCOVER SITEMAP")
+    print("=" * 60)
+
+    # Each URL is written to sample_discovery.txt as soon as it is parsed,
+    # skipping ones already seen, so the full list is never held in memory
+    seen = set()
+    first_urls = []
+    duplicates = 0
+    # Written to a temporary file so a failed discovery keeps the previous list
+    with open(DISCOVERY_FILE + ".tmp", "w") as f:
+        for url in iter_product_sitemap_urls():
+            if url in seen:
+                duplicates += 1
+                continue
+            seen.add(url)
+            f.write(url + "\n")
+            if len(first_urls) < 10:
+                first_urls.append(url)
+
+    print(f"\n{'='*50}")
+    print(f"TOTAL SUMMARY:")
+    print(f"Total product sitemap URLs found across all XML files: {len(seen)} ({duplicates} duplicates skipped)")
+    print(f"{'='*50}")
+
+    if seen:
+        os.replace(DISCOVERY_FILE + ".tmp", DISCOVERY_FILE)
+        # Index it now so batch workers start without scanning the file
+        build_index(DISCOVERY_FILE)
+        print(f"✓ Product sitemap URLs saved to {DISCOVERY_FILE}")
+        print("\nFirst 10 product sitemap URLs:")
+        for url in first_urls:
+            print(f"  - {url}")
+
+        return first_urls[0]
+    else:
+        os.remove(DISCOVERY_FILE + ".tmp")
+        print("No product sitemap URLs found across any XML files!")
+        return None
+
+
+def explore_community_page(url):
+    """Explore a community page structure"""
+    # Only these exploration helpers need the HTML parser
+    from bs4 import BeautifulSoup
+
+    print("\n" + "=" * 60)
+    print("EXPLORING COMMUNITY PAGE STRUCTURE")
+    print("=" * 60)
+    print(f"\nFetching: {url}")
+
+    html = get_page(url)
+    if not html:
+        print("Failed to fetch community page!")
+        return
+
+    soup = BeautifulSoup(html, "html.parser")
+    print(f"Page size: {len(html)} bytes")
+
+    # Save raw HTML for inspection
+    with open("output/sample_community.html", "w", encoding="utf-8") as f:
+        f.write(html)
+    print("Saved raw HTML to: output/sample_community.html")
+
+    # Explore different elements
+    findings = {}
+
+    # 1. Find title/name
+    print("\n1. LOOKING FOR COMMUNITY NAME:")
+    h1_tags = soup.find_all("h1")
+    if h1_tags:
+        print(f"  Found {len(h1_tags)} <h1> tags:")
+        for h1 in h1_tags[:3]:
+            print(f"    - {h1.text.strip()[:50]}")
+            findings["h1_example"] = h1.text.strip()
+
+    # Check meta tags
+    og_title = soup.find("meta", {"property": "og:title"})
+    if og_title:
+        print(f"  Found og:title: {og_title.get('content', '')[:50]}")
+        findings["og_title"] = og_title.get("content", "")
+
+    # 2. Find price
+    print("\n2. LOOKING FOR PRICE:")
+    # Look for dollar signs
+    price_patterns = soup.find_all(text=re.compile(r"\$\d+"))
+    if price_patterns:
+        print(f"  Found {len(price_patterns)} price patterns:")
+        for price in price_patterns[:3]:
+            parent = price.parent
+            print(f"    - Text: {price.strip()[:30]}")
+            print(
+                f"      Parent tag: <{parent.name}> with class: {parent.get('class', 'no-class')}"
+            )
+            findings["price_example"] = price.strip()
+
+    # Look for common price container classes
+    for class_name in ["price", "pricing", "cost", "amount"]:
+        elements = soup.find_all(class_=re.compile(class_name, re.I))
+        if elements:
+            print(f"  Found {len(elements)} elements with '{class_name}' in class")
+            for elem in elements[:2]:
+                print(f"    - {elem.text.strip()[:50]}")
+
+    # 3. Find reviews/ratings
+    print("\n3. LOOKING FOR REVIEWS/RATINGS:")
+    # Look for star patterns or rating numbers
+    rating_patterns = soup.find_all(text=re.compile(r"[★⭐]|(\d\.\d+)\s*\((\d+)"))
+    if rating_patterns:
+        print(f"  Found {len(rating_patterns)} potential rating patterns:")
+        for rating in rating_patterns[:3]:
+            print(f"    - {rating.strip()[:50]}")
+            findings["rating_example"] = rating.strip()
+
+    # Look for review-related classes
+    for class_name in ["review", "rating", "star", "feedback"]:
+        elements = soup.find_all(class_=re.compile(class_name, re.I))
+        if elements:
+            print(f"  Found {len(elements)} elements with '{class_name}' in class")
+            for elem in elements[:2]:
+                print(f"    - {elem.text.strip()[:50]}")
+
+    # 4. Find category
+    print("\n4. LOOKING FOR CATEGORY:")
+    # Check for category links
+    category_links = soup.find_all("a", href=re.compile("/category/"))
+    if category_links:
+        print(f"  Found {len(category_links)} category links:")
+        for link in category_links[:3]:
+            print(f"    - {link.text.strip()}: {link.get('href')}")
+            findings["category_example"] = link.text.strip()
+
+    # 5. Check data attributes
+    print("\n5. CHECKING DATA ATTRIBUTES:")
+    # Look for React/Next.js data
+    script_tags = soup.find_all("script", type="application/json")
+    if script_tags:
+        print(f"  Found {len(script_tags)} JSON script tags")
+        for i, script in enumerate(script_tags[:2]):
+            try:
+                data = json.loads(script.string)
+                print(f"    Script {i+1} keys: {list(data.keys())[:5]}")
+                # Save for inspection
+                with open(f"output/json_data_{i+1}.json", "w") as f:
+                    json.dump(data, f, indent=2)
+                print(f"    Saved to: output/json_data_{i+1}.json")
+            except:
+                pass
+
+    # Check for Next.js data
+    next_data = soup.find("script", id="__NEXT_DATA__")
+    if next_data:
+        print("  Found __NEXT_DATA__ script!")
+        try:
+            data = json.loads(next_data.string)
+            with open("output/next_data.json", "w") as f:
+                json.dump(data, f, indent=2)
+            print("  Saved to: output/next_data.json")
+
+            # Try to find relevant data in Next.js structure
+            if "props" in data and "pageProps" in data["props"]:
+                page_props = data["props"]["pageProps"]
+                print(f"  pageProps keys: {list(page_props.keys())}")
+                findings["next_data_available"] = True
+        except:
+            pass
+
+    # 6. Analyze overall structure
+    print("\n6. PAGE STRUCTURE SUMMARY:")
+    print(f"  Total divs: {len(soup.find_all('div'))}")
+    print(f"  Total links: {len(soup.find_all('a'))}")
+    print(f"  Total buttons: {len(soup.find_all('button'))}")
+
+    # Find main content containers
+    main_containers = soup.find_all(["main", "section", "article"])
+    print(f"  Main containers: {len(main_containers)}")
+
+    # Save findings
+    with open("output/structure_findings.json", "w") as f:
+        json.dump(findings, f, indent=2)
+    print("\nFindings saved to: output/structure_findings.json")
+
+    return findings
+
+
+def explore_discovery_page():
+    """Explore the discovery/browse page"""
+    # Only these exploration helpers need the HTML parser
+    from bs4 import BeautifulSoup
+
+    print("\n" + "=" * 60)
+    print("EXPLORING DISCOVERY PAGE")
+    print("=" * 60)
+
+    url = "https://whop.com/discover"
+    print(f"\nFetching: {url}")
+
+    html = get_page(url)
+    if not html:
+        print("Failed to fetch discovery page!")
+        return
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Find community cards/links
+    print("\n1. LOOKING FOR COMMUNITY CARDS:")
+
+    # Common card patterns
+    cards = soup.find_all("a", href=re.compile("^/[^/]+$"))
+    filtered_cards = [
+        c
+        for c in cards
+        if not any(
+            skip in c.get("href", "")
+            for skip in ["/login", "/signup", "/discover", "/category"]
+        )
+    ]
+
+    print(f"  Found {len(filtered_cards)} potential community links")
+    if filtered_cards:
+        print("  First 5 community URLs:")
+        for card in filtered_cards[:5]:
+            print(f"    - {card.get('href')}: {card.text.strip()[:30]}")
+
+    # Save sample HTML
+    with open("output/sample_discovery.html", "w", encoding="utf-8") as f:
+        f.write(html)
+    print("\nSaved discovery page to: output/sample_discovery.html")
+
+
+def main():
+    """Main function - Extract community URLs from discover sitemap"""
+    print("=" * 60)
+    print("WHOP COMMUNITY URL EXTRACTOR")
+    print("=" * 60)
+    print("\nExtracting community URLs from discover sitemap")
+
+    # Create output directory
+    ensure_output_dir()
+
+    # Extract community URLs from discover sitemap
+    sample_community_url = explore_sitemap()
+
+    # COMMENTED OUT - Focus only on extracting URLs
+    # # Step 2: Explore a community page
+    # if sample_community_url:
+    #     explore_community_page(sample_community_url)
+    # else:
+    #     print("\nNo sample URL found in sitemap.")
+
+    # # Step 3: Explore discovery page
+    # explore_discovery_page()
+
+    print("\n" + "=" * 60)
+    print("EXTRACTION COMPLETE!")
+    print("=" * 60)
+    print("\nCheck the 'output' folder for:")
+    print("  - sample_discovery.txt - Community URLs from discover sitemap")
+    print("\nNext: whop-scraper scrape <batch_number>")
+
+
+if __name__ == "__main__":
+    main()
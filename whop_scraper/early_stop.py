@@ -0,0 +1,116 @@
+"""
+Incremental detector for the fields scrape_community_page needs
+Fed the community page chunk by chunk while it downloads; once the JSON-LD
+Product block (with a non-zero ratingValue) and the first priced radio button
+have both been seen, the rest of the page cannot change what gets
+extracted, so the download can stop.
+"""
+
+import json
+import re
+from html.parser import HTMLParser
+
+RADIO_CLASS_PATTERN = re.compile(r'fui-RadioButtonGroup|radio', re.I)
+PRICE_PATTERN = re.compile(r'\$([0-9,]+(?:\.[0-9]{2})?)')
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+}
+
+
+def has_rating(aggregate_rating):
+    """True if a JSON-LD aggregateRating has a ratingValue the scraper reads as a rating (present, numeric, non-zero)"""
+    if not isinstance(aggregate_rating, dict):
+        return False
+    try:
+        return float(aggregate_rating.get('ratingValue') or 0) != 0
+    except (TypeError, ValueError):
+        return False
+
+
+class RequiredFieldsDetector(HTMLParser):
+    """
+    HTMLParser that watches for the JSON-LD Product and a priced radio button
+
+    `complete` becomes True once both are found. Mirrors the extraction order
+    in scrape_community_page: the first Product block and the first radio
+    element containing a price win, so nothing later in the page matters.
+    With need_price=False only the Product block is waited for (the tiered
+    crawl's head pass). The Product item itself is kept in `product`.
+    """
+
+    def __init__(self, need_price=True):
+        super().__init__(convert_charrefs=True)
+        self.need_price = need_price
+        self.product = None
+        self.product_found = False
+        self.price_found = False
+        self._product_seen = False
+
+        self._in_json_ld = False
+        self._json_ld_parts = []
+        self._depth = 0
+        self._radio_depths = []
+        self._radio_text = []
+
+    @property
+    def complete(self):
+        return self.product_found and (self.price_found or not self.need_price)
+
+    @property
+    def inside_pricing(self):
+        """True while a radio element is open - a page that ends here was cut off mid-price"""
+        return bool(self._radio_depths)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'script' and attrs.get('type') == 'application/ld+json':
+            self._in_json_ld = True
+            self._json_ld_parts = []
+
+        if tag in VOID_ELEMENTS:
+            return
+
+        self._depth += 1
+        if tag in ('div', 'span') and RADIO_CLASS_PATTERN.search(attrs.get('class') or ''):
+            self._radio_depths.append(self._depth)
+            if len(self._radio_depths) == 1:
+                self._radio_text = []
+
+    def handle_endtag(self, tag):
+        if tag == 'script' and self._in_json_ld:
+            self._in_json_ld = False
+            self._check_json_ld(''.join(self._json_ld_parts))
+
+        if tag in VOID_ELEMENTS:
+            return
+
+        if self._radio_depths and self._radio_depths[-1] == self._depth:
+            self._radio_depths.pop()
+            if not self._radio_depths and PRICE_PATTERN.search(''.join(self._radio_text)):
+                self.price_found = True
+        self._depth = max(self._depth - 1, 0)
+
+    def handle_data(self, data):
+        if self._in_json_ld:
+            self._json_ld_parts.append(data)
+        if self._radio_depths:
+            self._radio_text.append(data)
+
+    def _check_json_ld(self, text):
+        if self._product_seen:
+            return
+        try:
+            structured_data = json.loads(text)
+        except ValueError:
+            return
+
+        items = structured_data if isinstance(structured_data, list) else [structured_data]
+        for item in items:
+            if isinstance(item, dict) and item.get('@type') == 'Product':
+                self._product_seen = True
+                self.product = item
+                # Without a non-zero ratingValue the scraper falls back to
+                # scanning the whole page for ratings, so keep reading then
+                self.product_found = has_rating(item.get('aggregateRating'))
+                return
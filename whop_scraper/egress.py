@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Egress pool rotation for get_page
+Spreads requests over several outbound endpoints (HTTP proxies, local source
+addresses or a direct connection), each with its own rate limit and health
+score. Endpoints are chosen by weighted least-load; ones that keep failing
+are quarantined for a while and then re-admitted on probation.
+
+The pool is per process - under the supervisor the shared global rate limit
+still caps the total across workers.
+
+Config (egress.json, loaded by get_page when present):
+    [
+      {"name": "proxy-a", "proxy": "http://10.0.0.5:3128", "rate": 1.0, "weight": 2},
+      {"name": "nic-2", "source_address": "192.168.1.20", "rate": 0.5},
+      {"name": "direct", "rate": 0.5}
+    ]
+
+Usage: whop-scraper egress check [config.json] [url]
+       whop-scraper egress standin-proxy <port>  (local forwarding proxy for testing)
+"""
+
+import json
+import select
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Configuration
+EGRESS_CONFIG_FILE = "egress.json"
+DEFAULT_RATE = 0.5  # Requests per second per endpoint
+HEALTH_DECAY = 0.8  # EWMA weight of the previous health score
+MIN_HEALTH = 0.3  # Below this an endpoint is quarantined
+QUARANTINE_SECONDS = 120
+PROBATION_HEALTH = 0.5  # Health given to an endpoint when it is re-admitted
+TUNNEL_IDLE_TIMEOUT = 60  # Seconds a stand-in proxy tunnel may sit idle before it is closed
+TUNNEL_CHUNK_SIZE = 64 * 1024
+
+
+class SourceAddressAdapter(HTTPAdapter):
+    """Transport adapter that binds outgoing connections to a local address"""
+
+    def __init__(self, source_address, **kwargs):
+        self.source_address = (source_address, 0)
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["source_address"] = self.source_address
+        super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, *args, **kwargs):
+        kwargs["source_address"] = self.source_address
+        return super().proxy_manager_for(*args, **kwargs)
+
+
+class EgressEndpoint:
+    """One outbound route with its own session, rate budget and health score"""
+
+    def __init__(self, name, proxy=None, source_address=None, rate=DEFAULT_RATE, weight=1.0):
+        self.name = name
+        self.proxy = proxy
+        self.source_address = source_address
+        self.interval = 1.0 / rate
+        self.weight = weight
+
+        self.health = 1.0
+        self.in_flight = 0
+        self.next_slot = 0.0
+        self.quarantined_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+        self.session = requests.Session()
+        if proxy:
+            self.session.proxies = {"http": proxy, "https": proxy}
+        if source_address:
+            adapter = SourceAddressAdapter(source_address)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+
+    def get(self, url, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    def __repr__(self):
+        return f"EgressEndpoint({self.name!r}, health={self.health:.2f}, in_flight={self.in_flight})"
+
+
+class EgressPool:
+    """Thread-safe weighted least-load selection over healthy endpoints"""
+
+    def __init__(self, endpoints, log=print):
+        if not endpoints:
+            raise ValueError("Egress pool needs at least one endpoint")
+        self.endpoints = endpoints
+        self.log = log
+        self._lock = threading.Lock()
+
+    def _readmit(self, now):
+        for endpoint in self.endpoints:
+            if endpoint.quarantined_until and now >= endpoint.quarantined_until:
+                endpoint.quarantined_until = 0.0
+                endpoint.health = PROBATION_HEALTH
+                self.log(f"Egress {endpoint.name} re-admitted on probation")
+
+    def acquire(self):
+        """Pick an endpoint and wait for its rate budget. Pair with release()"""
+        while True:
+            with self._lock:
+                now = time.time()
+                self._readmit(now)
+                healthy = [e for e in self.endpoints if not e.quarantined_until]
+                if healthy:
+                    endpoint = min(
+                        healthy,
+                        key=lambda e: (e.in_flight / e.weight, max(e.next_slot, now), -e.health),
+                    )
+                    slot = max(now, endpoint.next_slot)
+                    endpoint.next_slot = slot + endpoint.interval
+                    endpoint.in_flight += 1
+                    endpoint.requests += 1
+                    break
+                wait = min(e.quarantined_until for e in self.endpoints) - now
+
+            # Every endpoint is quarantined - wait for the first re-admission
+            time.sleep(max(wait, 0.1))
+
+        if slot > now:
+            time.sleep(slot - now)
+        return endpoint
+
+    def release(self, endpoint, ok):
+        """Report the outcome of a request made through `endpoint`"""
+        with self._lock:
+            endpoint.in_flight -= 1
+            endpoint.health = endpoint.health * HEALTH_DECAY + (1 - HEALTH_DECAY) * (1.0 if ok else 0.0)
+            if not ok:
+                endpoint.failures += 1
+            if endpoint.health < MIN_HEALTH and not endpoint.quarantined_until:
+                endpoint.quarantined_until = time.time() + QUARANTINE_SECONDS
+                self.log(f"Egress {endpoint.name} quarantined for {QUARANTINE_SECONDS}s (health {endpoint.health:.2f})")
+
+    def cancel(self, endpoint):
+        """Hand back an acquired endpoint without sending through it"""
+        with self._lock:
+            endpoint.in_flight -= 1
+
+    def get(self, url, **kwargs):
+        """GET through the pool; 429s, 5xx and connection errors count against the endpoint"""
+        return self.send(self.acquire(), url, **kwargs)
+
+    def send(self, endpoint, url, **kwargs):
+        """GET through an endpoint from acquire(), for callers that wait for it before timing the request"""
+        try:
+            response = endpoint.get(url, **kwargs)
+        except Exception:
+            self.release(endpoint, False)
+            raise
+        self.release(endpoint, response.status_code != 429 and response.status_code < 500)
+        return response
+
+    def stats(self):
+        """Per-endpoint counters for status output"""
+        with self._lock:
+            return [
+                {
+                    "name": e.name,
+                    "health": round(e.health, 3),
+                    "requests": e.requests,
+                    "failures": e.failures,
+                    "in_flight": e.in_flight,
+                    "quarantined": bool(e.quarantined_until),
+                }
+                for e in self.endpoints
+            ]
+
+
+def load_egress_pool(path=EGRESS_CONFIG_FILE, log=print):
+    """Build an EgressPool from a JSON list of endpoint settings"""
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    endpoints = [
+        EgressEndpoint(
+            name=item.get("name", f"egress-{i}"),
+            proxy=item.get("proxy"),
+            source_address=item.get("source_address"),
+            rate=item.get("rate", DEFAULT_RATE),
+            weight=item.get("weight", 1.0),
+        )
+        for i, item in enumerate(config, 1)
+    ]
+    return EgressPool(endpoints, log=log)
+
+
+def tunnel(client, upstream, idle_timeout=TUNNEL_IDLE_TIMEOUT):
+    """Relay bytes both ways until either side closes or the tunnel goes idle"""
+    sockets = [client, upstream]
+    while True:
+        readable, _, errored = select.select(sockets, [], sockets, idle_timeout)
+        if errored or not readable:
+            return
+        for sock in readable:
+            data = sock.recv(TUNNEL_CHUNK_SIZE)
+            if not data:
+                return
+            (upstream if sock is client else client).sendall(data)
+
+
+class StandinProxyHandler(BaseHTTPRequestHandler):
+    """
+    Minimal proxy for local testing: forwards plain-HTTP GETs and tunnels
+    CONNECT, so https://whop.com requests take the same path through it as
+    through a production proxy
+    """
+
+    def do_CONNECT(self):
+        host, _, port = self.path.rpartition(":")
+        try:
+            upstream = socket.create_connection((host, int(port)), timeout=30)
+        except (OSError, ValueError) as e:
+            self.send_error(502, str(e))
+            return
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        self.close_connection = True
+        with upstream:
+            try:
+                tunnel(self.connection, upstream)
+            except OSError:
+                pass  # Either side reset the connection - the tunnel is over
+
+    def do_GET(self):
+        try:
+            upstream = requests.get(self.path, headers={"User-Agent": self.headers.get("User-Agent", "")}, timeout=30)
+        except Exception as e:
+            self.send_error(502, str(e))
+            return
+        body = upstream.content
+        self.send_response(upstream.status_code)
+        for header in ("Content-Type", "Retry-After"):
+            if header in upstream.headers:
+                self.send_header(header, upstream.headers[header])
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_standin_proxy(port=0):
+    """Start a stand-in proxy on localhost in a background thread. Returns the server"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandinProxyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    """Command line entry point"""
+    if len(sys.argv) < 2:
+        print(__doc__.strip())
+        sys.exit(1)
+
+    command = sys.argv[1]
+    if command == "standin-proxy":
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else 8899
+        server = ThreadingHTTPServer(("127.0.0.1", port), StandinProxyHandler)
+        print(f"Stand-in proxy listening on http://127.0.0.1:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+    elif command == "check":
+        path = sys.argv[2] if len(sys.argv) > 2 else EGRESS_CONFIG_FILE
+        url = sys.argv[3] if len(sys.argv) > 3 else "https://whop.com/robots.txt"
+        pool = load_egress_pool(path)
+        for endpoint in pool.endpoints:
+            start = time.time()
+            try:
+                status = endpoint.get(url, timeout=10).status_code
+            except Exception as e:
+                status = f"error: {e}"
+            print(f"{endpoint.name}: {status} ({time.time() - start:.2f}s)")
+
+    else:
+        print(f"Unknown command: {command}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Content-hash cache of community page extraction results
+Most pages come back byte-for-byte identical between runs but without
+validators that conditional GET could use, so re-parsing them is wasted
+CPU. Records are stored under a BLAKE2 hash of the extractor version, page
+URL and body; an unchanged body reuses the stored record and only gets a
+fresh scraped_at.
+
+The cache is a SQLite file, so batch workers in separate processes share
+it safely. It holds at most MAX_ENTRIES records, evicting the least
+recently used.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from .common import OUTPUT_DIR, ensure_output_dir, log_message
+from .community import json_default
+
+# Configuration
+EXTRACT_CACHE_FILE = f"{OUTPUT_DIR}/extract_cache.sqlite"
+MAX_ENTRIES = 200000  # About 1 KB per record
+TRIM_EVERY = 1000  # Inserts between eviction passes
+
+
+def content_key(version, url, body):
+    """Cache key for a page body as extracted by a given extractor version"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{version}\0{url}\0".encode("utf-8"))
+    digest.update(body.encode("utf-8", "replace"))
+    return digest.hexdigest()
+
+
+class ExtractCache:
+    """LRU-bounded map of content key -> extracted record (without scraped_at)"""
+
+    def __init__(self, path=EXTRACT_CACHE_FILE, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._inserts = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extract_cache (key TEXT PRIMARY KEY, record TEXT NOT NULL, used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS extract_cache_used ON extract_cache (used)")
+        self._conn.commit()
+
+    def get(self, key):
+        """The stored record for a key (as a dict), or None; marks it recently used"""
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM extract_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE extract_cache SET used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, record):
+        """Store an extracted record; scraped_at is left out, since reuse replaces it"""
+        data = {field: value for field, value in record.items() if field != "scraped_at"}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extract_cache (key, record, used) VALUES (?, ?, ?)",
+                (key, json.dumps(data, ensure_ascii=False, default=json_default), time.time()),
+            )
+            self._conn.commit()
+            self._inserts += 1
+            if self._inserts % TRIM_EVERY == 0:
+                self._trim()
+
+    def _trim(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM extract_cache").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM extract_cache WHERE key IN (SELECT key FROM extract_cache ORDER BY used LIMIT ?)",
+                (excess,),
+            )
+            self._conn.commit()
+            log_message(f"Extract cache: evicted {excess} least recently used records")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM extract_cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_extract_cache = None
+_extract_cache_failed = False
+_extract_cache_lock = threading.Lock()
+
+
+def get_extract_cache():
+    """The shared extraction cache, opened on first use (None if it can't be opened)"""
+    global _extract_cache, _extract_cache_failed
+    if _extract_cache is None and not _extract_cache_failed:
+        with _extract_cache_lock:
+            if _extract_cache is None and not _extract_cache_failed:
+                try:
+                    ensure_output_dir()
+                    _extract_cache = ExtractCache()
+                except sqlite3.Error as e:
+                    log_message(f"Extract cache unavailable, extracting every page: {e}")
+                    _extract_cache_failed = True
+    return _extract_cache
+
+
+def close_extract_cache():
+    """Close the shared cache; the next get_extract_cache() opens it again"""
+    global _extract_cache
+    with _extract_cache_lock:
+        if _extract_cache is not None:
+            _extract_cache.close()
+            _extract_cache = None
@@ -0,0 +1,591 @@
+"""
+HTTP fetching shared by discovery and scraping
+get_page wraps every request in the circuit breaker, the optional shared
+rate limiter and the optional egress pool, with jittered retries.
+
+Tail latency: a request still waiting past the observed p95 gets one hedged
+duplicate (within the rate budget, a free concurrency slot and
+HEDGE_MAX_FRACTION of all requests) and the first response wins. Inside a
+deadline_budget block every attempt, backoff sleep and body read shares one
+deadline, so a slow site can't hold a worker for retries x timeout.
+"""
+
+import codecs
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from itertools import islice
+
+import requests
+
+from . import egress
+from .circuit_breaker import CircuitBreaker, backoff_delay
+from .concurrency import MAX_LIMIT, AdaptiveLimiter
+from .common import DELAY_BETWEEN_REQUESTS, REQUEST_HEADERS, log_message
+from .early_stop import RequiredFieldsDetector
+from .profiling import stage, staged
+
+# Configuration
+STREAM_CHUNK_SIZE = 16 * 1024
+DEADLINE_CHUNK_SIZE = 2 * 1024  # Reads block until full, so smaller reads notice a deadline sooner
+MAX_PAGE_BYTES = 4 * 1024 * 1024  # Safety cap on any streamed page
+HEDGE_REQUESTS = True  # Send a duplicate of requests slower than the observed p95
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 20  # Latencies observed before hedging starts
+HEDGE_MAX_FRACTION = 0.1  # At most this share of requests get a hedged duplicate
+LATENCY_WINDOW = 500  # Recent latencies the percentile is taken over
+
+# Optional shared rate limiter (set by the supervisor). When set, every HTTP
+# request waits for the global budget instead of each worker sleeping.
+_rate_limiter = None
+
+# Circuit breaker around every request; the supervisor swaps in a shared one
+_circuit_breaker = CircuitBreaker(log=lambda message: log_message(message))
+
+# Caps requests in flight in this process, adapting to latency and 429s
+_concurrency_limiter = AdaptiveLimiter(log=lambda message: log_message(message))
+
+# Last error seen by get_page in this thread, recorded with dead letters
+_fetch_state = threading.local()
+
+# Optional pool of outbound endpoints (proxies / source addresses), loaded
+# from egress.json on first use when that file exists
+_egress_pool = None
+_egress_loaded = False
+_egress_lock = threading.Lock()
+
+
+class LatencyTracker:
+    """Rolling window of request latencies with a cached percentile"""
+
+    def __init__(self, window=LATENCY_WINDOW, percentile=HEDGE_PERCENTILE, min_samples=HEDGE_MIN_SAMPLES):
+        self.samples = deque(maxlen=window)
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._threshold = None
+        self._stale = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+            self._stale += 1
+            # Re-sorting the window every 10 samples is plenty for a p95
+            if len(self.samples) >= self.min_samples and (self._threshold is None or self._stale >= 10):
+                ordered = sorted(self.samples)
+                self._threshold = ordered[min(len(ordered) - 1, len(ordered) * self.percentile // 100)]
+                self._stale = 0
+
+    def threshold(self):
+        """Latency at the percentile, or None until enough samples are in"""
+        return self._threshold
+
+
+# Time to response per request kind (streamed responses return after the
+# headers, the rest after the whole body)
+_latency = {True: LatencyTracker(), False: LatencyTracker()}
+_hedge_stats = {"requests": 0, "hedged": 0, "hedge_won": 0}
+_hedge_lock = threading.Lock()
+# Runs hedges only; each holds a concurrency slot, so at most MAX_LIMIT are in flight
+_hedge_executor = ThreadPoolExecutor(max_workers=MAX_LIMIT, thread_name_prefix="hedge")
+
+
+def set_rate_limiter(rate_limiter):
+    """Route all requests through a shared rate limiter (anything with acquire())"""
+    global _rate_limiter
+    _rate_limiter = rate_limiter
+
+
+def set_circuit_breaker(circuit_breaker):
+    """Use a different (e.g. cross-process shared) circuit breaker for all requests"""
+    global _circuit_breaker
+    circuit_breaker.log = log_message
+    _circuit_breaker = circuit_breaker
+
+
+def set_concurrency_limiter(concurrency_limiter):
+    """Use a different concurrency limiter (see concurrency.AdaptiveLimiter for the interface)"""
+    global _concurrency_limiter
+    _concurrency_limiter = concurrency_limiter
+
+
+def set_egress_pool(egress_pool):
+    """Send all requests through an egress.EgressPool, or anything with get(url, **kwargs) (None for a direct connection)"""
+    global _egress_pool, _egress_loaded
+    _egress_pool = egress_pool
+    _egress_loaded = True
+
+
+def get_egress_pool():
+    """The configured egress pool, loading egress.json the first time if present"""
+    global _egress_pool, _egress_loaded
+    if not _egress_loaded:
+        with _egress_lock:
+            if not _egress_loaded:
+                if os.path.exists(egress.EGRESS_CONFIG_FILE):
+                    _egress_pool = egress.load_egress_pool(log=log_message)
+                    log_message(f"Using {len(_egress_pool.endpoints)} egress endpoints from {egress.EGRESS_CONFIG_FILE}")
+                _egress_loaded = True
+    return _egress_pool
+
+
+@staged("sleep")
+def pause_between_requests():
+    """Fixed delay between scrapes, unless the shared rate limiter paces requests"""
+    if _rate_limiter is None:
+        time.sleep(DELAY_BETWEEN_REQUESTS)
+
+
+def acquire_egress():
+    """
+    Wait for an egress endpoint's rate budget, or None without a pool
+
+    Done before any latency timer starts: the wait is our own politeness,
+    not the site's latency, and must not feed the hedge threshold or the
+    concurrency limiter.
+    """
+    egress_pool = get_egress_pool()
+    if egress_pool is None or not hasattr(egress_pool, "acquire"):
+        return None
+    with stage("sleep"):
+        return egress_pool.acquire()
+
+
+def http_get(url, headers, timeout=10, stream=False, endpoint=None):
+    """Single GET, through the egress pool when one is configured (and `endpoint` when already acquired)"""
+    egress_pool = get_egress_pool()
+    if egress_pool is None:
+        return requests.get(url, headers=headers, timeout=timeout, stream=stream)
+    if endpoint is not None:
+        return egress_pool.send(endpoint, url, headers=headers, timeout=timeout, stream=stream)
+    return egress_pool.get(url, headers=headers, timeout=timeout, stream=stream)
+
+
+def timed_get(url, headers, timeout=10, stream=False, endpoint=None):
+    """http_get that records its latency for the hedging threshold"""
+    if endpoint is None:
+        endpoint = acquire_egress()
+    start = time.time()
+    response = http_get(url, headers, timeout=timeout, stream=stream, endpoint=endpoint)
+    _latency[stream].observe(time.time() - start)
+    return response
+
+
+def hedge_budget_left():
+    """Whether one more hedge would stay within HEDGE_MAX_FRACTION of all requests"""
+    with _hedge_lock:
+        return _hedge_stats["hedged"] + 1 <= _hedge_stats["requests"] * HEDGE_MAX_FRACTION
+
+
+def take_hedge_budget():
+    """Count a hedge against HEDGE_MAX_FRACTION of all requests; False when it is spent"""
+    with _hedge_lock:
+        if _hedge_stats["hedged"] + 1 > _hedge_stats["requests"] * HEDGE_MAX_FRACTION:
+            return False
+        _hedge_stats["hedged"] += 1
+        return True
+
+
+def send_hedge(primary, url, headers, timeout, stream):
+    """The hedged duplicate: waits for a rate slot, then skips sending if the original already answered"""
+    if _rate_limiter is not None:
+        _rate_limiter.acquire()
+    if primary.done():
+        return None
+    return timed_get(url, headers, timeout=timeout, stream=stream)
+
+
+def start_primary(url, headers, timeout, stream, endpoint):
+    """
+    Send the original request on a thread of its own right away
+
+    Not the calling thread, which has to be free to return a hedge that
+    answers first, and not the executor, where queueing would count
+    toward the hedge delay.
+    """
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(timed_get(url, headers, timeout=timeout, stream=stream, endpoint=endpoint))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="hedge-primary", daemon=True).start()
+    return future
+
+
+def release_hedge_slot(futures, started):
+    """Free the hedge's concurrency slot once neither request is in flight"""
+    pending = [len(futures)]
+    lock = threading.Lock()
+
+    def done(_):
+        with lock:
+            pending[0] -= 1
+            last = pending[0] == 0
+        if last:
+            _concurrency_limiter.release(started, cancelled=True)
+
+    for future in futures:
+        future.add_done_callback(done)
+
+
+def close_response(future):
+    """Done-callback that releases the connection of a losing response"""
+    if not future.cancelled() and future.exception() is None and future.result() is not None:
+        future.result().close()
+
+
+def hedged_get(url, headers, timeout=10, stream=False, endpoint=None):
+    """
+    GET that sends one duplicate if no response arrived within the p95 latency
+
+    Whichever response arrives first is returned and the other is closed.
+    The duplicate uses a rate limiter slot, a concurrency slot of its own
+    and the hedge budget; without them, or before enough latencies are
+    known, this is a plain GET in the calling thread. `endpoint` is an
+    egress endpoint already acquired for the original request.
+    """
+    with _hedge_lock:
+        _hedge_stats["requests"] += 1
+    delay = _latency[stream].threshold() if HEDGE_REQUESTS else None
+    if delay is None or not hedge_budget_left():
+        return timed_get(url, headers, timeout=timeout, stream=stream, endpoint=endpoint)
+
+    primary = start_primary(url, headers, timeout, stream, endpoint)
+    try:
+        return primary.result(timeout=delay)
+    except FutureTimeout:
+        pass
+    # At the concurrency limit a duplicate would only add to the queueing
+    hedge_started = _concurrency_limiter.try_acquire()
+    if hedge_started is None:
+        return primary.result()
+    if not take_hedge_budget():
+        _concurrency_limiter.release(hedge_started, cancelled=True)
+        return primary.result()
+
+    log_message(f"No response after {delay:.2f}s (p{HEDGE_PERCENTILE}) - sending hedged request: {url}")
+    hedge = _hedge_executor.submit(send_hedge, primary, url, headers, timeout, stream)
+    release_hedge_slot([primary, hedge], hedge_started)
+    pending = {primary, hedge}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        answered = [future for future in done if future.exception() is None and future.result() is not None]
+        if answered:
+            winner = primary if primary in answered else hedge
+            for other in pending | (set(answered) - {winner}):
+                other.add_done_callback(close_response)
+            if winner is hedge:
+                with _hedge_lock:
+                    _hedge_stats["hedge_won"] += 1
+            return winner.result()
+    # Neither answered (or the hedge was never sent) - raise the original's error
+    return primary.result()
+
+
+def hedge_stats():
+    """Requests sent, hedged duplicates and hedges that answered first"""
+    with _hedge_lock:
+        return dict(_hedge_stats)
+
+
+def concurrency_stats():
+    """Current adaptive concurrency limit, requests in flight and the latency signals behind it"""
+    return _concurrency_limiter.stats()
+
+
+@contextmanager
+def deadline_budget(seconds):
+    """
+    Give every get_page call in this block (in this thread) one shared deadline
+
+    Attempts get at most the remaining time as their timeout, a retry that
+    can't finish in time isn't started, and once the deadline passes get_page
+    gives up with last_fetch_error() 'Deadline exceeded'. Time spent blocked
+    on an open circuit breaker doesn't count. Nested budgets keep the
+    earlier deadline.
+    """
+    previous = getattr(_fetch_state, 'deadline', None)
+    paused_before = getattr(_fetch_state, 'paused', 0.0)
+    deadline = time.time() + seconds
+    _fetch_state.deadline = deadline if previous is None else min(previous, deadline)
+    try:
+        yield
+    finally:
+        # Breaker waits inside this block don't count against the outer budget either
+        paused = getattr(_fetch_state, 'paused', 0.0) - paused_before
+        _fetch_state.deadline = previous if previous is None else previous + paused
+
+
+def time_remaining():
+    """Seconds left in the current deadline budget, or None outside one"""
+    deadline = getattr(_fetch_state, 'deadline', None)
+    return None if deadline is None else deadline - time.time()
+
+
+def wait_for_circuit_breaker():
+    """before_request(), keeping the time blocked out of the deadline budget. True for the half-open probe"""
+    blocked_since = time.time()
+    probe = _circuit_breaker.before_request()
+    deadline = getattr(_fetch_state, 'deadline', None)
+    if deadline is not None:
+        blocked = time.time() - blocked_since
+        _fetch_state.deadline = deadline + blocked
+        _fetch_state.paused = getattr(_fetch_state, 'paused', 0.0) + blocked
+    return probe
+
+
+def cut_by_deadline(error, budget_capped):
+    """True when a timeout came from our deadline budget rather than the site being slow"""
+    if not isinstance(error, requests.Timeout):
+        return False
+    remaining = time_remaining()
+    return budget_capped or (remaining is not None and remaining <= 0)
+
+
+@contextmanager
+def concurrency_slot(budget_capped):
+    """
+    Hold a concurrency limiter slot for one request, through its body read
+
+    Set slot["status"] to the response status; an exception counts as a
+    dropped request unless our own deadline budget cut it short. Setting
+    slot["detached"] hands the slot (slot["started"]) to whoever reads the
+    body later, e.g. hold_slot_while_reading.
+    """
+    with stage("sleep"):
+        started = _concurrency_limiter.acquire()
+    slot = {"status": None, "started": started, "detached": False}
+    try:
+        yield slot
+    except Exception as e:
+        cancelled = cut_by_deadline(e, budget_capped)
+        _concurrency_limiter.release(started, dropped=not cancelled, cancelled=cancelled)
+        raise
+    if slot["detached"]:
+        return
+    status = slot["status"]
+    _concurrency_limiter.release(started, throttled=status == 429, dropped=status is not None and status >= 500)
+
+
+def hold_slot_while_reading(items, started, url, refetch):
+    """
+    Yield a lazy reader's items, holding the request's concurrency slot until it is done
+
+    A read error part way through records a breaker failure and, while
+    retries remain, continues from refetch() (a fresh get_page with the same
+    reader), skipping the items already yielded. Without retries the error
+    is raised to the consumer.
+    """
+    yielded = 0
+    try:
+        for item in items:
+            yield item
+            yielded += 1
+    except GeneratorExit:
+        # The consumer stopped early - the body was never fully read
+        _concurrency_limiter.release(started, cancelled=True)
+        raise
+    except Exception as e:
+        _concurrency_limiter.release(started, dropped=True)
+        _circuit_breaker.record_failure()
+        _fetch_state.last_error = f"{type(e).__name__}: {e}"
+        log_message(f"Error reading {url} after {yielded} items: {e}")
+        retry_items = refetch()
+        if retry_items is None:
+            raise
+    else:
+        _concurrency_limiter.release(started)
+        return
+    yield from islice(retry_items, yielded, None)
+
+
+def read_size(deadline):
+    return STREAM_CHUNK_SIZE if deadline is None else DEADLINE_CHUNK_SIZE
+
+
+def check_deadline(deadline, url):
+    if deadline is not None and time.time() > deadline:
+        raise requests.Timeout(f"Deadline exceeded while reading {url}")
+
+
+def read_text(response, url, deadline=None, max_bytes=MAX_PAGE_BYTES):
+    """The body of a streamed response as text, abandoned once the deadline passes"""
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    parts = []
+    received = 0
+    try:
+        for chunk in response.iter_content(chunk_size=read_size(deadline)):
+            received += len(chunk)
+            parts.append(decoder.decode(chunk))
+            check_deadline(deadline, url)
+            if received >= max_bytes:
+                log_message(f"Page exceeded {max_bytes / 1024:.0f} KB cap - truncated: {url}")
+                break
+        else:
+            parts.append(decoder.decode(b'', final=True))
+    finally:
+        response.close()
+    return ''.join(parts)
+
+
+def parse_retry_after(response):
+    """Seconds from a Retry-After header (delta-seconds form only), or None"""
+    value = response.headers.get('Retry-After', '')
+    return float(value) if value.strip().isdigit() else None
+
+
+def read_until_required_fields(response, url, max_bytes=MAX_PAGE_BYTES, need_price=True, deadline=None):
+    """
+    Read a streamed response body, stopping early once the JSON-LD Product
+    and pricing markup (unless need_price is False) have been seen, or the
+    byte cap is reached. Raises requests.Timeout once the deadline passes,
+    and a RequestException for a body that ends inside the pricing markup
+    (a truncated response would otherwise yield a partial price)
+    """
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    detector = RequiredFieldsDetector(need_price=need_price)
+    parts = []
+    received = 0
+
+    try:
+        for chunk in response.iter_content(chunk_size=read_size(deadline)):
+            received += len(chunk)
+            text = decoder.decode(chunk)
+            parts.append(text)
+            check_deadline(deadline, url)
+
+            if detector is not None:
+                try:
+                    detector.feed(text)
+                except Exception:
+                    detector = None  # Unparseable markup - just read the whole page
+                if detector is not None and detector.complete:
+                    log_message(f"Required fields found after {received / 1024:.0f} KB - stopped download")
+                    break
+
+            if received >= max_bytes:
+                log_message(f"Page exceeded {max_bytes / 1024:.0f} KB cap - truncated: {url}")
+                break
+        else:
+            parts.append(decoder.decode(b'', final=True))
+            if detector is not None and detector.inside_pricing:
+                raise requests.RequestException(f"Page ended inside the pricing markup - truncated: {url}")
+    finally:
+        response.close()
+
+    return ''.join(parts)
+
+
+@staged("fetch")
+def get_page(url, retries=3, early_stop=False, timeout=10, need_price=True, reader=None):
+    """
+    Fetch a page with retry logic
+
+    Every attempt passes through the circuit breaker, which blocks while
+    whop.com is failing. Retries back off exponentially with full jitter,
+    honouring Retry-After on 429s. With early_stop the body is streamed and
+    the download ends once the community page's required fields are in
+    (just the JSON-LD Product when need_price is False). With a reader, the
+    body is streamed and reader(response) is returned instead of the text;
+    the reader must close the response. A lazy reader (an iterator) keeps
+    the request's concurrency slot until it is exhausted, and a read error
+    part way through is retried with the attempts left.
+
+    Inside a deadline_budget every attempt, backoff and body read fits in
+    the remaining time, and slow requests are hedged (see hedged_get).
+    """
+    _fetch_state.last_error = ''
+    for attempt in range(retries):
+        wait_time = backoff_delay(attempt)
+        remaining = time_remaining()
+        if remaining is not None and remaining <= 0:
+            _fetch_state.last_error = "Deadline exceeded"
+            log_message(f"Deadline budget exhausted for {url}")
+            return None
+        probe = False
+        budget_capped = False
+        try:
+            probe = wait_for_circuit_breaker()
+            if _rate_limiter is not None:
+                with stage("sleep"):
+                    _rate_limiter.acquire()
+            # Before the concurrency slot, so the limiter's RTT leaves out the egress wait
+            endpoint = acquire_egress()
+            remaining = time_remaining()
+            # The probe decides whether the breaker closes, so it must get a full timeout
+            if remaining is not None and remaining < (timeout if probe else 0.1):
+                if probe:
+                    _circuit_breaker.release_probe()
+                if endpoint is not None:
+                    get_egress_pool().cancel(endpoint)
+                _fetch_state.last_error = "Deadline exceeded"
+                log_message(f"Deadline budget exhausted for {url}")
+                return None
+            budget_capped = remaining is not None and remaining < timeout
+            attempt_timeout = remaining if budget_capped else timeout
+            deadline = getattr(_fetch_state, 'deadline', None)
+            # Under a deadline the body is always streamed so its read can be cut off
+            stream = early_stop or reader is not None or deadline is not None
+            with concurrency_slot(budget_capped) as slot:
+                response = hedged_get(url, REQUEST_HEADERS, timeout=attempt_timeout, stream=stream, endpoint=endpoint)
+                slot["status"] = response.status_code
+                if response.status_code == 200:
+                    _circuit_breaker.record_success()
+                    if reader is not None:
+                        result = reader(response)
+                        if not isinstance(result, Iterator):
+                            return result
+                        slot["detached"] = True
+                        retries_left = retries - attempt - 1
+                        refetch = lambda: get_page(url, retries_left, timeout=timeout, reader=reader) if retries_left else None
+                        return hold_slot_while_reading(result, slot["started"], url, refetch)
+                    if early_stop:
+                        return read_until_required_fields(response, url, need_price=need_price, deadline=deadline)
+                    if stream:
+                        return read_text(response, url, deadline)
+                    return response.text
+                elif response.status_code == 429 or response.status_code >= 500:
+                    retry_after = parse_retry_after(response) if response.status_code == 429 else None
+                    _circuit_breaker.record_failure(retry_after)
+                    _fetch_state.last_error = f"HTTP {response.status_code}"
+                    wait_time = max(wait_time, retry_after or 0)
+                    response.close()
+                    log_message(f"HTTP {response.status_code} for {url}. Waiting {wait_time:.1f} seconds...")
+                else:
+                    # The site answered; a 404 or similar won't change on retry
+                    _circuit_breaker.record_success()
+                    _fetch_state.last_error = f"HTTP {response.status_code}"
+                    response.close()
+                    log_message(f"HTTP {response.status_code} for {url}")
+                    return None
+        except Exception as e:
+            if not cut_by_deadline(e, budget_capped):
+                _circuit_breaker.record_failure()
+            elif probe:
+                # Our budget ran out, which says nothing about the site
+                _circuit_breaker.release_probe()
+            _fetch_state.last_error = f"{type(e).__name__}: {e}"
+            log_message(f"Error fetching {url}: {e}")
+
+        if attempt < retries - 1:
+            remaining = time_remaining()
+            if remaining is not None and wait_time >= remaining:
+                _fetch_state.last_error += " (no time left in deadline budget to retry)"
+                log_message(f"Deadline budget too short to retry {url}")
+                return None
+            with stage("sleep"):
+                time.sleep(wait_time)
+    return None
+
+
+def last_fetch_error():
+    """Error from the most recent get_page call in this thread ('' if none)"""
+    return getattr(_fetch_state, 'last_error', '')
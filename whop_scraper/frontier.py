@@ -0,0 +1,239 @@
+"""
+Memory-mapped URL frontier
+The discovery file stays one URL per line; next to it <file>.idx holds a
+fixed-width offset index with the start of every URL. Both files are
+opened with mmap, so a batch worker seeks straight to its range in constant
+time instead of reading and splitting the whole file, and the mapped pages
+are shared by every worker process through the page cache.
+
+Index layout (little-endian):
+    header  magic (8 bytes), URL count, indexed data size, data mtime_ns
+    body    one unsigned 64-bit start offset per URL
+Only lines starting with https:// are indexed, like iter_discovery_urls.
+An index whose recorded size and mtime no longer match the data file is
+rebuilt when the frontier is opened. append_urls() extends both files in
+place (one writer at a time); count_urls() never writes.
+"""
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+INDEX_MAGIC = b"WSFRIDX1"
+HEADER = struct.Struct("<8sQQq")
+OFFSET_SIZE = 8
+URL_PREFIX = b"https://"
+LINE_END_CHARS = b"\r\n\t "
+
+
+def index_file_path(data_file):
+    return data_file + ".idx"
+
+
+def offsets_to_bytes(offsets):
+    if sys.byteorder != "little":
+        offsets = array("Q", offsets)
+        offsets.byteswap()
+    return offsets.tobytes()
+
+
+def write_index(data_file, count, offsets_bytes, stat):
+    path = index_file_path(data_file)
+    # A temp file of its own, so processes rebuilding at once can't mix their writes
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(INDEX_MAGIC, count, stat.st_size, stat.st_mtime_ns))
+            f.write(offsets_bytes)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def build_index(data_file):
+    """Scan the data file once and write its offset index. Returns the URL count"""
+    stat = os.stat(data_file)
+    offsets = array("Q")
+    position = 0
+    with open(data_file, "rb") as f:
+        for line in f:
+            stripped = line.lstrip()
+            if stripped.startswith(URL_PREFIX):
+                offsets.append(position + len(line) - len(stripped))
+            position += len(line)
+    write_index(data_file, len(offsets), offsets_to_bytes(offsets), stat)
+    return len(offsets)
+
+
+def read_index_header(data_file):
+    """(count, size, mtime_ns) from the index header, or None if there is no valid index"""
+    try:
+        with open(index_file_path(data_file), "rb") as f:
+            header = f.read(HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    magic, count, size, mtime_ns = HEADER.unpack(header)
+    return (count, size, mtime_ns) if magic == INDEX_MAGIC else None
+
+
+def count_urls(data_file):
+    """URL count from a current index, else by scanning the file; never writes (raises FileNotFoundError)"""
+    stat = os.stat(data_file)
+    header = read_index_header(data_file)
+    if header is not None and header[1:] == (stat.st_size, stat.st_mtime_ns):
+        return header[0]
+    with open(data_file, "rb") as f:
+        return sum(1 for line in f if line.lstrip().startswith(URL_PREFIX))
+
+
+def ensure_index(data_file):
+    """Rebuild the index if it is missing or doesn't describe the data file. Returns the URL count"""
+    stat = os.stat(data_file)  # FileNotFoundError when there is no data file
+    header = read_index_header(data_file)
+    if header is not None and header[1:] == (stat.st_size, stat.st_mtime_ns):
+        return header[0]
+    return build_index(data_file)
+
+
+def append_urls(data_file, urls):
+    """Append URLs to the data file and its index without rewriting either. Returns the new count"""
+    if not os.path.exists(data_file):
+        open(data_file, "wb").close()
+    count = ensure_index(data_file)
+    offsets = array("Q")
+
+    with open(data_file, "r+b") as data:
+        data.seek(0, os.SEEK_END)
+        position = data.tell()
+        if position:
+            data.seek(position - 1)
+            if data.read(1) != b"\n":
+                data.write(b"\n")
+                position += 1
+        for url in urls:
+            line = url.strip().encode("utf-8")
+            if not line.startswith(URL_PREFIX):
+                continue
+            offsets.append(position)
+            data.write(line + b"\n")
+            position += len(line) + 1
+
+    stat = os.stat(data_file)
+    count += len(offsets)
+    with open(index_file_path(data_file), "r+b") as index:
+        index.seek(HEADER.size + (count - len(offsets)) * OFFSET_SIZE)
+        index.write(offsets_to_bytes(offsets))
+        # The header goes last: readers trust its count and stamp
+        index.seek(0)
+        index.write(HEADER.pack(INDEX_MAGIC, count, stat.st_size, stat.st_mtime_ns))
+    return count
+
+
+class Frontier:
+    """
+    Read-only view of the discovery file through its mmapped offset index
+
+    len() is the URL count; frontier[i] is one URL, frontier[a:b] a lazy
+    FrontierView. url_bytes() returns zero-copy memoryview slices.
+    """
+
+    def __init__(self, data_file):
+        self.data_file = data_file
+        self.count = ensure_index(data_file)
+        self._data = None
+        self._index = None
+        self._offsets = None
+        if self.count:
+            with open(data_file, "rb") as f:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            with open(index_file_path(data_file), "rb") as f:
+                self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._offsets = memoryview(self._index)[HEADER.size:HEADER.size + self.count * OFFSET_SIZE].cast("Q")
+            self._view = memoryview(self._data)
+
+    def __len__(self):
+        return self.count
+
+    def _offset(self, i):
+        offset = self._offsets[i]
+        if sys.byteorder != "little":
+            offset = int.from_bytes(offset.to_bytes(OFFSET_SIZE, "big"), "little")
+        return offset
+
+    def url_bytes(self, i):
+        """URL i as a memoryview into the mapped data file (no copy)"""
+        start = self._offset(i)
+        end = self._data.find(b"\n", start)
+        if end == -1:
+            end = len(self._data)
+        while end > start and self._data[end - 1] in LINE_END_CHARS:
+            end -= 1
+        return self._view[start:end]
+
+    def iter_bytes(self, start=0, stop=None):
+        for i in range(*slice(start, stop).indices(self.count)):
+            yield self.url_bytes(i)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.count)
+            if step != 1:
+                raise ValueError("Frontier slices don't support a step")
+            return FrontierView(self, start, max(start, stop))
+        if key < 0:
+            key += self.count
+        if not 0 <= key < self.count:
+            raise IndexError("frontier index out of range")
+        return str(self.url_bytes(key), "utf-8")
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def close(self):
+        if self._data is not None:
+            self._offsets.release()
+            self._view.release()
+            self._index.close()
+            self._data.close()
+            self._data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class FrontierView:
+    """URLs [start:stop] of a Frontier, decoded only as they are iterated"""
+
+    def __init__(self, frontier, start, stop):
+        self.frontier = frontier
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __iter__(self):
+        for url in self.frontier.iter_bytes(self.start, self.stop):
+            yield str(url, "utf-8")
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("Frontier slices don't support a step")
+            return FrontierView(self.frontier, self.start + start, self.start + max(start, stop))
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("frontier index out of range")
+        return self.frontier[self.start + key]
@@ -0,0 +1,146 @@
+"""
+Single-pass multi-leaderboard ranking
+Every configured leaderboard keeps a bounded min-heap per group, so one pass
+over the scored communities fills all of them at once: O(n log k) per view
+instead of a full re-sort, and adding a view costs one heap push per record.
+
+Leaderboards come from leaderboards.json when present, otherwise from
+DEFAULT_LEADERBOARDS:
+    [
+      {"name": "category", "group_by": "category", "top": 20},
+      {"name": "paid_top", "group_by": "pricing", "groups": ["paid"], "top": 50}
+    ]
+group_by is one of GROUP_KEYS; "groups" optionally limits which groups are
+written. Each (leaderboard, group) becomes one CSV in output/leaderboards/.
+"""
+
+import csv
+import heapq
+import json
+import os
+import re
+
+from .common import OUTPUT_DIR
+
+# Configuration
+LEADERBOARD_CONFIG_FILE = "leaderboards.json"
+LEADERBOARD_DIR = f"{OUTPUT_DIR}/leaderboards"
+DEFAULT_TOP = 20
+DEFAULT_LEADERBOARDS = [
+    {"name": "category", "group_by": "category", "top": DEFAULT_TOP},
+    {"name": "price_band", "group_by": "price_band", "top": DEFAULT_TOP},
+    {"name": "pricing", "group_by": "pricing", "top": DEFAULT_TOP},
+]
+# Monthly price bands: (upper bound exclusive, label)
+PRICE_BANDS = [(50, "under_50"), (100, "50_to_100"), (250, "100_to_250"), (float("inf"), "250_plus")]
+
+
+def price_band(community):
+    price = community.get("price_monthly_usd")
+    if price is None or price == "":
+        return "unknown"  # Tier-1 record without a price
+    if community.get("is_free") or price <= 0:
+        return "free"
+    for upper, label in PRICE_BANDS:
+        if price < upper:
+            return label
+
+
+def pricing(community):
+    band = price_band(community)
+    return band if band in ("free", "unknown") else "paid"
+
+
+GROUP_KEYS = {
+    "all": lambda community: "all",
+    "category": lambda community: community.get("category") or "Other",
+    "price_band": price_band,
+    "pricing": pricing,
+}
+
+
+class Leaderboard:
+    """Top `top` communities by engagement_score for each group of a grouping"""
+
+    def __init__(self, name, group_by="all", top=DEFAULT_TOP, groups=None):
+        if group_by not in GROUP_KEYS:
+            raise ValueError(f"Unknown group_by {group_by!r} for leaderboard {name!r}")
+        self.name = name
+        self.group_by = group_by
+        self.group_key = GROUP_KEYS[group_by]
+        self.top = top
+        self.groups = set(groups) if groups else None
+        self.heaps = {}  # group -> min-heap of (score, -position, community)
+
+    def add(self, community, position):
+        """
+        Offer a community; only the current top `top` of its group are kept
+
+        Ties go to the earlier position, matching the stable sort of the
+        main ranking.
+        """
+        group = self.group_key(community)
+        if self.groups is not None and group not in self.groups:
+            return
+        heap = self.heaps.setdefault(group, [])
+        item = (community.get("engagement_score", 0), -position, community)
+        if len(heap) < self.top:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+
+    def results(self):
+        """{group: [communities best first]}"""
+        return {
+            group: [item[2] for item in sorted(heap, key=lambda item: item[:2], reverse=True)]
+            for group, heap in self.heaps.items()
+        }
+
+
+def load_leaderboards(path=LEADERBOARD_CONFIG_FILE):
+    """Leaderboards from the config file, or the defaults when it doesn't exist"""
+    config = DEFAULT_LEADERBOARDS
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    return [
+        Leaderboard(item["name"], item.get("group_by", "all"), item.get("top", DEFAULT_TOP), item.get("groups"))
+        for item in config
+    ]
+
+
+def fill_leaderboards(communities, leaderboards):
+    """Single pass over scored communities, offering each one to every leaderboard"""
+    for position, community in enumerate(communities):
+        for leaderboard in leaderboards:
+            leaderboard.add(community, position)
+    return leaderboards
+
+
+def leaderboard_file(name, group):
+    slug = re.sub(r"[^a-z0-9]+", "_", str(group).lower()).strip("_") or "none"
+    if slug == "all":
+        return f"{LEADERBOARD_DIR}/{name}.csv"
+    return f"{LEADERBOARD_DIR}/{name}_{slug}.csv"
+
+
+def write_leaderboards(leaderboards, fieldnames):
+    """Write one CSV per (leaderboard, group). Returns the list of files written"""
+    os.makedirs(LEADERBOARD_DIR, exist_ok=True)
+    # Groups can disappear between runs, so don't leave their old CSVs behind
+    for name in os.listdir(LEADERBOARD_DIR):
+        if name.endswith(".csv"):
+            os.remove(os.path.join(LEADERBOARD_DIR, name))
+    files = []
+    for leaderboard in leaderboards:
+        for group, communities in sorted(leaderboard.results().items()):
+            path = leaderboard_file(leaderboard.name, group)
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+                for rank, community in enumerate(communities, 1):
+                    row = {field: community.get(field, "") for field in fieldnames}
+                    row["rank"] = rank
+                    writer.writerow(row)
+            files.append(path)
+    return files
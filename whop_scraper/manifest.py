@@ -0,0 +1,115 @@
+"""
+Batch manifest sidecars
+Every batch file written by BatchWriter gets a small <file>.manifest next to
+it with the record count, community URL range, last processed discovery
+index, byte size and a content hash. Status, resume and merge planning read
+the manifest instead of loading the batch.
+
+The content hash is chained over records (sha256 of previous hash + record
+JSON), so the writer extends it on every save without re-reading the file.
+A manifest only counts as fresh while the file's size and mtime still match.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from .common import log_message
+from .community import json_default
+from .streaming import iter_json_array
+
+
+def manifest_file_path(data_file):
+    """Sidecar path for a batch file (never matches the *.json batch glob)"""
+    return data_file + ".manifest"
+
+
+def chain_digest(digest, record):
+    """Extend a chained content hash with one record"""
+    payload = digest + json.dumps(record, sort_keys=True, ensure_ascii=False, default=json_default)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def new_manifest(data_file):
+    return {
+        "file": data_file,
+        "records": 0,
+        "first_url": None,
+        "last_url": None,
+        "last_index": None,
+        "bytes": 0,
+        "mtime": None,
+        "digest": "",
+    }
+
+
+def extend_manifest(manifest, records):
+    """Add records (in file order) to the manifest's count, URL range and hash"""
+    for record in records:
+        url = record.get("url")
+        if manifest["first_url"] is None:
+            manifest["first_url"] = url
+        manifest["last_url"] = url
+        manifest["digest"] = chain_digest(manifest["digest"], record)
+    manifest["records"] += len(records)
+    return manifest
+
+
+def save_manifest(manifest):
+    """Stamp the data file's current size and mtime and write the sidecar"""
+    data_file = manifest["file"]
+    stat = os.stat(data_file)
+    manifest["bytes"] = stat.st_size
+    manifest["mtime"] = stat.st_mtime
+    manifest["updated_at"] = datetime.now().isoformat()
+
+    path = manifest_file_path(data_file)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def is_fresh(manifest):
+    """True if the manifest still describes its data file as it is on disk"""
+    data_file = manifest.get("file")
+    if not data_file or not os.path.exists(data_file):
+        return False
+    stat = os.stat(data_file)
+    return manifest.get("bytes") == stat.st_size and manifest.get("mtime") == stat.st_mtime
+
+
+def load_manifest(data_file):
+    """The data file's manifest if it exists and is fresh, otherwise None"""
+    path = manifest_file_path(data_file)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except Exception as e:
+        log_message(f"Error reading manifest {path}: {e}")
+        return None
+    return manifest if is_fresh(manifest) else None
+
+
+def build_manifest(data_file, last_index=None):
+    """Rebuild a manifest by streaming the data file (one record in memory at a time)"""
+    manifest = new_manifest(data_file)
+    manifest["last_index"] = last_index
+    for record in iter_json_array(data_file):
+        extend_manifest(manifest, [record])
+    save_manifest(manifest)
+    return manifest
+
+
+def get_manifest(data_file, rebuild=False):
+    """The data file's fresh manifest; with rebuild, a missing or stale one is rebuilt from the data"""
+    manifest = load_manifest(data_file)
+    if manifest is None and rebuild and os.path.exists(data_file):
+        log_message(f"Rebuilding manifest for {data_file}")
+        try:
+            manifest = build_manifest(data_file)
+        except Exception as e:
+            log_message(f"Could not rebuild manifest for {data_file}: {e}")
+    return manifest
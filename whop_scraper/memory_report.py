@@ -0,0 +1,65 @@
+"""
+Periodic tracemalloc reporter
+Logs current/peak traced memory and the top allocation sites at a fixed
+interval from a background thread, so long batches can be watched for growth.
+"""
+
+import threading
+import tracemalloc
+
+# Configuration
+DEFAULT_INTERVAL = 300  # Seconds between reports
+DEFAULT_TOP = 10  # Allocation sites per report
+TRACE_FRAMES = 1
+
+
+class MemoryReporter:
+    """Background thread that logs tracemalloc statistics every `interval` seconds"""
+
+    def __init__(self, log, interval=DEFAULT_INTERVAL, top=DEFAULT_TOP):
+        self.log = log
+        self.interval = interval
+        self.top = top
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_tracing = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            self._started_tracing = True
+        self._thread = threading.Thread(target=self._run, name="memory-reporter", daemon=True)
+        self._thread.start()
+        self.log(f"Memory reporter started (every {self.interval}s, top {self.top} sites)")
+        return self
+
+    def stop(self):
+        """Log a final report and stop tracing if this reporter started it"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.report()
+        if self._started_tracing:
+            tracemalloc.stop()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.report()
+
+    def report(self):
+        """Log traced memory and the top allocation sites by size"""
+        if not tracemalloc.is_tracing():
+            return
+
+        current, peak = tracemalloc.get_traced_memory()
+        self.log(f"Memory: current {current / 1024 / 1024:.1f} MB, peak {peak / 1024 / 1024:.1f} MB")
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ]
+        )
+        for i, stat in enumerate(snapshot.statistics("lineno")[: self.top], 1):
+            frame = stat.traceback[0]
+            self.log(f"  #{i} {frame.filename}:{frame.lineno}: {stat.size / 1024:.1f} KB in {stat.count} blocks")
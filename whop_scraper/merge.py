@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Batch Results Merger for Whop Scraper
+Merges all batch JSON files into a single raw_communities.json file
+(unchanged batches are read from output/merge_cache/, keyed by content hash)
+Usage: whop-scraper merge [--yes] [--force] [--profile]
+       (--yes merges without asking for confirmation, --force merges even
+       when no batch changed since the last merge, --profile writes
+       per-stage flamegraph files to output/profile/)
+"""
+
+import os
+import json
+import glob
+import sys
+from datetime import datetime
+
+from .common import OUTPUT_DIR
+from .community import Community, json_default, load_communities
+from .dead_letter import RETRY_OUTPUT_FILE
+from .manifest import get_manifest
+from .profiling import StackProfiler, stage
+from .snapshot_store import SnapshotStore
+from .stats import OnlineStats
+
+# Configuration
+BATCH_FILE_PATTERN = f"{OUTPUT_DIR}/raw_communities_batch_*.json"
+MERGED_FILE = f"{OUTPUT_DIR}/raw_communities.json"
+MERGE_SUMMARY_FILE = f"{OUTPUT_DIR}/merge_summary.json"
+MERGE_CACHE_DIR = f"{OUTPUT_DIR}/merge_cache"  # <digest>.jsonl: a batch's records with repeated URLs dropped
+
+
+def batch_manifests(batch_files):
+    """{batch file: manifest or None}, rebuilding missing or stale manifests"""
+    return {batch_file: get_manifest(batch_file, rebuild=True) for batch_file in batch_files}
+
+
+def cache_file_path(digest):
+    return os.path.join(MERGE_CACHE_DIR, f"{digest}.jsonl")
+
+
+def batch_contribution(batch_file, digest):
+    """
+    The batch's communities, first occurrence of each URL only
+
+    Kept in MERGE_CACHE_DIR under the batch's content hash, so a merge
+    after one batch changed parses only that batch. Returns (communities,
+    whether they came from the cache).
+    """
+    if digest and os.path.exists(cache_file_path(digest)):
+        with open(cache_file_path(digest), "r", encoding="utf-8") as f:
+            return [Community(json.loads(line)) for line in f if line.strip()], True
+
+    with stage("load"):
+        communities = load_communities(batch_file)
+    seen_urls = set()
+    unique_communities = []
+    for community in communities:
+        url = community.get("url", "")
+        if url and url not in seen_urls:
+            seen_urls.add(url)
+            unique_communities.append(community)
+
+    if digest:
+        os.makedirs(MERGE_CACHE_DIR, exist_ok=True)
+        path = cache_file_path(digest)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            for community in unique_communities:
+                f.write(json.dumps(community, ensure_ascii=False, default=json_default) + "\n")
+        os.replace(path + ".tmp", path)
+    return unique_communities, False
+
+
+def prune_merge_cache(digests):
+    """Delete cached contributions of batch contents that no longer exist"""
+    if not os.path.isdir(MERGE_CACHE_DIR):
+        return
+    keep = {f"{digest}.jsonl" for digest in digests.values() if digest}
+    for name in os.listdir(MERGE_CACHE_DIR):
+        if name not in keep:
+            os.remove(os.path.join(MERGE_CACHE_DIR, name))
+
+
+def merged_file_stamp():
+    """[size, mtime] of the merged file, to notice it being rewritten by another step"""
+    stat = os.stat(MERGED_FILE)
+    return [stat.st_size, stat.st_mtime]
+
+
+def unchanged_since_last_merge(digests):
+    """True if the merged file is still the one built from exactly these batch contents"""
+    if not os.path.exists(MERGED_FILE) or not os.path.exists(MERGE_SUMMARY_FILE):
+        return False
+    try:
+        with open(MERGE_SUMMARY_FILE, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except Exception:
+        return False
+    return (
+        None not in digests.values()
+        and previous.get("batch_digests") == digests
+        and previous.get("merged_file_stamp") == merged_file_stamp()
+    )
+
+
+def merge_statistics():
+    """Everything the merge summary reports, filled during the dedupe pass"""
+    paid = lambda c: not c.get("is_free", False) and c.get("price_monthly_usd", 0) > 0
+    return (
+        OnlineStats()
+        .counts("pricing", lambda c: "free" if c.get("is_free", False) else "paid")
+        .counts("category", "category", default="Unknown")
+        .numeric("paid_price_monthly_usd", "price_monthly_usd", where=paid)
+        .numeric("average_rating", "average_rating", where=lambda c: c.get("average_rating", 0) > 0)
+        .numeric("reviews_count", "reviews_count")
+        .top("highest_priced", "price_monthly_usd", 5, fields=["community_name", "url", "price_monthly_usd"])
+    )
+
+
+def merge_batch_files(force=False):
+    """Merge all batch JSON files into a single file (skipped if no batch changed, unless force)"""
+    print("=== MERGING BATCH RESULTS ===")
+    print(f"Start time: {datetime.now()}")
+
+    # Find all batch files
+    batch_files = glob.glob(BATCH_FILE_PATTERN)
+
+    if not batch_files:
+        print("No batch files found to merge!")
+        print("Expected files: output/raw_communities_batch_1.json, output/raw_communities_batch_2.json, etc.")
+        return
+
+    # Sort by batch number
+    batch_files.sort(key=lambda x: int(x.split('_')[-1].replace('.json', '')))
+
+    # Communities recovered by the dead-letter retry pass go in after the batches
+    if os.path.exists(RETRY_OUTPUT_FILE):
+        batch_files.append(RETRY_OUTPUT_FILE)
+
+    print(f"Found {len(batch_files)} batch files to merge:")
+    for file in batch_files:
+        print(f"  - {file}")
+
+    manifests = batch_manifests(batch_files)
+    digests = {batch_file: manifest["digest"] if manifest else None for batch_file, manifest in manifests.items()}
+    if not force and unchanged_since_last_merge(digests):
+        print(f"\nNo batch changed since the last merge - {MERGED_FILE} is up to date (use --force to merge anyway)")
+        return
+
+    all_communities = []
+    total_communities = 0
+
+    # Process each batch file; unchanged ones come from the merge cache
+    for batch_file in batch_files:
+        print(f"\nProcessing: {batch_file}")
+
+        try:
+            communities, cached = batch_contribution(batch_file, digests[batch_file])
+
+            all_communities.extend(communities)
+            manifest = manifests[batch_file]
+            total_communities += manifest["records"] if manifest else len(communities)
+            source = " (unchanged, from the merge cache)" if cached else ""
+            print(f"  Added {len(communities)} communities from {batch_file}{source}")
+
+        except Exception as e:
+            print(f"  Error reading {batch_file}: {e}")
+
+    prune_merge_cache(digests)
+
+    print(f"\n=== MERGE SUMMARY ===")
+    print(f"Total communities collected: {total_communities}")
+    print(f"Batch files processed: {len(batch_files)}")
+
+    if all_communities:
+        # Remove duplicates based on URL, collecting the statistics on the way
+        seen_urls = set()
+        unique_communities = []
+        statistics = merge_statistics()
+
+        with stage("dedupe"):
+            for community in all_communities:
+                url = community.get("url", "")
+                if url and url not in seen_urls:
+                    seen_urls.add(url)
+                    unique_communities.append(community)
+                    statistics.add(community)
+        report = statistics.report()
+
+        print(f"Unique communities (after deduplication): {len(unique_communities)}")
+
+        # Save merged results
+        output_file = MERGED_FILE
+        with stage("save"), open(output_file, "w", encoding="utf-8") as f:
+            json.dump(unique_communities, f, indent=2, ensure_ascii=False, default=json_default)
+
+        print(f"Merged results saved to: {output_file}")
+
+        # Record only the fields that changed since the last merge
+        with stage("snapshots"):
+            store = SnapshotStore()
+            changed = store.record(unique_communities)
+        print(f"Snapshot store: {changed} communities changed ({store.path})")
+
+        # Create summary file
+        summary = {
+            "merge_timestamp": datetime.now().isoformat(),
+            "total_batch_files_processed": len(batch_files),
+            "total_communities_found": total_communities,
+            "unique_communities": len(unique_communities),
+            "duplicates_removed": total_communities - len(unique_communities),
+            "batch_files": batch_files,
+            "batch_digests": digests,
+            "merged_file_stamp": merged_file_stamp(),
+            "statistics": report
+        }
+
+        with open(MERGE_SUMMARY_FILE, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+        print(f"Merge summary saved to: {MERGE_SUMMARY_FILE}")
+
+        # Show some statistics
+        print(f"\n=== COMMUNITY STATISTICS ===")
+
+        # Count by price ranges
+        print(f"Free communities: {report['counts']['pricing'].get('free', 0)}")
+        print(f"Paid communities: {report['counts']['pricing'].get('paid', 0)}")
+
+        # Price statistics for paid communities
+        paid_prices = report["numeric"]["paid_price_monthly_usd"]
+        if paid_prices["count"]:
+            print(f"Average price (paid communities): ${paid_prices['mean']:.2f}/month")
+            print(f"Price range: ${paid_prices['min']:.2f} - ${paid_prices['max']:.2f}/month")
+            print(f"Median price (paid communities): ${paid_prices['quantiles']['p50']:.2f}/month")
+
+        # Communities with ratings
+        ratings = report["numeric"]["average_rating"]
+        print(f"Communities with ratings: {ratings['count']}")
+        if ratings["count"]:
+            print(f"Average rating: {ratings['mean']:.2f}")
+
+        print(f"\n=== TOP 5 HIGHEST PRICED COMMUNITIES ===")
+        for i, community in enumerate(report["top"]["highest_priced"]):
+            name = community.get("community_name", "Unknown")
+            price = community.get("price_monthly_usd", 0)
+            print(f"{i+1}. {name}: ${price:.2f}/month")
+
+        print(f"\n=== COMMUNITIES BY CATEGORY ===")
+        for category, count in report["counts"]["category"].items():
+            print(f"{category}: {count} communities")
+
+    else:
+        print("No communities found to merge!")
+
+    print(f"\n=== MERGE COMPLETED ===")
+    print(f"End time: {datetime.now()}")
+    print("\nReady for ranking analysis! Run 'whop-scraper rank' next.")
+
+
+def show_batch_status():
+    """Show status of all batch files"""
+    print("\n=== BATCH STATUS ===")
+
+    batch_files = glob.glob(BATCH_FILE_PATTERN)
+
+    if not batch_files:
+        print("No batch files found")
+        return
+
+    batch_files.sort(key=lambda x: int(x.split('_')[-1].replace('.json', '')))
+
+    total_communities = 0
+    for batch_file in batch_files:
+        batch_num = batch_file.split('_')[-1].replace('.json', '')
+        manifest = get_manifest(batch_file)
+        if manifest is not None:
+            total_communities += manifest["records"]
+            last_index = manifest.get("last_index")
+            progress = f" (up to discovery index {last_index})" if last_index is not None else ""
+            print(f"Batch {batch_num}: {manifest['records']} communities{progress}")
+            continue
+
+        # No fresh manifest (older run or file edited since) - count the records
+        try:
+            with open(batch_file, "r", encoding="utf-8") as f:
+                communities = json.load(f)
+            count = len(communities) if isinstance(communities, list) else 0
+            total_communities += count
+            print(f"Batch {batch_num}: {count} communities (no manifest)")
+        except Exception as e:
+            print(f"Error reading {batch_file}: {e}")
+
+    print(f"\nTotal communities across all batches: {total_communities}")
+
+
+def main():
+    """Main function"""
+    print("=== WHOP SCRAPER BATCH MERGER ===")
+
+    # Ensure output directory exists
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    # Show current batch status
+    show_batch_status()
+
+    # Ask for confirmation unless running unattended
+    print("\nThis will merge all batch files into raw_communities.json")
+    if "--yes" in sys.argv or "-y" in sys.argv:
+        response = "y"
+    else:
+        response = input("Continue? (y/n): ").lower().strip()
+
+    if response == 'y' or response == 'yes':
+        profiler = StackProfiler("merge").start() if "--profile" in sys.argv else None
+        try:
+            merge_batch_files(force="--force" in sys.argv)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+    else:
+        print("Merge cancelled")
+
+
+if __name__ == "__main__":
+    main()
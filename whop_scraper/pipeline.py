@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Whop Scraper Pipeline - discover -> scrape -> merge -> rank in one process
+Stages are connected by bounded queues, so communities are scraped while
+discovery is still running and flow straight into dedup and scoring.
+Requests are paced by one rate limiter shared by every scrape thread, and
+each record is saved as it arrives, so an interrupted or crashed run
+resumes where it stopped. Runs unattended (no prompts).
+
+Usage: whop-scraper pipeline [--workers N] [--limit N] [--rate R] [--restart] [--profile] [--tiered]
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from . import dead_letter, fetch
+from .common import OUTPUT_DIR, log_message
+from .community import json_default, load_communities
+from .concurrency import MAX_LIMIT
+from .discover import iter_product_sitemap_urls
+from .fetch import concurrency_stats, pause_between_requests
+from .manifest import manifest_file_path
+from .profiling import StackProfiler
+from .rank import (
+    attach_review_velocity,
+    print_ranking_summary,
+    rank_scored_communities,
+    score_community,
+)
+from .scrape import BatchWriter, scrape_sitemap
+from .snapshot_store import SnapshotStore
+from .supervisor import DEFAULT_RATE, SharedRateLimiter
+from .tiered import deep_pass
+
+# Configuration
+DEFAULT_WORKERS = MAX_LIMIT  # Thread ceiling; fetch's adaptive limit decides how many requests are in flight
+QUEUE_SIZE = 100  # Bounded so discovery can't run far ahead of scraping
+STOP = None  # End-of-stream marker passed between stages
+PIPELINE_RECORDS_FILE = f"{OUTPUT_DIR}/pipeline_records.json"  # Every record of the current run, saved on arrival
+PIPELINE_CHECKPOINT_FILE = f"{OUTPUT_DIR}/pipeline_checkpoint.txt"  # Sitemap URLs whose record is saved, one per line
+
+
+def put_unless_stopped(target_queue, item, stop_event):
+    """Put on a bounded queue, giving up once stop_event is set. Returns True if the item was queued"""
+    while not stop_event.is_set():
+        try:
+            target_queue.put(item, timeout=1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def discover_stage(url_queue, workers, stop_event, limit=None, done_urls=frozenset()):
+    """Stream unique product sitemap URLs into the scrape queue, skipping those a previous run saved"""
+    seen = set()
+    try:
+        for sitemap_url in iter_product_sitemap_urls():
+            if stop_event.is_set():
+                break
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+            if sitemap_url not in done_urls and not put_unless_stopped(url_queue, sitemap_url, stop_event):
+                break
+            if limit and len(seen) >= limit:
+                break
+    except Exception as e:
+        # A partial discovery must not be ranked as if it were complete
+        log_message(f"Discovery stage failed: {e}")
+        stop_event.set()
+    finally:
+        log_message(f"Discovery finished: {len(seen)} product sitemap URLs ({len(seen - done_urls)} queued)")
+        for _ in range(workers):
+            put_unless_stopped(url_queue, STOP, stop_event)
+
+
+def scrape_stage(url_queue, record_queue, stop_event, tiered=False):
+    """Scrape each queued sitemap URL and pass (sitemap URL, community data) downstream"""
+    try:
+        while not stop_event.is_set():
+            sitemap_url = url_queue.get()
+            if sitemap_url is STOP or stop_event.is_set():
+                break
+            try:
+                community_data = scrape_sitemap(sitemap_url, tiered)
+                if community_data and not put_unless_stopped(record_queue, (sitemap_url, community_data), stop_event):
+                    break
+            except Exception as e:
+                log_message(f"Error processing sitemap {sitemap_url}: {e}")
+                dead_letter.record_failure(sitemap_url, dead_letter.PROCESSING_ERROR, f"{type(e).__name__}: {e}")
+            pause_between_requests()
+    except BaseException as e:
+        log_message(f"Scrape worker stopped by {type(e).__name__}: {e}")
+        stop_event.set()
+        raise
+    finally:
+        put_unless_stopped(record_queue, STOP, stop_event)
+
+
+def load_resume_state(restart=False):
+    """
+    (communities, sitemap URLs) saved by an interrupted run, or ([], set())
+
+    With restart the saved state is discarded and the run starts over.
+    """
+    if restart:
+        clear_resume_state()
+    if not os.path.exists(PIPELINE_RECORDS_FILE):
+        return [], set()
+
+    communities = load_communities(PIPELINE_RECORDS_FILE)
+    done_urls = set()
+    if os.path.exists(PIPELINE_CHECKPOINT_FILE):
+        with open(PIPELINE_CHECKPOINT_FILE, "r", encoding="utf-8") as f:
+            done_urls = {line.strip() for line in f if line.strip()}
+    log_message(
+        f"Resuming interrupted pipeline run: {len(communities)} communities from {PIPELINE_RECORDS_FILE}, "
+        f"{len(done_urls)} sitemaps done (use --restart to start over)"
+    )
+    return communities, done_urls
+
+
+def clear_resume_state():
+    """Delete the saved records and checkpoint of the current run"""
+    for path in (PIPELINE_RECORDS_FILE, manifest_file_path(PIPELINE_RECORDS_FILE), PIPELINE_CHECKPOINT_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def merge_rank_stage(record_queue, workers, store, writer, stop_event, resumed=()):
+    """
+    Deduplicate by URL and score each community as it arrives
+
+    Each new community is saved by `writer` and its sitemap URL appended to
+    PIPELINE_CHECKPOINT_FILE before the next one is taken. Communities from
+    an interrupted run (resumed) are already on disk and only rescored.
+    Stops early once stop_event is set. Returns (unique_communities,
+    total_received).
+    """
+    seen_urls = set()
+    unique_communities = []
+    total_received = 0
+    finished_workers = 0
+
+    for community in resumed:
+        url = community.get("url", "")
+        if url and url not in seen_urls:
+            seen_urls.add(url)
+            attach_review_velocity([community], store)
+            unique_communities.append(score_community(community))
+
+    checkpoint = open(PIPELINE_CHECKPOINT_FILE, "a", encoding="utf-8")
+    try:
+        while finished_workers < workers and not stop_event.is_set():
+            try:
+                item = record_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            if item is STOP:
+                finished_workers += 1
+                continue
+
+            sitemap_url, community = item
+            total_received += 1
+            url = community.get("url", "")
+            if url and url not in seen_urls:
+                seen_urls.add(url)
+                writer.add(community, sitemap_url)
+                attach_review_velocity([community], store)
+                unique_communities.append(score_community(community))
+                log_progress(unique_communities)
+            checkpoint.write(sitemap_url + "\n")
+            checkpoint.flush()
+    finally:
+        checkpoint.close()
+
+    return unique_communities, total_received
+
+
+def log_progress(unique_communities):
+    """Every 50 unique communities, log the count and the adaptive concurrency limit"""
+    if len(unique_communities) % 50 == 0:
+        concurrency = concurrency_stats()
+        log_message(
+            f"Pipeline progress: {len(unique_communities)} unique communities scored "
+            f"(concurrency limit {concurrency['concurrency_limit']}, {concurrency['in_flight']} in flight)"
+        )
+
+
+def run_pipeline(workers=DEFAULT_WORKERS, limit=None, tiered=False, rate=DEFAULT_RATE, restart=False):
+    """
+    Run all stages and write the merged and ranked outputs
+
+    With tiered the scrape stage keeps only head fields and the leaderboard
+    contenders are fully scraped once everything has been merged. If any
+    stage is interrupted or crashes, every stage is stopped and the records
+    saved so far stay in PIPELINE_RECORDS_FILE for the next run to resume.
+    Returns the number of communities ranked.
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    start_time = time.time()
+    log_message(f"Starting pipeline with {workers} scrape workers at {rate:g} requests/second")
+    # One pace for every scrape thread, instead of a fixed sleep per thread
+    fetch.set_rate_limiter(SharedRateLimiter(rate))
+
+    resumed, done_urls = load_resume_state(restart)
+    writer = BatchWriter(PIPELINE_RECORDS_FILE, save_every=1, bounded_memory=True)
+    # Failed URLs this run recovers are marked resolved once their record is saved
+    writer.resolve_urls = dead_letter.open_dead_letter_urls()
+
+    url_queue = queue.Queue(maxsize=QUEUE_SIZE)
+    record_queue = queue.Queue(maxsize=QUEUE_SIZE)
+    stop_event = threading.Event()
+    store = SnapshotStore()
+
+    threads = [
+        threading.Thread(
+            target=discover_stage,
+            args=(url_queue, workers, stop_event, limit, done_urls),
+            daemon=True,
+        )
+    ]
+    for _ in range(workers):
+        threads.append(
+            threading.Thread(
+                target=scrape_stage,
+                args=(url_queue, record_queue, stop_event, tiered),
+                daemon=True,
+            )
+        )
+    for thread in threads:
+        thread.start()
+
+    try:
+        communities, total_received = merge_rank_stage(record_queue, workers, store, writer, stop_event, resumed)
+        if stop_event.is_set():
+            raise RuntimeError("a pipeline stage stopped unexpectedly")
+
+        log_message(f"Merged {total_received} scraped communities into {len(communities)} unique")
+        if not communities:
+            log_message("No communities scraped - nothing to rank")
+            return 0
+
+        if tiered:
+            for community in deep_pass(communities, store=store):
+                score_community(community)
+
+        # Merged results, same format as the merge step
+        with open(f"{OUTPUT_DIR}/raw_communities.json", "w", encoding="utf-8") as f:
+            json.dump(communities, f, indent=2, ensure_ascii=False, default=json_default)
+
+        changed = store.record(communities)
+        log_message(f"Snapshot store: {changed} communities changed ({store.path})")
+
+        top_communities, csv_file, statistics = rank_scored_communities(communities)
+        print_ranking_summary(len(communities), top_communities, csv_file, statistics)
+    except BaseException as e:
+        stop_event.set()
+        reason = "Interrupted" if isinstance(e, KeyboardInterrupt) else f"Failed ({type(e).__name__}: {e})"
+        log_message(
+            f"{reason} - stopped all pipeline stages; {writer.saved} communities are saved in "
+            f"{PIPELINE_RECORDS_FILE}, run the pipeline again to resume"
+        )
+        raise
+
+    # The outputs are complete, so the next run starts fresh
+    clear_resume_state()
+
+    elapsed_time = time.time() - start_time
+    log_message(f"Pipeline complete at {datetime.now().isoformat()} ({elapsed_time / 60:.1f} minutes)")
+    return len(communities)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Run the full Whop scraping pipeline unattended")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="concurrent scrape workers")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many product sitemaps")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="requests per second across all workers")
+    parser.add_argument("--restart", action="store_true", help="discard the saved state of an interrupted run")
+    parser.add_argument("--profile", action="store_true", help="write per-stage flamegraph files to output/profile/")
+    parser.add_argument("--tiered", action="store_true", help="head fields for every page, full scrape only for contenders")
+    args = parser.parse_args()
+
+    profiler = StackProfiler("pipeline", log=log_message).start() if args.profile else None
+    try:
+        run_pipeline(
+            workers=max(args.workers, 1),
+            limit=args.limit,
+            tiered=args.tiered,
+            rate=args.rate,
+            restart=args.restart,
+        )
+    finally:
+        if profiler is not None:
+            profiler.stop()
+
+
+if __name__ == "__main__":
+    main()
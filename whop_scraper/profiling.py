@@ -0,0 +1,190 @@
+"""
+Sampling profiler with per-stage flamegraph output
+A background thread samples every thread's Python stack at a fixed interval
+and files each sample under the stage that thread is in (fetch, parse,
+extract, save, ...). On stop it writes one collapsed-stack file per stage,
+readable by flamegraph.pl / speedscope / inferno, plus a top-functions
+summary.
+
+Code marks stages with `@staged("fetch")` on a function or
+`with stage("parse"):` around a statement. When no profiler is running both
+reduce to a single global check, so the markers cost nothing measurable.
+"""
+
+import functools
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+from .common import OUTPUT_DIR
+
+# Configuration
+PROFILE_DIR = f"{OUTPUT_DIR}/profile"
+DEFAULT_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples
+DEFAULT_TOP = 15  # Functions per stage in the summary
+UNSTAGED = "other"
+
+_profiler = None  # The running StackProfiler, if any
+_NO_STAGE = nullcontext()
+
+
+def stage(label):
+    """Context manager that attributes the current thread's samples to `label`"""
+    if _profiler is None:
+        return _NO_STAGE
+    return _profiler.stage(label)
+
+
+def staged(label):
+    """Decorator form of stage() for a whole function"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return func(*args, **kwargs)
+            with _profiler.stage(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def frame_name(code):
+    return f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class _Stage:
+    """Sets the calling thread's stage label for the duration of a with block"""
+
+    def __init__(self, stages, label):
+        self.stages = stages
+        self.label = label
+
+    def __enter__(self):
+        thread_id = threading.get_ident()
+        self.previous = self.stages.get(thread_id)
+        self.stages[thread_id] = self.label
+
+    def __exit__(self, *exc):
+        thread_id = threading.get_ident()
+        if self.previous is None:
+            self.stages.pop(thread_id, None)
+        else:
+            self.stages[thread_id] = self.previous
+        return False
+
+
+class StackProfiler:
+    """
+    Wall-clock stack sampler for one entry point (scrape, merge, rank, ...)
+
+    Counts are kept per stage as {stack_tuple: samples}. Wall-clock sampling
+    means time spent sleeping or waiting on the network shows up too.
+    """
+
+    def __init__(self, name, log=print, interval=DEFAULT_SAMPLE_INTERVAL, top=DEFAULT_TOP):
+        self.name = name
+        self.log = log
+        self.interval = interval
+        self.top = top
+        self.samples = {}  # stage -> {stack: count}
+        self._stages = {}  # thread id -> current stage label
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_at = None
+
+    def stage(self, label):
+        return _Stage(self._stages, label)
+
+    def start(self):
+        global _profiler
+        _profiler = self
+        self._started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="stack-profiler", daemon=True)
+        self._thread.start()
+        self.log(f"Profiling {self.name}: sampling stacks every {self.interval * 1000:g} ms")
+        return self
+
+    def stop(self):
+        """Stop sampling and write the collapsed stacks and summary. Returns the output directory"""
+        global _profiler
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if _profiler is self:
+            _profiler = None
+        return self.write()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(own_id)
+
+    def sample(self, skip_thread_id=None):
+        """Record the current stack of every thread except the sampler's"""
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip_thread_id:
+                continue
+            stack = []
+            while frame is not None:
+                # Leave the staged() wrappers out of the stacks
+                if frame.f_code.co_filename != __file__:
+                    stack.append(frame_name(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            counts = self.samples.setdefault(self._stages.get(thread_id, UNSTAGED), {})
+            key = tuple(stack)
+            counts[key] = counts.get(key, 0) + 1
+
+    def top_functions(self, counts):
+        """[(function, self_samples, total_samples)] sorted by self samples"""
+        self_counts = {}
+        total_counts = {}
+        for stack, count in counts.items():
+            if not stack:
+                continue
+            self_counts[stack[-1]] = self_counts.get(stack[-1], 0) + count
+            for function in set(stack):
+                total_counts[function] = total_counts.get(function, 0) + count
+        ranked = sorted(self_counts.items(), key=lambda item: item[1], reverse=True)
+        return [(function, count, total_counts[function]) for function, count in ranked[: self.top]]
+
+    def write(self, profile_dir=PROFILE_DIR):
+        """Write <stage>.collapsed, all.collapsed and summary.txt into a per-run directory"""
+        run_dir = os.path.join(profile_dir, f"{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        os.makedirs(run_dir, exist_ok=True)
+
+        with open(os.path.join(run_dir, "all.collapsed"), "w", encoding="utf-8") as all_file:
+            for stage_label, counts in self.samples.items():
+                with open(os.path.join(run_dir, f"{stage_label}.collapsed"), "w", encoding="utf-8") as f:
+                    for stack, count in counts.items():
+                        f.write(f"{';'.join(stack)} {count}\n")
+                        # The stage becomes the root frame in the combined graph
+                        all_file.write(f"{';'.join((stage_label,) + stack)} {count}\n")
+
+        total = sum(sum(counts.values()) for counts in self.samples.values()) or 1
+        elapsed = time.time() - self._started_at if self._started_at else 0.0
+        lines = [
+            f"Profile of {self.name}: {elapsed:.1f}s wall clock, {total} samples "
+            f"every {self.interval * 1000:g} ms (all threads)",
+            "",
+        ]
+        by_size = sorted(self.samples.items(), key=lambda item: sum(item[1].values()), reverse=True)
+        for stage_label, counts in by_size:
+            stage_total = sum(counts.values())
+            lines.append(f"== {stage_label}: {stage_total} samples ({stage_total / total:.1%}) ==")
+            lines.append(f"  {'self':>6} {'total':>6}  function")
+            for function, self_count, total_count in self.top_functions(counts):
+                lines.append(f"  {self_count / stage_total:6.1%} {total_count / stage_total:6.1%}  {function}")
+            lines.append("")
+
+        summary = "\n".join(lines)
+        with open(os.path.join(run_dir, "summary.txt"), "w", encoding="utf-8") as f:
+            f.write(summary)
+
+        self.log(f"Profile written to {run_dir}/ (flamegraph input: all.collapsed or <stage>.collapsed)")
+        for stage_label, counts in by_size:
+            self.log(f"  {stage_label}: {sum(counts.values()) / total:.1%} of samples")
+        return run_dir
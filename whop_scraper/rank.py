@@ -0,0 +1,688 @@
+#!/usr/bin/env python3
+"""
+Whop Communities Ranker - Estimates size and ranks communities
+Run: whop-scraper rank
+     whop-scraper rank --incremental [input_file] [--full]  (rescore only changed records;
+         --full, or the default input, drops index entries missing from the input)
+     whop-scraper rank --stream [input_file]  (constant memory, for very large inputs)
+     add --profile to write per-stage flamegraph files to output/profile/
+"""
+
+import json
+import csv
+from bisect import bisect_left, insort
+from datetime import datetime
+import os
+import sys
+
+from .common import OUTPUT_DIR
+from .community import Community, json_default, load_communities
+from .leaderboards import Leaderboard, fill_leaderboards, load_leaderboards, write_leaderboards
+from .profiling import StackProfiler, stage, staged
+from .snapshot_store import SNAPSHOT_FILE, SnapshotStore, iter_histories
+from .stats import OnlineStats
+from .streaming import ExternalSorter, JsonArrayWriter, iter_json_array
+
+# Configuration
+TOP_N = 70  # Top 50 + 20 alternates
+RANK_INDEX_FILE = f"{OUTPUT_DIR}/rank_index.json"
+RANK_CHANGES_FILE = f"{OUTPUT_DIR}/rank_changes.json"
+RANKED_JSON_FILE = f"{OUTPUT_DIR}/all_communities_ranked.json"
+RANK_REPORT_FILE = f"{OUTPUT_DIR}/rank_report.json"
+RAW_COMMUNITIES_FILE = f"{OUTPUT_DIR}/raw_communities.json"
+
+# Fields that feed estimate_community_size / calculate_engagement_score.
+# A record is only rescored when one of these changes.
+SCORE_INPUT_FIELDS = [
+    "reviews_count",
+    "price_monthly_usd",
+    "average_rating",
+    "category",
+    "review_velocity",
+]
+VELOCITY_WINDOW_DAYS = 30
+
+CSV_FIELDNAMES = [
+    "rank",
+    "community_name",
+    "creator_name",
+    "url",
+    "category",
+    "is_free",
+    "price_monthly_usd",
+    "reviews_count",
+    "average_rating",
+    "estimated_members",
+    "confidence",
+    "engagement_score",
+    "description",
+]
+SCORED_FIELDS = ("estimated_members", "confidence", "engagement_score")  # Set by score_community
+
+
+def estimate_community_size(community):
+    """
+    Estimate community member count based on available metrics
+
+    Industry standard: 2-5% of members leave reviews
+    We'll use category-specific ratios
+    """
+    reviews = community.reviews_count
+    price = community.price_monthly_usd
+    rating = community.average_rating
+    category = community.category
+
+    # Base review-to-member ratios by category
+    category_ratios = {
+        "Trading": 0.03,  # 3% - Trading communities have engaged users
+        "E-commerce": 0.025,  # 2.5%
+        "Real Estate": 0.02,  # 2%
+        "Finance": 0.03,  # 3%
+        "Crypto": 0.035,  # 3.5% - Crypto communities are very engaged
+        "Education": 0.02,  # 2%
+        "Other": 0.025,  # 2.5% default
+    }
+
+    # Get ratio for this category
+    ratio = category_ratios.get(category, 0.025)
+
+    # Base estimate from reviews
+    if reviews > 0:
+        base_estimate = reviews / ratio
+    else:
+        # No reviews - use price as indicator
+        base_estimate = 100 if price > 0 else 50
+
+    # Price multiplier (premium communities tend to be larger/more established)
+    if price == 0:  # Free
+        price_multiplier = 1.2  # Free communities can be large
+    elif price < 50:
+        price_multiplier = 1.0
+    elif price < 100:
+        price_multiplier = 1.1
+    elif price < 250:
+        price_multiplier = 1.2
+    else:  # $250+
+        price_multiplier = 1.3
+
+    # Rating quality boost (higher rated = more successful = likely larger)
+    if rating >= 4.8:
+        rating_multiplier = 1.2
+    elif rating >= 4.5:
+        rating_multiplier = 1.1
+    elif rating >= 4.0:
+        rating_multiplier = 1.0
+    else:
+        rating_multiplier = 0.9
+
+    # Calculate final estimate
+    estimated_members = int(base_estimate * price_multiplier * rating_multiplier)
+
+    # Sanity check - minimum based on review count
+    min_members = reviews * 10  # At least 10x the review count
+    estimated_members = max(estimated_members, min_members)
+
+    # Cap at reasonable maximum
+    estimated_members = min(estimated_members, 500000)
+
+    return estimated_members
+
+
+def calculate_engagement_score(community):
+    """
+    Calculate overall engagement score for ranking
+    """
+    estimated_members = community.estimated_members
+    reviews = community.reviews_count
+    rating = community.average_rating
+    price = community.price_monthly_usd
+    review_velocity = community.review_velocity
+
+    # Primary factor: Estimated size (60% weight)
+    size_score = estimated_members * 0.6
+
+    # Review engagement (20% weight)
+    review_score = (reviews * (rating / 5)) * 20  # Normalized by rating quality
+
+    # Revenue indicator (15% weight)
+    # Higher price + members = likely successful
+    revenue_indicator = (estimated_members * price / 100) * 0.15
+
+    # Review density bonus (5% weight)
+    # Communities with high review-to-member ratio are highly engaged
+    review_density = (reviews / max(estimated_members, 1)) * 10000
+
+    # Review velocity bonus - recent review growth from the snapshot store,
+    # counted like reviews gained over the velocity window
+    velocity_score = review_velocity * VELOCITY_WINDOW_DAYS * 20
+
+    total_score = (
+        size_score + review_score + revenue_indicator + review_density + velocity_score
+    )
+
+    return round(total_score, 2)
+
+
+def assign_confidence(community):
+    """
+    Assign confidence level to our size estimate
+    """
+    reviews = community.reviews_count
+    rating = community.average_rating
+
+    if reviews >= 100 and rating >= 4.0:
+        return "High"
+    elif reviews >= 25:
+        return "Medium"
+    else:
+        return "Low"
+
+
+@staged("snapshots")
+def attach_review_velocity(communities, store=None):
+    """Add review_velocity (new reviews/day) from the snapshot store, if one exists"""
+    if store is None:
+        if not os.path.exists(SNAPSHOT_FILE):
+            return
+        store = SnapshotStore()
+
+    for community in communities:
+        community["review_velocity"] = store.review_velocity(
+            community.get("url", ""), VELOCITY_WINDOW_DAYS
+        )
+
+
+def score_community(community):
+    """Add estimated_members, confidence and engagement_score to a Community"""
+    community.estimated_members = estimate_community_size(community)
+    community.confidence = assign_confidence(community)
+    community.engagement_score = calculate_engagement_score(community)
+    return community
+
+
+def write_top_csv(top_communities, csv_file):
+    """Write the top ranked communities to CSV"""
+    with open(csv_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDNAMES)
+        writer.writeheader()
+
+        for community in top_communities:
+            row = {field: community.get(field, "") for field in CSV_FIELDNAMES}
+            writer.writerow(row)
+
+
+def ranking_statistics():
+    """Statistics over every scored community, filled in the pass that assigns ranks"""
+    return (
+        OnlineStats()
+        .numeric("engagement_score", "engagement_score")
+        .numeric("estimated_members", "estimated_members")
+        .numeric("price_monthly_usd", "price_monthly_usd")
+        .numeric("reviews_count", "reviews_count")
+        .numeric("average_rating", "average_rating", where=lambda c: c.get("average_rating", 0) > 0)
+        .counts("confidence", "confidence")
+        .counts("category", "category", default="Other")
+        .counts("pricing", lambda c: "free" if c.get("is_free", False) else "paid")
+    )
+
+
+def top_statistics():
+    """Statistics printed for the top-N communities"""
+    return (
+        OnlineStats()
+        .numeric("reviews_count", "reviews_count", default=0)
+        .numeric("price_monthly_usd", "price_monthly_usd", default=0)
+        .counts("pricing", lambda c: "free" if c.get("is_free", False) else "paid")
+        .counts("confidence", "confidence")
+    )
+
+
+def rank_leaderboards(communities):
+    """Fill every configured leaderboard in one pass and write one CSV per leaderboard"""
+    leaderboards = load_leaderboards()
+    with stage("sort"):
+        fill_leaderboards(communities, leaderboards)
+    with stage("save"):
+        files = write_leaderboards(leaderboards, CSV_FIELDNAMES)
+    print(f"Saved {len(files)} leaderboard CSVs from {len(leaderboards)} leaderboards")
+    return files
+
+
+def score_fingerprint(community):
+    """Values of the scoring inputs, used to detect records that need rescoring"""
+    return [community.get(field) for field in SCORE_INPUT_FIELDS]
+
+
+def load_rank_index(index_file=RANK_INDEX_FILE):
+    """
+    Load the persistent scored index
+
+    Returns (entries, order) where entries maps url -> scored entry and
+    order is a list of rank_key() keys kept in rank order.
+    """
+    if not os.path.exists(index_file):
+        return {}, []
+
+    with open(index_file, "r", encoding="utf-8") as f:
+        index = json.load(f)
+
+    entries = index.get("entries", {})
+    # The index is saved in rank order, so the keys come back already sorted.
+    # Indexes saved before positions were kept fall back to their rank order.
+    order = []
+    for i, url in enumerate(index.get("order", [])):
+        entries[url].setdefault("position", i)
+        order.append(rank_key(url, entries[url]))
+    return entries, order
+
+
+def rank_key(url, entry):
+    """Index order: score descending, then input position, like the stable sort in rank_scored_communities"""
+    return (-entry["engagement_score"], entry["position"], url)
+
+
+def save_rank_index(entries, order, index_file=RANK_INDEX_FILE):
+    """Persist the scored index in rank order"""
+    index = {
+        "updated_at": datetime.now().isoformat(),
+        "order": [url for *_, url in order],
+        "entries": entries,
+    }
+    with open(index_file, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+
+
+def update_rank_index(communities, entries, order, full=False):
+    """
+    Rescore only new or changed communities and move them in the ordered index
+
+    Communities whose score inputs are unchanged keep their score but get
+    their display fields (name, description, ...) refreshed. Duplicate URLs
+    count once, first occurrence wins as in merge. Equal scores rank in
+    input order: with full=True the input is the whole set, so every entry
+    takes its input position and entries missing from it are removed;
+    otherwise (e.g. a recrawl) entries keep their position and new ones go
+    after all others. Returns the list of change records (new / rescored /
+    removed communities with their old and new rank positions).
+    """
+    old_order = list(order)
+    changes = []
+    seen_urls = set()
+    next_position = max((entry["position"] for entry in entries.values()), default=-1) + 1
+    moved = False  # Unchanged entries got a new position, so the order is rebuilt
+
+    for input_position, community in enumerate(communities):
+        url = community.get("url", "")
+        if not url or url in seen_urls:
+            continue
+        seen_urls.add(url)
+
+        previous = entries.get(url)
+        if full:
+            position = input_position
+        elif previous:
+            position = previous["position"]
+        else:
+            position = next_position
+            next_position += 1
+
+        fingerprint = score_fingerprint(community)
+        if previous and previous["fingerprint"] == fingerprint:
+            for field in CSV_FIELDNAMES:
+                if field != "rank" and field not in SCORED_FIELDS:
+                    previous[field] = community.get(field, "")
+            if previous["position"] != position:
+                previous["position"] = position
+                moved = True
+            continue
+
+        score_community(community)
+
+        old_rank = None
+        if previous:
+            old_key = rank_key(url, previous)
+            old_rank = bisect_left(old_order, old_key) + 1
+            index = bisect_left(order, old_key)
+            if index < len(order) and order[index] == old_key:
+                del order[index]
+
+        entry = {field: community.get(field, "") for field in CSV_FIELDNAMES if field != "rank"}
+        entry["fingerprint"] = fingerprint
+        entry["position"] = position
+        entries[url] = entry
+        insort(order, rank_key(url, entry))
+
+        changes.append(
+            {
+                "url": url,
+                "community_name": community.get("community_name", "Unknown"),
+                "change": "rescored" if previous else "new",
+                "old_rank": old_rank,
+                "old_score": previous["engagement_score"] if previous else None,
+                "new_score": entry["engagement_score"],
+            }
+        )
+
+    if full:
+        for url in [url for url in entries if url not in seen_urls]:
+            previous = entries.pop(url)
+            changes.append(
+                {
+                    "url": url,
+                    "community_name": previous.get("community_name", "Unknown"),
+                    "change": "removed",
+                    "old_rank": bisect_left(old_order, rank_key(url, previous)) + 1,
+                    "old_score": previous["engagement_score"],
+                    "new_score": None,
+                    "new_rank": None,
+                }
+            )
+            moved = True
+
+    if moved:
+        order[:] = sorted(rank_key(url, entry) for url, entry in entries.items())
+
+    # Final positions are only known once every change has been applied
+    for change in changes:
+        if change["change"] != "removed":
+            change["new_rank"] = bisect_left(order, rank_key(change["url"], entries[change["url"]])) + 1
+
+    return changes
+
+
+def run_incremental(input_file, full=False):
+    """Incremental ranking: rescore only changed records against the saved index (full: the input is every community)"""
+    print("=" * 50)
+    print("Starting Incremental Community Ranking...")
+    print("=" * 50)
+
+    if not os.path.exists(input_file):
+        print(f"Error: {input_file} not found!")
+        return
+
+    communities = load_communities(input_file)
+
+    attach_review_velocity(communities)
+    entries, order = load_rank_index()
+    print(f"Loaded {len(communities)} communities, {len(entries)} already in rank index")
+
+    changes = update_rank_index(communities, entries, order, full=full)
+    counts = {kind: sum(1 for c in changes if c["change"] == kind) for kind in ("new", "rescored", "removed")}
+    print(
+        f"Rescored {counts['new'] + counts['rescored']} communities "
+        f"({counts['new']} new, {counts['rescored']} changed), removed {counts['removed']}"
+    )
+
+    save_rank_index(entries, order)
+
+    with open(RANK_CHANGES_FILE, "w", encoding="utf-8") as f:
+        json.dump(changes, f, indent=2, ensure_ascii=False)
+
+    top_communities = []
+    for rank, (*_, url) in enumerate(order[:TOP_N], 1):
+        top_community = dict(entries[url])
+        top_community["rank"] = rank
+        top_communities.append(top_community)
+
+    csv_file = f"{OUTPUT_DIR}/ranked_communities.csv"
+    write_top_csv(top_communities, csv_file)
+    rank_leaderboards([entries[url] for *_, url in order])
+
+    print(f"\nTotal communities in index: {len(order)}")
+    print(f"Top {TOP_N} communities saved to: {csv_file}")
+    print(f"Changes saved to: {RANK_CHANGES_FILE}")
+    print(f"Rank index saved to: {RANK_INDEX_FILE}")
+
+
+def rank_scored_communities(communities):
+    """
+    Sort scored communities, assign ranks and save the CSV and full JSON
+
+    Returns (top_communities, csv_file, statistics).
+    """
+    with stage("sort"):
+        communities.sort(key=lambda x: x.engagement_score, reverse=True)
+
+    # Step 3: Assign ranks (collecting the summary statistics on the way)
+    statistics = ranking_statistics()
+    for i, community in enumerate(communities, 1):
+        community["rank"] = i
+        statistics.add(community)
+
+    # Step 4: Get top 70
+    top_communities = communities[:TOP_N]
+
+    # Step 5: Save results
+    print(f"Step 3: Saving top {TOP_N} communities to CSV...")
+
+    # Save to CSV
+    csv_file = f"{OUTPUT_DIR}/ranked_communities.csv"
+    with stage("save"):
+        write_top_csv(top_communities, csv_file)
+
+        # Save full ranked data to JSON (for reference)
+        with open(RANKED_JSON_FILE, "w") as f:
+            json.dump(communities, f, indent=2, default=json_default)
+
+    rank_leaderboards(communities)
+
+    return top_communities, csv_file, statistics
+
+
+def iter_scoring_input(input_file):
+    """
+    (input position, Community) for every record, with review_velocity when there is a snapshot log
+
+    With a log, the records are external-sorted by url and merged against
+    the log sorted the same way (iter_histories), so neither the input nor
+    the store is held in memory. Records then come in url order; the
+    position keeps ties in input order.
+    """
+    if not os.path.exists(SNAPSHOT_FILE):
+        for position, record in enumerate(iter_json_array(input_file)):
+            yield position, Community(record)
+        return
+
+    by_url = ExternalSorter(key=lambda item: item[0], spill_dir=OUTPUT_DIR, default=json_default)
+    for position, record in enumerate(iter_json_array(input_file)):
+        by_url.add([record.get("url", ""), position, record])
+
+    no_history = SnapshotStore(path=None)
+    histories = iter_histories(spill_dir=OUTPUT_DIR)
+    url, store = next(histories, (None, None))
+    for record_url, position, record in by_url.sorted():
+        while url is not None and url < record_url:
+            url, store = next(histories, (None, None))
+        community = Community(record)
+        attach_review_velocity([community], store if url == record_url else no_history)
+        yield position, community
+
+
+def run_streaming(input_file):
+    """
+    Constant-memory ranking: score records as they are read from the input
+
+    Only the top-N and leaderboard heaps stay in memory. Every scored record
+    goes to an external sorter, whose merged runs are streamed straight into
+    the full ranked JSON, so datasets larger than RAM can be ranked. Review
+    velocity comes from a sorted merge with the snapshot log (see
+    iter_scoring_input).
+    """
+    print("=" * 50)
+    print("Starting Streaming Community Ranking...")
+    print("=" * 50)
+
+    if not os.path.exists(input_file):
+        print(f"Error: {input_file} not found!")
+        return
+
+    top_board = Leaderboard("top", top=TOP_N)
+    leaderboards = load_leaderboards()
+    # Same order as the stable sort in rank_scored_communities
+    sorter = ExternalSorter(key=lambda item: (item[0], item[1]), spill_dir=OUTPUT_DIR, default=json_default)
+    statistics = ranking_statistics()
+
+    print("\nStep 1: Scoring communities as they stream in...")
+    total_ranked = 0
+    with stage("score"):
+        for position, community in iter_scoring_input(input_file):
+            score_community(community)
+            top_board.add(community, position)
+            for leaderboard in leaderboards:
+                leaderboard.add(community, position)
+            sorter.add([-community.engagement_score, position, community])
+            statistics.add(community)
+            total_ranked += 1
+    print(f"Scored {total_ranked} communities ({len(sorter.runs)} spilled runs)")
+
+    if not total_ranked:
+        sorter.cleanup()
+        print("No communities to rank")
+        return
+
+    top_communities = top_board.results().get("all", [])
+    for rank, community in enumerate(top_communities, 1):
+        community["rank"] = rank
+
+    print(f"Step 2: Saving top {TOP_N} communities and the full ranking...")
+    csv_file = f"{OUTPUT_DIR}/ranked_communities.csv"
+    with stage("save"):
+        write_top_csv(top_communities, csv_file)
+        files = write_leaderboards(leaderboards, CSV_FIELDNAMES)
+        with JsonArrayWriter(RANKED_JSON_FILE, default=json_default) as writer:
+            for rank, (_, _, community) in enumerate(sorter.sorted(), 1):
+                community["rank"] = rank
+                writer.write(community)
+    print(f"Saved {len(files)} leaderboard CSVs from {len(leaderboards)} leaderboards")
+
+    print_ranking_summary(total_ranked, top_communities, csv_file, statistics)
+
+
+def save_rank_report(total_ranked, top_report, statistics=None):
+    """Write the machine-readable ranking statistics to RANK_REPORT_FILE"""
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "total_ranked": total_ranked,
+        "top_n": TOP_N,
+        "top": top_report,
+        "all": statistics.report() if statistics is not None else None,
+    }
+    with open(RANK_REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def print_ranking_summary(total_ranked, top_communities, csv_file, statistics=None):
+    """
+    Print the top 5 and summary statistics for a finished ranking
+
+    The top-N figures come from one pass over top_communities; they and
+    `statistics` (an OnlineStats over every ranked community) are saved to
+    RANK_REPORT_FILE.
+    """
+    # Print summary
+    print("\n" + "=" * 50)
+    print("RANKING COMPLETE!")
+    print("=" * 50)
+    print(f"\nTop 5 Largest Communities:")
+    print("-" * 30)
+
+    for community in top_communities[:5]:
+        print(f"{community['rank']}. {community['community_name']}")
+        print(f"   Estimated Members: {community['estimated_members']:,}")
+        print(
+            f"   Reviews: {community['reviews_count']} | Rating: {community['average_rating']}"
+        )
+        print(f"   Price: ${community.get('price_monthly_usd', 0)}/month")
+        print(f"   Confidence: {community['confidence']}")
+        print()
+
+    # Statistics
+    print("Statistics:")
+    print("-" * 30)
+    top_report = top_statistics().add_all(top_communities).report()
+    total_reviews = top_report["numeric"]["reviews_count"]["sum"]
+    avg_price = top_report["numeric"]["price_monthly_usd"]["mean"] or 0
+    free_count = top_report["counts"]["pricing"].get("free", 0)
+
+    print(f"Total communities ranked: {total_ranked}")
+    print(f"Top {TOP_N} communities saved to: {csv_file}")
+    print(f"Average price in top {TOP_N}: ${avg_price:.2f}/month")
+    print(f"Free communities in top {TOP_N}: {free_count}")
+    print(f"Total reviews across top {TOP_N}: {total_reviews:,}")
+
+    # Confidence breakdown
+    confidence = top_report["counts"]["confidence"]
+    high_conf = confidence.get("High", 0)
+    med_conf = confidence.get("Medium", 0)
+    low_conf = confidence.get("Low", 0)
+
+    print(f"\nConfidence Levels in Top {TOP_N}:")
+    print(f"  High: {high_conf}")
+    print(f"  Medium: {med_conf}")
+    print(f"  Low: {low_conf}")
+
+    save_rank_report(total_ranked, top_report, statistics)
+    print(f"Statistics report saved to: {RANK_REPORT_FILE}")
+
+    print("\n" + "=" * 50)
+    print("All files saved in 'output/' directory")
+    print("=" * 50)
+
+
+def main():
+    """Main ranking function"""
+    profiler = StackProfiler("rank").start() if "--profile" in sys.argv else None
+    try:
+        run_ranking()
+    finally:
+        if profiler is not None:
+            profiler.stop()
+
+
+def run_ranking():
+    """Full, incremental or streaming ranking, depending on the command line"""
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if "--incremental" in sys.argv:
+        input_file = args[0] if args else RAW_COMMUNITIES_FILE
+        # The merged file is every community; anything else (a recrawl) is a partial update
+        full = "--full" in sys.argv or os.path.abspath(input_file) == os.path.abspath(RAW_COMMUNITIES_FILE)
+        run_incremental(input_file, full=full)
+        return
+    if "--stream" in sys.argv:
+        input_file = args[0] if args else RAW_COMMUNITIES_FILE
+        run_streaming(input_file)
+        return
+
+    print("=" * 50)
+    print("Starting Community Ranking Process...")
+    print("=" * 50)
+
+    # Load scraped data
+    input_file = RAW_COMMUNITIES_FILE
+    if not os.path.exists(input_file):
+        print(f"Error: {input_file} not found!")
+        print("Please run 'whop-scraper merge' or 'whop-scraper pipeline' first.")
+        return
+
+    with stage("load"):
+        communities = load_communities(input_file)
+
+    print(f"Loaded {len(communities)} communities")
+
+    attach_review_velocity(communities)
+
+    # Step 1: Estimate sizes and calculate scores
+    print("\nStep 1: Estimating community sizes...")
+
+    with stage("score"):
+        for community in communities:
+            score_community(community)
+
+    # Step 2: Sort by engagement score
+    print("Step 2: Ranking communities by engagement score...")
+    top_communities, csv_file, statistics = rank_scored_communities(communities)
+    print_ranking_summary(len(communities), top_communities, csv_file, statistics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Value-aware recrawl scheduler
+Spends a fixed request budget on the communities most likely to move the
+leaderboard: priority = importance (engagement_score from the ranker) x the
+probability the page changed since it was last crawled (from its change
+history in the snapshot store).
+
+Usage: whop-scraper recrawl plan [--budget N]
+       whop-scraper recrawl run [--budget N]
+Then:  whop-scraper rank --incremental output/raw_communities_recrawl.json
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+
+from .common import OUTPUT_DIR, log_message
+from .rank import RANK_INDEX_FILE, TOP_N
+from .snapshot_store import SECONDS_PER_DAY, SnapshotStore, to_timestamp
+
+# Configuration
+DEFAULT_BUDGET = 1000  # Community page requests per run
+MIN_RECRAWL_HOURS = 12  # Never recrawl a page more often than this
+PRIOR_CHANGES = 1.0  # Prior: one change per PRIOR_DAYS for pages with little history
+PRIOR_DAYS = 30.0
+CONTENDER_BOOST = 2.0  # Extra weight for pages at or near the TOP_N cutoff
+CONTENDER_RANK = TOP_N * 2
+RANKED_FILE = f"{OUTPUT_DIR}/all_communities_ranked.json"
+PLAN_FILE = f"{OUTPUT_DIR}/recrawl_plan.json"
+RECRAWL_OUTPUT_FILE = f"{OUTPUT_DIR}/raw_communities_recrawl.json"
+CRAWL_LOG_FILE = f"{OUTPUT_DIR}/recrawl_log.jsonl"  # One line per recrawled URL; the snapshot store skips unchanged pages
+
+
+def load_ranked_communities():
+    """(url, engagement_score, rank, scraped_at) for every ranked community"""
+    if os.path.exists(RANKED_FILE):
+        with open(RANKED_FILE, "r", encoding="utf-8") as f:
+            communities = json.load(f)
+        return [
+            (c.get("url", ""), c.get("engagement_score", 0), c.get("rank"), c.get("scraped_at"))
+            for c in communities
+            if c.get("url")
+        ]
+
+    if os.path.exists(RANK_INDEX_FILE):
+        with open(RANK_INDEX_FILE, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        entries = index.get("entries", {})
+        return [
+            (url, entries[url]["engagement_score"], rank, None)
+            for rank, url in enumerate(index.get("order", []), 1)
+        ]
+
+    return []
+
+
+def load_crawl_log(path=CRAWL_LOG_FILE):
+    """url -> (last successful crawl, last attempt), in epoch seconds, from the recrawl log"""
+    crawls = {}
+    if not os.path.exists(path):
+        return crawls
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            last_ok, last_attempt = crawls.get(entry["url"], (0.0, 0.0))
+            if entry.get("ok"):
+                last_ok = max(last_ok, entry["ts"])
+            crawls[entry["url"]] = (last_ok, max(last_attempt, entry["ts"]))
+    return crawls
+
+
+def change_rate(store, url, now):
+    """Estimated changes per day, smoothed with a prior for short histories"""
+    timestamps = store.change_timestamps(url)
+    if not timestamps:
+        return PRIOR_CHANGES / PRIOR_DAYS
+
+    observed_days = max((now - timestamps[0]) / SECONDS_PER_DAY, 0.0)
+    # The first entry is the initial observation, not a change
+    changes = len(timestamps) - 1
+    return (changes + PRIOR_CHANGES) / (observed_days + PRIOR_DAYS)
+
+
+def build_plan(budget=DEFAULT_BUDGET, now=None):
+    """
+    Score every ranked community and keep the `budget` most valuable recrawls
+
+    Pages crawled (or tried) within MIN_RECRAWL_HOURS are skipped, so
+    frequent movers are spaced out rather than refetched every run. The
+    chance of a change counts from the last successful crawl.
+    """
+    now = now or time.time()
+    store = SnapshotStore()
+    crawl_log = load_crawl_log()
+    candidates = []
+
+    for url, engagement_score, rank, scraped_at in load_ranked_communities():
+        last_ok, last_attempt = crawl_log.get(url, (0.0, 0.0))
+        last_crawl = max(store.last_seen.get(url, 0.0), last_ok)
+        if scraped_at:
+            last_crawl = max(last_crawl, to_timestamp(scraped_at))
+        if (now - max(last_crawl, last_attempt)) / 3600 < MIN_RECRAWL_HOURS:
+            continue
+        hours_since_crawl = (now - last_crawl) / 3600 if last_crawl else float("inf")
+
+        rate = change_rate(store, url, now)
+        days_since_crawl = hours_since_crawl / 24
+        probability_changed = 1.0 - math.exp(-rate * days_since_crawl)
+
+        importance = math.log1p(max(engagement_score, 0))
+        if rank is not None and rank <= CONTENDER_RANK:
+            importance *= CONTENDER_BOOST
+
+        candidates.append(
+            {
+                "url": url,
+                "priority": round(importance * probability_changed, 4),
+                "rank": rank,
+                "engagement_score": engagement_score,
+                "changes_per_day": round(rate, 4),
+                "days_since_crawl": round(days_since_crawl, 2) if last_crawl else None,
+            }
+        )
+
+    candidates.sort(key=lambda c: c["priority"], reverse=True)
+    return candidates[:budget], len(candidates)
+
+
+def run_plan(plan):
+    """Recrawl the planned community pages, record them in the snapshot store and log every attempt"""
+    # Imported here so planning doesn't pay for the HTTP/parsing stack
+    from . import scrape
+    from .fetch import pause_between_requests
+
+    if os.path.exists(RECRAWL_OUTPUT_FILE):
+        os.remove(RECRAWL_OUTPUT_FILE)
+    writer = scrape.BatchWriter(RECRAWL_OUTPUT_FILE, bounded_memory=True)
+    store = SnapshotStore()
+
+    with open(CRAWL_LOG_FILE, "a", encoding="utf-8") as crawl_log:
+        for i, item in enumerate(plan, 1):
+            log_message(f"Recrawl {i}/{len(plan)} (priority {item['priority']}): {item['url']}")
+            community_data = scrape.scrape_community_page(item["url"])
+            ok = bool(community_data) and community_data.get("community_name", "Unknown") != "Unknown"
+            if ok:
+                writer.add(community_data)
+                store.record([community_data])
+            # Unchanged pages leave no snapshot entry, so the crawl time is kept here
+            crawl_log.write(json.dumps({"url": item["url"], "ts": time.time(), "ok": ok}) + "\n")
+            crawl_log.flush()
+
+            pause_between_requests()
+
+    writer.flush()
+    log_message(f"Recrawl complete: {writer.saved}/{len(plan)} pages saved to {RECRAWL_OUTPUT_FILE}")
+    return writer.saved
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Plan or run a value-aware recrawl")
+    parser.add_argument("command", choices=["plan", "run"])
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET, help="page requests for this run")
+    args = parser.parse_args()
+
+    plan, eligible = build_plan(args.budget)
+    with open(PLAN_FILE, "w", encoding="utf-8") as f:
+        json.dump(plan, f, indent=2)
+
+    print(f"Eligible for recrawl: {eligible} communities")
+    print(f"Planned: {len(plan)} (budget {args.budget}), saved to {PLAN_FILE}")
+    for item in plan[:5]:
+        print(f"  {item['priority']:.3f}  rank {item['rank']}  {item['url']}")
+
+    if args.command == "run":
+        run_plan(plan)
+        print(f"\nNext: whop-scraper rank --incremental {RECRAWL_OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,746 @@
+#!/usr/bin/env python3
+"""
+Updated Whop Communities Scraper - Batch Processing by URL Ranges
+Run: whop-scraper scrape <batch_number> [--bounded-memory] [--trace-memory [SECONDS]] [--profile] [--tiered]
+Example: whop-scraper scrape 1 (processes URLs 0-10000)
+         whop-scraper scrape 2 (processes URLs 10000-20000)
+         whop-scraper scrape 3 --bounded-memory --trace-memory 120
+"""
+
+from bs4 import BeautifulSoup
+import json
+import re
+from datetime import datetime
+import os
+import gc
+import sys
+import textwrap
+
+from . import dead_letter
+from .checkpoint import load_checkpoint, save_checkpoint
+from .manifest import extend_manifest, get_manifest, new_manifest, save_manifest
+from .classifier import get_default_classifier
+from .community import Community, json_default, load_communities
+from .common import (
+    BATCH_SIZE_URLS,
+    DISCOVERY_FILE,
+    OUTPUT_DIR,
+    ensure_output_dir,
+    log_message,
+    open_discovery_frontier,
+)
+from .fetch import concurrency_stats, deadline_budget, get_page, hedge_stats, last_fetch_error, pause_between_requests
+from .early_stop import RequiredFieldsDetector
+from .extract_cache import content_key, get_extract_cache
+from .memory_report import DEFAULT_INTERVAL, MemoryReporter
+from .profiling import StackProfiler, stage, staged
+
+# Configuration
+SAVE_EVERY = 15  # Communities buffered before each save
+STREAM_COMMUNITY_PAGES = True  # Stop downloading once the required fields are in
+CACHE_EXTRACTION = True  # Reuse the stored record for a page body extracted before
+SCRAPE_DEADLINE = 25.0  # Seconds for a product sitemap hop plus its community page, retries included
+EXTRACTOR_VERSION = 1  # Bump when extraction or the default taxonomy changes (invalidates the cache)
+
+def base_record(url):
+    """url, url_slug, product_id and scraped_at for a community page URL"""
+    # Extract the slug from URL (e.g., "realtraders-community" from the URL)
+    url_parts = url.split('/')
+    slug = ''
+    for part in url_parts:
+        if '?' in part:
+            slug = part.split('?')[0]
+            break
+        elif part and part not in ['https:', '', 'whop.com', 'discover']:
+            slug = part
+
+    # Extract productId from URL if present
+    product_id = ''
+    if 'productId=' in url:
+        product_id = url.split('productId=')[1].split('&')[0]
+
+    return Community({
+        'url': url,
+        'url_slug': slug,
+        'product_id': product_id,
+        'scraped_at': datetime.now().isoformat()
+    })
+
+def apply_product_data(community_data, product_data):
+    """Fill name, description, rating, reviews, creator and category from a JSON-LD Product"""
+    # Extract data from structured JSON-LD
+    community_data['community_name'] = product_data.get('name', 'Unknown')
+    community_data['description'] = product_data.get('description', '')[:500]
+
+    # Extract ratings from aggregateRating
+    aggregate_rating = product_data.get('aggregateRating', {})
+    if aggregate_rating:
+        community_data['average_rating'] = float(aggregate_rating.get('ratingValue', 0))
+        community_data['reviews_count'] = int(aggregate_rating.get('reviewCount', 0))
+    else:
+        community_data['average_rating'] = 0.0
+        community_data['reviews_count'] = 0
+
+    # Extract brand/creator
+    brand = product_data.get('brand', {})
+    if brand:
+        community_data['creator_name'] = brand.get('name', '')
+    else:
+        community_data['creator_name'] = ''
+
+    # Category - map based on the ranker's expected categories
+    community_data['category'] = get_default_classifier().classify_community(community_data)
+
+@staged("extract")
+def scrape_community_page(url):
+    """Scrape data from individual community page - updated for current Whop structure"""
+    html = get_page(url, early_stop=STREAM_COMMUNITY_PAGES)
+    if not html:
+        return None
+    return extract_community_data_cached(html, url)
+
+def extract_community_data_cached(html, url):
+    """extract_community_data, reusing the stored record when this exact body was extracted before"""
+    cache = get_extract_cache() if CACHE_EXTRACTION else None
+    if cache is None:
+        return extract_community_data(html, url)
+
+    key = content_key(EXTRACTOR_VERSION, url, html)
+    with stage("cache"):
+        record = cache.get(key)
+    if record is not None:
+        record['scraped_at'] = datetime.now().isoformat()
+        log_message(f"Page unchanged, reused extracted record: {record.get('community_name')}")
+        return Community(record)
+
+    community_data = extract_community_data(html, url)
+    with stage("cache"):
+        cache.put(key, community_data)
+    return community_data
+
+@staged("extract")
+def scrape_community_head(url):
+    """
+    Tier-1 scrape: only the JSON-LD Product fields (name, rating, reviews,
+    creator, category), read from the start of the page with no HTML parse
+
+    The record carries 'tier': 1 and no price fields; see tiered.py for the
+    deep pass that fills them in for leaderboard contenders. Pages without a
+    rated JSON-LD Product are downloaded in full and extracted normally.
+    """
+    html = get_page(url, early_stop=True, need_price=False)
+    if not html:
+        return None
+
+    detector = RequiredFieldsDetector(need_price=False)
+    try:
+        detector.feed(html)
+    except Exception:
+        pass
+    if not detector.complete:
+        return extract_community_data(html, url)
+
+    community_data = base_record(url)
+    try:
+        apply_product_data(community_data, detector.product)
+    except Exception as e:
+        log_message(f"Failed to parse JSON-LD: {e}")
+        return extract_community_data(html, url)
+    community_data['tier'] = 1
+    log_message(f"Extracted head fields: {community_data['community_name']}")
+    return community_data
+
+def extract_community_data(html, url):
+    """Extract the full community record (ratings, category and pricing) from page HTML"""
+    with stage("parse"):
+        soup = BeautifulSoup(html, 'html.parser')
+
+    community_data = base_record(url)
+
+    # METHOD 1: Extract from JSON-LD structured data (most reliable)
+    json_ld_scripts = soup.find_all('script', {'type': 'application/ld+json'})
+    product_data = None
+    for script in json_ld_scripts:
+        try:
+            structured_data = json.loads(script.string)
+            # Handle multiple JSON-LD scripts - find the Product one
+            if isinstance(structured_data, list):
+                for item in structured_data:
+                    if item.get('@type') == 'Product':
+                        product_data = item
+                        break
+            elif structured_data.get('@type') == 'Product':
+                product_data = structured_data
+
+            if product_data:
+                break  # Found Product data, stop searching
+        except Exception as e:
+            log_message(f"Error parsing JSON-LD script: {e}")
+            continue
+
+    if product_data:
+        try:
+            apply_product_data(community_data, product_data)
+
+            # Price handling - try to extract from HTML after JSON-LD
+            log_message(f"Extracted from JSON-LD: {community_data['community_name']}")
+
+            # Fall through to extract pricing from HTML since JSON-LD doesn't have price info
+
+        except Exception as e:
+            log_message(f"Failed to parse JSON-LD: {e}")
+
+    # METHOD 2: Extract rating and review data from HTML (if not in JSON-LD)
+    if not community_data.get('average_rating'):
+        try:
+            # Look for "X out of 5" pattern
+            rating_text = soup.find(string=re.compile(r'(\d+(?:\.\d+)?)\s+out\s+of\s+5', re.I))
+            if rating_text:
+                rating_match = re.search(r'(\d+(?:\.\d+)?)\s+out\s+of\s+5', rating_text, re.I)
+                if rating_match:
+                    community_data['average_rating'] = float(rating_match.group(1))
+                    log_message(f"Found rating: {community_data['average_rating']}")
+
+            # Look for "X ratings & reviews" pattern
+            reviews_text = soup.find(string=re.compile(r'(\d+)\s+ratings?\s*&?\s*reviews?', re.I))
+            if reviews_text:
+                reviews_match = re.search(r'(\d+)\s+ratings?\s*&?\s*reviews?', reviews_text, re.I)
+                if reviews_match:
+                    community_data['reviews_count'] = int(reviews_match.group(1))
+                    log_message(f"Found reviews: {community_data['reviews_count']}")
+
+        except Exception as e:
+            log_message(f"Error extracting rating/reviews: {e}")
+
+    # METHOD 3: Extract from HTML meta tags (fallback)
+    if not community_data.get('community_name') or community_data.get('community_name') == 'Unknown':
+        try:
+            # Get community name from meta tags or title
+            og_title = soup.find('meta', {'property': 'og:title'})
+            title = soup.find('title')
+
+            if og_title:
+                community_data['community_name'] = og_title.get('content', 'Unknown')
+            elif title:
+                title_text = title.text.strip()
+                # Remove " | Whop" suffix if present
+                if ' | Whop' in title_text:
+                    community_data['community_name'] = title_text.replace(' | Whop', '')
+                else:
+                    community_data['community_name'] = title_text
+            else:
+                community_data['community_name'] = 'Unknown'
+
+            # Get description from meta tags
+            og_description = soup.find('meta', {'property': 'og:description'})
+            meta_description = soup.find('meta', {'name': 'description'})
+
+            if og_description:
+                community_data['description'] = og_description.get('content', '')[:500]
+            elif meta_description:
+                community_data['description'] = meta_description.get('content', '')[:500]
+            else:
+                community_data['description'] = ''
+
+            log_message(f"Extracted from meta tags: {community_data['community_name']}")
+
+        except Exception as e:
+            log_message(f"Error in HTML extraction: {e}")
+
+    # Set defaults for missing data
+    if not community_data.get('average_rating'):
+        community_data['average_rating'] = 0.0
+    if not community_data.get('reviews_count'):
+        community_data['reviews_count'] = 0
+    if not community_data.get('creator_name'):
+        community_data['creator_name'] = ''
+    if not community_data.get('category'):
+        community_data['category'] = 'Other'
+    if not community_data.get('community_name'):
+        community_data['community_name'] = 'Unknown'
+    if not community_data.get('description'):
+        community_data['description'] = ''
+
+    # FINAL STEP: Extract pricing information from HTML (works for both JSON-LD and fallback cases)
+    try:
+        price_extracted = False
+
+        # Method 1: Look for radio button with price pattern (like "$3,000.00 one-time purchase")
+        radio_buttons = soup.find_all(['div', 'span'], class_=re.compile(r'fui-RadioButtonGroup|radio', re.I))
+        for radio in radio_buttons:
+            radio_text = radio.get_text().strip()
+            # Look for price pattern with commas: $3,000.00 or $39.99
+            price_match = re.search(r'\$([0-9,]+(?:\.[0-9]{2})?)', radio_text)
+            if price_match:
+                price_value_str = price_match.group(1).replace(',', '')
+                price_value = float(price_value_str)
+
+                # Determine billing period from the text
+                if re.search(r'one-?time|lifetime', radio_text, re.I):
+                    period = "one-time purchase"
+                    community_data['price_monthly_usd'] = price_value  # Keep as-is for one-time
+                elif re.search(r'week|weekly', radio_text, re.I):
+                    period = "week"
+                    community_data['price_monthly_usd'] = price_value * 4.33  # Convert to monthly
+                elif re.search(r'year|yearly|annual', radio_text, re.I):
+                    period = "year"
+                    community_data['price_monthly_usd'] = price_value / 12  # Convert to monthly
+                elif re.search(r'day|daily', radio_text, re.I):
+                    period = "day"
+                    community_data['price_monthly_usd'] = price_value * 30  # Convert to monthly
+                else:
+                    period = "month"
+                    community_data['price_monthly_usd'] = price_value
+
+                community_data['price_display'] = f"${price_value:.2f} / {period}"
+                community_data['is_free'] = False
+                price_extracted = True
+                log_message(f"Found price in radio button: ${price_value:.2f} / {period}")
+                break
+
+        # Method 2: Look for button text with pricing
+        if not price_extracted:
+            buttons = soup.find_all(['button', 'a'], string=re.compile(r'\$[\d,]+\.?\d*', re.I))
+            for button in buttons:
+                button_text = button.get_text().strip()
+                price_match = re.search(r'\$([0-9,]+(?:\.[0-9]{2})?)', button_text)
+                if price_match:
+                    price_value_str = price_match.group(1).replace(',', '')
+                    price_value = float(price_value_str)
+                    community_data['price_monthly_usd'] = price_value
+                    community_data['price_display'] = f"${price_value:.2f} / month"
+                    community_data['is_free'] = False
+                    price_extracted = True
+                    log_message(f"Found price in button: {button_text}")
+                    break
+
+        # Method 3: Look for price in any text containing dollar signs
+        if not price_extracted:
+            price_elements = soup.find_all(string=re.compile(r'\$[\d,]+\.?\d*'))
+            for element in price_elements:
+                # Skip script tags
+                if element.parent.name in ['script', 'style']:
+                    continue
+
+                price_text = str(element).strip()
+                price_match = re.search(r'\$([0-9,]+(?:\.[0-9]{2})?)', price_text)
+                if price_match:
+                    price_value_str = price_match.group(1).replace(',', '')
+                    price_value = float(price_value_str)
+
+                    # Determine billing period
+                    period = "month"
+                    if re.search(r'one-?time|lifetime', price_text, re.I):
+                        period = "one-time purchase"
+                        community_data['price_monthly_usd'] = price_value  # Keep as-is for one-time
+                    elif re.search(r'week|weekly', price_text, re.I):
+                        period = "week"
+                        community_data['price_monthly_usd'] = price_value * 4.33  # Convert to monthly
+                    elif re.search(r'year|yearly|annual', price_text, re.I):
+                        period = "year"
+                        community_data['price_monthly_usd'] = price_value / 12  # Convert to monthly
+                    elif re.search(r'day|daily', price_text, re.I):
+                        period = "day"
+                        community_data['price_monthly_usd'] = price_value * 30  # Convert to monthly
+                    else:
+                        community_data['price_monthly_usd'] = price_value  # Assume monthly
+
+                    community_data['price_display'] = f"${price_value:.2f} / {period}"
+                    community_data['is_free'] = False
+                    price_extracted = True
+                    log_message(f"Found price in text: {price_text}")
+                    break
+
+        # Method 4: Look for "Free" or similar
+        if not price_extracted:
+            free_indicators = soup.find_all(string=re.compile(r'\bfree\b|\$0\b|no cost', re.I))
+            if free_indicators:
+                community_data['price_monthly_usd'] = 0
+                community_data['price_display'] = "Free"
+                community_data['is_free'] = True
+                price_extracted = True
+                log_message("Found free pricing indicator")
+
+        # Default if no price found
+        if not price_extracted:
+            community_data['price_monthly_usd'] = 0
+            community_data['price_display'] = "Unknown"
+            community_data['is_free'] = False
+
+    except Exception as e:
+        log_message(f"Error extracting price: {e}")
+        community_data['price_monthly_usd'] = 0
+        community_data['price_display'] = "Unknown"
+        community_data['is_free'] = False
+
+    # Break the parse tree's internal references so it is freed right away
+    # instead of waiting for the cyclic garbage collector
+    soup.decompose()
+
+    return community_data
+
+@staged("extract")
+def scrape_sitemap(sitemap_url, tiered=False):
+    """
+    Fetch a product sitemap, find its community URL and scrape it. Returns the community data or None
+
+    With tiered only the head fields are scraped (scrape_community_head).
+    Failures are recorded in the dead-letter store for the retry pass.
+    The sitemap hop and the page fetch share one SCRAPE_DEADLINE budget, so
+    a slow outlier is dead-lettered instead of stalling the batch.
+    """
+    with deadline_budget(SCRAPE_DEADLINE):
+        # Get the XML content of the product sitemap
+        xml_content = get_page(sitemap_url)
+        if not xml_content:
+            log_message(f"Failed to fetch sitemap: {sitemap_url}")
+            dead_letter.record_failure(sitemap_url, dead_letter.SITEMAP_FETCH_FAILED, last_fetch_error())
+            return None
+
+        # Extract all URLs from this product sitemap
+        urls_in_sitemap = re.findall(r'<loc>([^<]+)</loc>', xml_content)
+
+        # Find the community URL (not /app/ URLs)
+        community_url = None
+        for url in urls_in_sitemap:
+            if '/app/' not in url and url.startswith('https://whop.com/discover/'):
+                community_url = url
+                break
+
+        if not community_url:
+            log_message(f"No community URL found in sitemap: {sitemap_url}")
+            dead_letter.record_failure(sitemap_url, dead_letter.NO_COMMUNITY_URL, f"{len(urls_in_sitemap)} URLs in sitemap")
+            return None
+
+        log_message(f"Found community URL: {community_url}")
+
+        # Scrape the community page immediately
+        community_data = scrape_community_head(community_url) if tiered else scrape_community_page(community_url)
+        if community_data and community_data.get('community_name', 'Unknown') != 'Unknown':
+            log_message(f"Successfully scraped: {community_data['community_name']}")
+            return community_data
+
+        log_message(f"Failed to scrape community: {community_url}")
+        error = f"No community name found on {community_url}" if community_data else last_fetch_error()
+        dead_letter.record_failure(sitemap_url, dead_letter.SCRAPE_FAILED, error)
+        return None
+
+def append_to_json_array(output_file, records):
+    """
+    Append records to a JSON array file without reading it
+
+    The closing bracket is overwritten in place, so the file stays a valid
+    JSON list that the merge step can load as before.
+    """
+    items = ",\n".join(textwrap.indent(json.dumps(record, indent=2, default=json_default), "  ") for record in records)
+
+    if not os.path.exists(output_file) or os.path.getsize(output_file) == 0:
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write("[\n" + items + "\n]")
+        return
+
+    with open(output_file, "r+b") as f:
+        # Walk back from the end to the closing bracket and the character before it
+        position = f.seek(0, os.SEEK_END)
+        closing = None
+        while position > 0:
+            position -= 1
+            f.seek(position)
+            char = f.read(1)
+            if char.isspace():
+                continue
+            if closing is None:
+                if char != b']':
+                    raise ValueError(f"{output_file} is not a JSON array")
+                closing = position
+            else:
+                break
+
+        f.seek(closing)
+        f.truncate()
+        separator = "\n" if char == b'[' else ",\n"
+        f.write((separator + items + "\n]").encode("utf-8"))
+
+class BatchWriter:
+    """
+    Buffers scraped communities and saves them to the batch JSON file
+
+    Default mode keeps every record in memory and rewrites the whole file on
+    each save. Bounded-memory mode only holds the pending buffer and appends
+    it to the file, so memory stays flat however long the batch runs. Every
+    save also refreshes the file's manifest sidecar; set last_index to the
+    discovery index being processed so the manifest records it. Sitemap URLs
+    in resolve_urls (open dead letters) are marked resolved once the record
+    scraped from them has been saved.
+    """
+
+    def __init__(self, output_file, save_every=SAVE_EVERY, bounded_memory=False, saved=0):
+        self.output_file = output_file
+        self.save_every = save_every
+        self.bounded_memory = bounded_memory
+        self.buffer = []
+        self.all_communities = []
+        self.saved = saved
+        self.last_index = None
+        self.resolve_urls = set()
+        self.pending_resolved = []
+
+        # Load existing data if file exists (bounded mode never reads it back)
+        if not bounded_memory and os.path.exists(output_file):
+            try:
+                self.all_communities = load_communities(output_file)
+                log_message(f"Loaded {len(self.all_communities)} existing communities from batch file")
+            except:
+                self.all_communities = []
+            self.saved = len(self.all_communities)
+
+        if bounded_memory:
+            self.manifest = get_manifest(output_file, rebuild=True)
+            if self.manifest is not None:
+                self.saved = self.manifest["records"]
+        else:
+            previous = get_manifest(output_file)
+            self.manifest = extend_manifest(new_manifest(output_file), self.all_communities)
+            if previous is not None:
+                self.manifest["last_index"] = previous.get("last_index")
+        if self.manifest is None:
+            self.manifest = new_manifest(output_file)
+
+    def add(self, community_data, sitemap_url=None):
+        """Buffer a community, saving once the buffer is full. Returns True if it saved"""
+        self.buffer.append(community_data)
+        if sitemap_url in self.resolve_urls:
+            self.pending_resolved.append(sitemap_url)
+        if len(self.buffer) >= self.save_every:
+            self.flush()
+            return True
+        return False
+
+    @staged("save")
+    def flush(self):
+        """Write any buffered communities to the batch file"""
+        if not self.buffer:
+            return
+
+        if self.bounded_memory:
+            append_to_json_array(self.output_file, self.buffer)
+        else:
+            self.all_communities.extend(self.buffer)
+            with open(self.output_file, "w", encoding="utf-8") as f:
+                json.dump(self.all_communities, f, indent=2, default=json_default)
+
+        extend_manifest(self.manifest, self.buffer)
+        if self.last_index is not None:
+            self.manifest["last_index"] = self.last_index
+        save_manifest(self.manifest)
+
+        self.saved += len(self.buffer)
+        log_message(f"Saved batch of {len(self.buffer)} communities. Total: {self.saved}")
+        self.buffer.clear()
+
+        if self.pending_resolved:
+            dead_letter.record_resolved(self.pending_resolved)
+            self.resolve_urls.difference_update(self.pending_resolved)
+            self.pending_resolved = []
+
+        if not self.bounded_memory:
+            gc.collect()
+
+def process_sitemap_and_scrape(sitemap_url, writer, tiered=False):
+    """Process a single product sitemap URL, extract community URL, scrape it, and save data. Returns True if a save happened"""
+    saved = False
+    try:
+        community_data = scrape_sitemap(sitemap_url, tiered)
+        if community_data:
+            # Save data to file every SAVE_EVERY communities
+            saved = writer.add(community_data, sitemap_url)
+
+        # Small delay between requests (the shared rate limiter paces requests when set)
+        pause_between_requests()
+
+    except Exception as e:
+        log_message(f"Error processing sitemap {sitemap_url}: {e}")
+        dead_letter.record_failure(sitemap_url, dead_letter.PROCESSING_ERROR, f"{type(e).__name__}: {e}")
+
+    return saved
+
+def read_and_process_urls_batch(batch_number, stop_event=None, bounded_memory=False, tiered=False):
+    """
+    Read product sitemap URLs from file and process a specific batch range
+
+    Resumes after the last checkpointed URL, and stops early (after saving)
+    once stop_event is set. With bounded_memory only the pending save buffer
+    is held in memory. With tiered only head fields are scraped; run the deep
+    pass after merging.
+    """
+    file_path = DISCOVERY_FILE
+
+    # Calculate batch range
+    start_index = (batch_number - 1) * BATCH_SIZE_URLS
+
+    # The mmapped frontier seeks straight to this batch's slice; URLs are
+    # decoded one at a time as the loop reaches them
+    try:
+        frontier = open_discovery_frontier(file_path)
+    except FileNotFoundError:
+        log_message(f"Error: File {file_path} not found!")
+        log_message("Please run 'whop-scraper discover' first to generate the URLs file.")
+        return
+    except Exception as e:
+        log_message(f"Error reading {file_path}: {e}")
+        return
+
+    try:
+        url_count = len(frontier)
+        batch_urls = frontier[start_index:start_index + BATCH_SIZE_URLS]
+        log_message(f"Opened {len(batch_urls)} of {url_count} product sitemap URLs from {file_path}")
+        return process_batch_urls(batch_number, batch_urls, start_index, url_count, stop_event, bounded_memory, tiered)
+    finally:
+        frontier.close()
+
+def process_batch_urls(batch_number, batch_urls, start_index, url_count, stop_event=None, bounded_memory=False, tiered=False):
+    """Scrape and save one batch's URLs (a list or FrontierView), resuming from its checkpoint"""
+    end_index = start_index + len(batch_urls)
+
+    if not batch_urls:
+        log_message(f"Batch {batch_number} is out of range. Total URLs: {url_count}")
+        return 0
+
+    log_message(f"Processing batch {batch_number}: URLs {start_index} to {end_index} ({len(batch_urls)} URLs)")
+
+    # Initialize data structures
+    output_file = f"{OUTPUT_DIR}/raw_communities_batch_{batch_number}.json"
+    checkpoint = load_checkpoint(batch_number)
+
+    # Bounded mode doesn't load the batch file, so it takes the saved count from
+    # the batch manifest, or from the checkpoint when there is no manifest
+    saved = checkpoint.get('communities', 0) if (bounded_memory and checkpoint) else 0
+    writer = BatchWriter(output_file, bounded_memory=bounded_memory, saved=saved)
+    writer.resolve_urls = dead_letter.open_dead_letter_urls()
+
+    # Resume after the last checkpoint (only trusted if it matches the batch file)
+    resume_from = 0
+    if checkpoint and checkpoint.get('communities') == writer.saved:
+        resume_from = min(checkpoint.get('processed', 0), len(batch_urls))
+        if resume_from:
+            log_message(f"Resuming batch {batch_number} from checkpoint: {resume_from}/{len(batch_urls)} already processed")
+
+    # Process each sitemap URL in this batch
+    log_message(f"Starting batch {batch_number} processing: sitemap -> community URL -> scrape -> save")
+
+    processed = resume_from
+    for i, sitemap_url in enumerate(batch_urls[resume_from:], resume_from + 1):
+        if stop_event is not None and stop_event.is_set():
+            log_message(f"Stop requested - batch {batch_number} stopping after {processed}/{len(batch_urls)} sitemaps")
+            break
+
+        log_message(f"Processing sitemap {start_index + i}/{url_count}: {sitemap_url}")
+
+        writer.last_index = start_index + i - 1
+        saved = process_sitemap_and_scrape(sitemap_url, writer, tiered)
+        processed = i
+
+        # Everything up to this URL is on disk once the pending batch is flushed
+        if saved:
+            with stage("save"):
+                save_checkpoint(batch_number, processed, len(batch_urls), writer.saved)
+
+        if i % 50 == 0:
+            log_message(f"Batch {batch_number} progress: {i}/{len(batch_urls)} sitemaps processed. Total communities: {writer.saved + len(writer.buffer)}")
+
+    # Save any remaining communities in the final batch
+    writer.flush()
+
+    complete = processed >= len(batch_urls)
+    save_checkpoint(batch_number, processed, len(batch_urls), writer.saved, complete)
+
+    cache = get_extract_cache() if CACHE_EXTRACTION else None
+    if cache is not None and cache.hits + cache.misses:
+        log_message(f"Extract cache: {cache.hits} of {cache.hits + cache.misses} pages unchanged, not re-parsed")
+    hedges = hedge_stats()
+    if hedges["hedged"]:
+        log_message(f"Hedged {hedges['hedged']} of {hedges['requests']} requests; the duplicate answered first {hedges['hedge_won']} times")
+    concurrency = concurrency_stats()
+    log_message(
+        f"Concurrency limit {concurrency['concurrency_limit']} "
+        f"(latency {concurrency['latency_ms']} ms, baseline {concurrency['baseline_latency_ms']} ms, "
+        f"{concurrency['throttled']} throttled)"
+    )
+
+    if complete:
+        log_message(f"Batch {batch_number} processing complete! Total communities scraped: {writer.saved}")
+    return writer.saved
+
+def main():
+    """Main scraping function - Batch processing version"""
+    args = sys.argv[1:]
+    bounded_memory = '--bounded-memory' in args
+    profile = '--profile' in args
+    tiered = '--tiered' in args
+    trace_interval = None
+    if '--trace-memory' in args:
+        position = args.index('--trace-memory')
+        trace_interval = DEFAULT_INTERVAL
+        if position + 1 < len(args) and args[position + 1].isdigit():
+            trace_interval = int(args.pop(position + 1))
+    args = [arg for arg in args if not arg.startswith('--')]
+
+    if len(args) != 1:
+        print("Usage: whop-scraper scrape <batch_number> [--bounded-memory] [--trace-memory [SECONDS]] [--profile] [--tiered]")
+        print("Example: whop-scraper scrape 1  (processes URLs 0-10000)")
+        print("         whop-scraper scrape 2  (processes URLs 10000-20000)")
+        print("         whop-scraper scrape 3  (processes URLs 20000-30000)")
+        print("  --bounded-memory      append saves to the batch file instead of holding the whole batch")
+        print("  --trace-memory [N]    log top allocation sites every N seconds (default 300)")
+        print("  --profile             sample stacks per stage and write flamegraph files to output/profile/")
+        print("  --tiered              scrape only JSON-LD head fields; run 'whop-scraper deep-pass' after merging")
+        sys.exit(1)
+
+    try:
+        batch_number = int(args[0])
+        if batch_number < 1:
+            print("Batch number must be 1 or greater")
+            sys.exit(1)
+    except ValueError:
+        print("Batch number must be an integer")
+        sys.exit(1)
+
+    ensure_output_dir()
+    log_message("Starting Updated Whop Communities Scraper...")
+    log_message(f"Processing batch {batch_number} (10k URLs per batch)")
+    log_message("Using batch processing: sitemap -> community URL -> scrape -> save")
+
+    if bounded_memory:
+        log_message("Bounded-memory mode: only the pending save buffer is kept in memory")
+    if tiered:
+        log_message("Tiered mode: head fields only - run 'whop-scraper deep-pass' after merging")
+
+    reporter = None
+    if trace_interval:
+        reporter = MemoryReporter(log_message, interval=trace_interval).start()
+
+    profiler = StackProfiler(f"scrape_batch_{batch_number}", log=log_message).start() if profile else None
+
+    # Process URLs for this batch
+    try:
+        total_communities = read_and_process_urls_batch(batch_number, bounded_memory=bounded_memory, tiered=tiered)
+    finally:
+        if reporter is not None:
+            reporter.stop()
+        if profiler is not None:
+            profiler.stop()
+
+    if total_communities is None:
+        log_message("Batch processing failed! Please check your sample_discovery.txt file.")
+        return
+
+    # Final summary
+    log_message("="*50)
+    log_message(f"Batch {batch_number} Scraping Complete!")
+    log_message(f"Total communities scraped in this batch: {total_communities}")
+    log_message(f"Data saved to: {OUTPUT_DIR}/raw_communities_batch_{batch_number}.json")
+    log_message("="*50)
+    log_message("To merge all batches, run the merge script after all batches complete")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Delta-encoded snapshot store for community time series
+Only fields that changed since the previous crawl are appended, so the store
+grows with the amount of change rather than with runs x communities.
+
+Usage: whop-scraper snapshots record <communities.json>
+       whop-scraper snapshots history <url>
+       whop-scraper snapshots growth <url> <field> [window_days]
+"""
+
+import json
+import os
+import sys
+from bisect import bisect_right
+from datetime import datetime
+
+from .common import OUTPUT_DIR
+from .streaming import ExternalSorter
+
+# Configuration
+SNAPSHOT_FILE = f"{OUTPUT_DIR}/snapshots.jsonl"
+TRACKED_FIELDS = ["reviews_count", "average_rating", "price_monthly_usd"]
+SECONDS_PER_DAY = 86400
+
+
+def to_timestamp(value):
+    """Convert an ISO string / datetime / epoch number to epoch seconds"""
+    if value is None:
+        return datetime.now().timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+class SnapshotStore:
+    """
+    Append-only change log with a per-community, per-field index
+
+    The index maps url -> field -> (timestamps, values), both lists sorted by
+    time, so point-in-time lookups are a single bisect. path=None gives an
+    empty store without a file (see iter_histories).
+    """
+
+    def __init__(self, path=SNAPSHOT_FILE):
+        self.path = path
+        self.index = {}
+        self.last_seen = {}
+        self._load()
+
+    def _load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    entry = json.loads(line)
+                    self._apply(entry["url"], entry["ts"], entry["changes"])
+
+    def _apply(self, url, ts, changes):
+        fields = self.index.setdefault(url, {})
+        for field, value in changes.items():
+            timestamps, values = fields.setdefault(field, ([], []))
+            timestamps.append(ts)
+            values.append(value)
+        self.last_seen[url] = max(ts, self.last_seen.get(url, ts))
+
+    def change_timestamps(self, url):
+        """Sorted timestamps at which any tracked field of a community changed"""
+        timestamps = set()
+        for series_timestamps, _ in self.index.get(url, {}).values():
+            timestamps.update(series_timestamps)
+        return sorted(timestamps)
+
+    def latest(self, url, field):
+        """Most recently recorded value of a field, or None"""
+        series = self.index.get(url, {}).get(field)
+        if not series:
+            return None
+        return series[1][-1]
+
+    def record(self, communities, timestamp=None):
+        """
+        Append the changed tracked fields of each community
+
+        Each record's own scraped_at is used as its timestamp unless an
+        explicit timestamp is given. Records older than what is already stored
+        for that community are ignored. Returns the number of change entries.
+        """
+        written = 0
+        with open(self.path, "a", encoding="utf-8") as f:
+            for community in communities:
+                url = community.get("url", "")
+                if not url:
+                    continue
+
+                ts = to_timestamp(timestamp or community.get("scraped_at"))
+                if url in self.last_seen and ts <= self.last_seen[url]:
+                    continue
+
+                changes = {}
+                for field in TRACKED_FIELDS:
+                    if field not in community:
+                        continue
+                    value = community[field]
+                    if self.latest(url, field) != value:
+                        changes[field] = value
+
+                if not changes:
+                    continue
+
+                f.write(json.dumps({"url": url, "ts": ts, "changes": changes}) + "\n")
+                self._apply(url, ts, changes)
+                written += 1
+
+        return written
+
+    def value_at(self, url, field, when=None):
+        """Value of a field as of time `when` (default: now), or None if unknown"""
+        series = self.index.get(url, {}).get(field)
+        if not series:
+            return None
+
+        timestamps, values = series
+        position = bisect_right(timestamps, to_timestamp(when))
+        if position == 0:
+            return None
+        return values[position - 1]
+
+    def growth(self, url, field, window_days, now=None):
+        """
+        Change in a field over the trailing window
+
+        If the community was first seen inside the window, growth is measured
+        from its first recorded value. Returns None when there is no data.
+        """
+        end = to_timestamp(now)
+        start = end - window_days * SECONDS_PER_DAY
+
+        end_value = self.value_at(url, field, end)
+        if end_value is None:
+            return None
+
+        start_value = self.value_at(url, field, start)
+        if start_value is None:
+            start_value = self.index[url][field][1][0]
+
+        return end_value - start_value
+
+    def review_velocity(self, url, window_days=30, now=None):
+        """New reviews per day over the trailing window (0.0 if unknown)"""
+        series = self.index.get(url, {}).get("reviews_count")
+        if not series:
+            return 0.0
+
+        end = to_timestamp(now)
+        start = max(end - window_days * SECONDS_PER_DAY, series[0][0])
+        elapsed_days = (end - start) / SECONDS_PER_DAY
+        if elapsed_days <= 0:
+            return 0.0
+
+        gained = self.growth(url, "reviews_count", window_days, end)
+        return round(max(gained or 0, 0) / elapsed_days, 3)
+
+
+def iter_histories(path=SNAPSHOT_FILE, spill_dir=OUTPUT_DIR):
+    """
+    Yield (url, store holding only that community) for every url in the log, in url order
+
+    The log is external-sorted by (url, time), so memory holds one
+    community's history at a time; merge it against records sorted by url
+    instead of loading the whole store.
+    """
+    sorter = ExternalSorter(key=lambda entry: (entry["url"], entry["ts"]), spill_dir=spill_dir)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    sorter.add(json.loads(line))
+
+    url, store = None, None
+    for entry in sorter.sorted():
+        if entry["url"] != url:
+            if store is not None:
+                yield url, store
+            url, store = entry["url"], SnapshotStore(path=None)
+        store._apply(entry["url"], entry["ts"], entry["changes"])
+    if store is not None:
+        yield url, store
+
+
+def main():
+    """Command line entry point"""
+    if len(sys.argv) < 3:
+        print(__doc__.strip())
+        sys.exit(1)
+
+    command = sys.argv[1]
+    store = SnapshotStore()
+
+    if command == "record":
+        with open(sys.argv[2], "r", encoding="utf-8") as f:
+            communities = json.load(f)
+        written = store.record(communities)
+        print(f"Recorded {written} changed communities to {store.path}")
+
+    elif command == "history":
+        url = sys.argv[2]
+        for field, (timestamps, values) in store.index.get(url, {}).items():
+            print(f"{field}:")
+            for ts, value in zip(timestamps, values):
+                print(f"  {datetime.fromtimestamp(ts).isoformat()}  {value}")
+
+    elif command == "growth":
+        if len(sys.argv) < 4:
+            print(__doc__.strip())
+            sys.exit(1)
+        url, field = sys.argv[2], sys.argv[3]
+        window_days = float(sys.argv[4]) if len(sys.argv) > 4 else 30
+        print(f"{field} growth over {window_days:g} days: {store.growth(url, field, window_days)}")
+
+    else:
+        print(f"Unknown command: {command}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
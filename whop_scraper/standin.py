@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+"""
+Fault-injecting local stand-in for whop.com
+Serves discover sitemaps, product sitemaps and community pages from
+localhost and injects faults on a configurable schedule, so rate-limit,
+retry and timeout handling can be exercised without provoking the real site.
+
+Pages are replayed from a directory that mirrors the URL paths (a path
+ending in / is read from index.html), e.g.
+    pages/sitemaps/discover/1.xml
+    pages/sitemaps/product/prod_abc.xml
+    pages/discover/some-community/index.html
+or, without a directory, generated: a small site of priced and free
+communities in the same markup the extractor reads.
+
+get_page reaches the stand-in through the egress hook (StandinRoute), so
+URLs keep their https://whop.com form and discovery and scraping run
+unchanged. `check` does this for every fault profile: it scrapes the whole
+site through get_page and scrape_sitemap and compares each profile's
+records with the fault-free run. A profile passes when every community is
+either scraped exactly as in the baseline, recorded in the dead-letter file,
+or hit by a content fault (truncated / missing JSON-LD) and degraded as
+expected: the fields whose markup was cut are empty, every other field
+matches the baseline - i.e. nothing is silently lost or silently wrong.
+
+A fault schedule is a list of rules (a profile name or a JSON file):
+    [{"fault": "429", "match": "community", "every": 4, "retry_after": 1}]
+fault is one of FAULTS; match limits it to discover / product / community
+pages; the rule fires on `burst` consecutive matching requests out of every
+`every`; sticky keeps faulting a path once it has been hit.
+
+Usage: whop-scraper standin serve [port] [--profile NAME | --faults FILE] [--pages DIR]
+       whop-scraper standin check [--profile NAME ...] [--pages DIR] [--communities N]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import requests
+
+from .common import BASE_URL
+
+# Configuration
+DEFAULT_PORT = 8900
+DEFAULT_COMMUNITIES = 30  # Size of the generated site
+PAGE_PADDING_BYTES = 48 * 1024  # Markup after the price, like the real page's tail
+CHECK_COOLDOWN = 2.0  # Circuit breaker cooldown during check (seconds, not minutes)
+
+FAULTS = ("429", "5xx", "stall", "slow_drip", "truncated", "no_json_ld", "redirect_loop")
+FAULT_PROFILES = {
+    "none": [],
+    "429_retry_after": [{"fault": "429", "every": 4, "retry_after": 1}],
+    "429_bare": [{"fault": "429", "every": 4}],
+    "5xx_burst": [{"fault": "5xx", "every": 10, "burst": 2, "status": 503}],
+    "slow_tail": [{"fault": "stall", "match": "community", "every": 10, "seconds": 3}],
+    "slow_drip": [{"fault": "slow_drip", "match": "community", "every": 2, "chunk": 1024, "delay": 0.01}],
+    "truncated": [{"fault": "truncated", "match": "community", "every": 5, "keep": 0.01}],
+    "disconnect": [{"fault": "truncated", "match": "community", "every": 5, "keep": 0.01, "disconnect": True}],
+    "no_json_ld": [{"fault": "no_json_ld", "match": "community", "every": 5}],
+    "redirect_loop": [{"fault": "redirect_loop", "match": "product", "every": 7, "sticky": True}],
+}
+
+JSON_LD_PATTERN = re.compile(r'<script type="application/ld\+json">.*?</script>', re.S)
+# Page sections a content fault can cut, and the record fields read from each
+SECTION_PATTERNS = {
+    "json_ld": JSON_LD_PATTERN,
+    "pricing": re.compile(r'<div class="fui-RadioButtonGroup">.*?</div>|Join for free', re.S),
+}
+SECTION_FIELDS = {
+    "json_ld": ("description", "average_rating", "reviews_count", "creator_name", "category"),
+    "pricing": ("price_monthly_usd", "price_display", "is_free"),
+}
+MISSING_VALUES = ("", 0, "Unknown", "Other", False, None)  # What the extractor leaves in a field it couldn't read
+
+
+def page_kind(path):
+    """discover, product, community or other, from the URL path"""
+    if path.startswith("/sitemaps/discover/"):
+        return "discover"
+    if path.startswith("/sitemaps/product/"):
+        return "product"
+    if path.startswith("/discover/"):
+        return "community"
+    return "other"
+
+
+def load_fault_rules(profile=None, faults_file=None):
+    """Rules for a named profile or from a JSON file (a list of rules)"""
+    if faults_file:
+        with open(faults_file, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+    else:
+        if profile not in FAULT_PROFILES:
+            raise ValueError(f"Unknown fault profile {profile!r} (choose from {', '.join(FAULT_PROFILES)})")
+        rules = FAULT_PROFILES[profile]
+    for rule in rules:
+        if rule.get("fault") not in FAULTS:
+            raise ValueError(f"Unknown fault {rule.get('fault')!r} (choose from {', '.join(FAULTS)})")
+    return rules
+
+
+class FaultSchedule:
+    """Decides which fault, if any, each request gets"""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.seen = [0] * len(self.rules)
+        self.sticky = {}  # path -> rule
+        self.requests = 0
+        self.injected = Counter()
+        self.degraded_paths = {}  # Path -> page sections a content fault cut from it
+        self._lock = threading.Lock()
+
+    def next_fault(self, path, kind):
+        """The rule to apply to this request, or None to serve it normally"""
+        with self._lock:
+            self.requests += 1
+            rule = self.sticky.get(path)
+            if rule is None:
+                for i, candidate in enumerate(self.rules):
+                    if candidate.get("match", "any") not in ("any", kind):
+                        continue
+                    position = self.seen[i]
+                    self.seen[i] += 1
+                    if position % candidate.get("every", 1) < candidate.get("burst", 1):
+                        rule = candidate
+                        if rule.get("sticky"):
+                            self.sticky[path] = rule
+                        break
+            if rule is not None:
+                self.injected[rule["fault"]] += 1
+            return rule
+
+    def record_degraded(self, path, original, served):
+        """Note which sections of the page a content fault removed"""
+        text, served_text = original.decode("utf-8", "replace"), served.decode("utf-8", "replace")
+        removed = set()
+        for section, pattern in SECTION_PATTERNS.items():
+            match = pattern.search(text)
+            if match and match.group(0) not in served_text:
+                removed.add(section)
+        with self._lock:
+            self.degraded_paths.setdefault(path, set()).update(removed)
+
+
+class StandinSite:
+    """The pages the stand-in serves: replayed from pages_dir or generated"""
+
+    def __init__(self, pages_dir=None, communities=DEFAULT_COMMUNITIES, sitemap_count=None):
+        from .discover import DISCOVER_SITEMAP_COUNT
+
+        self.pages_dir = pages_dir
+        self.communities = communities
+        self.sitemap_count = sitemap_count or DISCOVER_SITEMAP_COUNT
+
+    def page(self, path):
+        """(content type, body bytes) for a URL path, or None for a 404"""
+        if self.pages_dir:
+            file_path = os.path.join(self.pages_dir, path.lstrip("/"))
+            if path.endswith("/"):
+                file_path = os.path.join(file_path, "index.html")
+            if ".." in path or not os.path.isfile(file_path):
+                return None
+            with open(file_path, "rb") as f:
+                body = f.read()
+            return ("application/xml" if path.endswith(".xml") else "text/html; charset=utf-8"), body
+        return self.generated_page(path)
+
+    def generated_page(self, path):
+        match = re.fullmatch(r"/sitemaps/discover/(\d+)\.xml", path)
+        if match and 1 <= int(match.group(1)) <= self.sitemap_count:
+            index = int(match.group(1)) - 1
+            locs = [f"{BASE_URL}/discover/"] + [
+                f"{BASE_URL}/sitemaps/product/{product_id(n)}.xml"
+                for n in range(index, self.communities, self.sitemap_count)
+            ]
+            return "application/xml", sitemap_xml(locs)
+
+        match = re.fullmatch(r"/sitemaps/product/prod_standin(\d+)\.xml", path)
+        if match and int(match.group(1)) < self.communities:
+            n = int(match.group(1))
+            locs = [f"{BASE_URL}/app/{product_id(n)}/", f"{BASE_URL}/discover/standin-{n}/?productId={product_id(n)}"]
+            return "application/xml", sitemap_xml(locs)
+
+        match = re.fullmatch(r"/discover/standin-(\d+)/", path)
+        if match and int(match.group(1)) < self.communities:
+            return "text/html; charset=utf-8", community_html(int(match.group(1)))
+        return None
+
+
+def product_id(n):
+    return f"prod_standin{n:05d}"
+
+
+def sitemap_xml(locs):
+    entries = "".join(f"  <url><loc>{loc}</loc></url>\n" for loc in locs)
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        f"{entries}</urlset>\n"
+    ).encode("utf-8")
+
+
+def community_html(n):
+    """A generated community page: JSON-LD Product, then the pricing radio button, then filler"""
+    product = {
+        "@context": "https://schema.org",
+        "@type": "Product",
+        "name": f"Stand-in Community {n}",
+        "description": f"Trading signals and daily market breakdowns, community {n}",
+        "brand": {"@type": "Brand", "name": f"Creator {n % 7}"},
+        "aggregateRating": {"@type": "AggregateRating", "ratingValue": round(3.5 + (n % 16) / 10, 1), "reviewCount": 5 + n * 13 % 400},
+    }
+    if n % 4 == 0:
+        pricing = "<p>Join for free</p>"
+    else:
+        pricing = f'<div class="fui-RadioButtonGroup"><span>${9.99 + (n * 17 % 300):,.2f} / month</span></div>'
+    filler = "<p>" + "Lorem ipsum dolor sit amet. " * (PAGE_PADDING_BYTES // 28) + "</p>"
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>Stand-in Community {n} | Whop</title>"
+        f'<script type="application/ld+json">{json.dumps(product)}</script>'
+        f"</head><body><h1>Stand-in Community {n}</h1>{pricing}{filler}</body></html>"
+    ).encode("utf-8")
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Serves the site through the server's fault schedule"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real site
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path
+
+        # Follow-ups of a redirect loop keep bouncing between two URLs
+        if "loop=" in url.query:
+            self.send_redirect(f"{path}?loop={2 if 'loop=1' in url.query else 1}")
+            return
+
+        rule = self.server.schedule.next_fault(path, page_kind(path))
+        fault = rule["fault"] if rule else None
+        if fault == "429":
+            headers = {"Retry-After": str(rule["retry_after"])} if "retry_after" in rule else {}
+            self.send_body(429, b"Too Many Requests", headers=headers)
+            return
+        if fault == "5xx":
+            self.send_body(rule.get("status", 503), b"Service Unavailable")
+            return
+        if fault == "redirect_loop":
+            self.send_redirect(f"{path}?loop=1")
+            return
+        if fault == "stall":
+            # A slow outlier: nothing at all, then the normal response
+            time.sleep(rule.get("seconds", 3))
+
+        page = self.server.site.page(path)
+        if page is None:
+            self.send_body(404, b"Not Found")
+            return
+        content_type, body = page
+
+        if fault == "no_json_ld":
+            degraded = JSON_LD_PATTERN.sub("", body.decode("utf-8")).encode("utf-8")
+            self.server.schedule.record_degraded(path, body, degraded)
+            body = degraded
+        if fault == "truncated":
+            keep = int(len(body) * rule.get("keep", 0.5))
+            self.server.schedule.record_degraded(path, body, body[:keep])
+            if rule.get("disconnect"):
+                # Promise the whole page, then drop the connection part way
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body[:keep])
+                self.close_connection = True
+                return
+            body = body[:keep]
+        if fault == "slow_drip":
+            self.send_body(200, body, content_type, chunk=rule.get("chunk", 1024), delay=rule.get("delay", 0.05))
+            return
+        self.send_body(200, body, content_type)
+
+    def send_redirect(self, location):
+        self.send_body(302, b"", headers={"Location": location})
+
+    def send_body(self, status, body, content_type="text/plain", headers=None, chunk=None, delay=0):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            if chunk is None:
+                self.wfile.write(body)
+                return
+            for start in range(0, len(body), chunk):
+                self.wfile.write(body[start:start + chunk])
+                self.wfile.flush()
+                time.sleep(delay)
+        except ConnectionError:
+            # The client stopped reading (early stop) - expected
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port, site, schedule):
+        super().__init__(("127.0.0.1", port), StandinHandler)
+        self.site = site
+        self.schedule = schedule
+
+    def handle_error(self, request, client_address):
+        # Clients that stop reading early reset the connection - not worth a traceback
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_standin(site, schedule, port=0):
+    """Start the stand-in on localhost in a background thread. Returns the server"""
+    server = StandinServer(port, site, schedule)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class StandinRoute:
+    """
+    Egress route (see fetch.set_egress_pool) that sends whop.com requests to the stand-in
+
+    Only the scheme and host are rewritten, so every URL the scraper sees,
+    stores and checks still starts with https://whop.com.
+    """
+
+    def __init__(self, server_url):
+        self.server_url = server_url.rstrip("/")
+        self.session = requests.Session()
+
+    def get(self, url, **kwargs):
+        if url.startswith(BASE_URL):
+            url = self.server_url + url[len(BASE_URL):]
+        return self.session.get(url, **kwargs)
+
+
+class NoRateLimit:
+    """Rate limiter that never waits, so check measures the scraper and not its politeness delay"""
+
+    def acquire(self):
+        pass
+
+
+def crawl(site):
+    """Discover and scrape the whole site through get_page. Returns ({sitemap_url: record or None}, elapsed)"""
+    from .discover import iter_sitemap_locs
+    from .fetch import get_page
+    from .scrape import scrape_sitemap
+
+    start = time.time()
+    sitemap_urls = []
+    for i in range(1, site.sitemap_count + 1):
+        locs = get_page(f"{BASE_URL}/sitemaps/discover/{i}.xml", timeout=30, reader=iter_sitemap_locs)
+        if locs is None:
+            continue
+        try:
+            sitemap_urls.extend(url for url in locs if "sitemaps/product/prod_" in url)
+        except Exception as e:
+            print(f"Discover sitemap {i}.xml failed part way: {e}")
+
+    results = {url: scrape_sitemap(url) for url in dict.fromkeys(sitemap_urls)}
+    return results, time.time() - start
+
+
+def dead_lettered_urls():
+    """{sitemap_url: reason} for every URL still in the dead-letter file"""
+    from .dead_letter import load_dead_letters
+
+    return {url: entry["reason"] for url, entry in load_dead_letters().items() if not entry["resolved"]}
+
+
+def comparable(record):
+    """Record fields that should match the baseline (everything but the scrape time)"""
+    if record is None:
+        return None
+    return {key: value for key, value in record.items() if key != "scraped_at"}
+
+
+def run_profile(name, rules, pages_dir=None, communities=DEFAULT_COMMUNITIES, verbose=False):
+    """
+    Crawl the stand-in under one fault schedule, in a scratch directory
+
+    The scratch directory keeps the run's log, dead letters and other
+    output/ files away from the real crawl's. Returns the crawl results, the
+    dead-lettered URLs, the schedule and the elapsed time.
+    """
+    from . import fetch
+    from .circuit_breaker import CircuitBreaker
+    from .extract_cache import close_extract_cache
+
+    site = StandinSite(os.path.abspath(pages_dir) if pages_dir else None, communities)
+    schedule = FaultSchedule(rules)
+    server = start_standin(site, schedule)
+    fetch.set_egress_pool(StandinRoute(f"http://127.0.0.1:{server.server_address[1]}"))
+    fetch.set_circuit_breaker(CircuitBreaker(base_cooldown=CHECK_COOLDOWN))
+    fetch.set_rate_limiter(NoRateLimit())
+
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix=f"standin_{name}_") as scratch:
+        os.chdir(scratch)
+        try:
+            with open(os.devnull, "w") as devnull:
+                with contextlib.nullcontext() if verbose else contextlib.redirect_stdout(devnull):
+                    results, elapsed = crawl(site)
+            dead_letters = dead_lettered_urls()
+        finally:
+            # The extraction cache lives in the scratch output/ too
+            close_extract_cache()
+            os.chdir(previous_dir)
+            server.shutdown()
+            server.server_close()
+    return results, dead_letters, schedule, elapsed
+
+
+def degraded_as_expected(record, expected, removed):
+    """True if exactly the fields read from the removed sections are missing and the rest match"""
+    missing_fields = {field for section in removed for field in SECTION_FIELDS[section]}
+    for field in set(record) | set(expected):
+        if field in missing_fields:
+            if record.get(field) not in MISSING_VALUES:
+                return False
+        elif record.get(field) != expected.get(field):
+            return False
+    return True
+
+
+def assess(results, dead_letters, schedule, baseline):
+    """Sort every baseline community into correct / degraded / dead_lettered / wrong / lost"""
+    from .dead_letter import SCRAPE_FAILED
+
+    outcome = Counter()
+    for sitemap_url, expected in baseline.items():
+        record = comparable(results.get(sitemap_url))
+        paths = {urlsplit(sitemap_url).path}
+        if expected is not None:
+            paths.add(urlsplit(expected["url"]).path)
+        degraded = [schedule.degraded_paths[path] for path in paths if path in schedule.degraded_paths]
+        if record is not None and record == expected:
+            outcome["correct"] += 1
+        elif degraded:
+            removed = set().union(*degraded)
+            if record is None:
+                # A page cut too short to read at all must fail loudly, as a scrape failure
+                outcome["dead_lettered" if dead_letters.get(sitemap_url) == SCRAPE_FAILED else "lost"] += 1
+            elif removed and degraded_as_expected(record, expected, removed):
+                outcome["degraded"] += 1
+            else:
+                outcome["wrong"] += 1
+        elif record is None and sitemap_url in dead_letters:
+            outcome["dead_lettered"] += 1
+        elif record is None:
+            outcome["lost"] += 1
+        else:
+            outcome["wrong"] += 1
+    return outcome
+
+
+def run_check(profiles, pages_dir=None, communities=DEFAULT_COMMUNITIES, verbose=False):
+    """Crawl the stand-in under each profile and compare with the fault-free run. Returns True if all pass"""
+    from .fetch import hedge_stats
+
+    results, _, _, elapsed = run_profile("none", [], pages_dir, communities, verbose)
+    baseline = {url: comparable(record) for url, record in results.items()}
+    scraped = sum(record is not None for record in baseline.values())
+    print(f"Baseline (no faults): {scraped}/{len(baseline)} communities in {elapsed:.1f}s")
+    if not scraped:
+        print("Nothing scraped without faults - check the stand-in pages")
+        return False
+
+    all_passed = True
+    print(f"\n{'Profile':<16} {'Result':<6} {'Req':>5} {'Faults':>6} {'Hedged':>6} {'Time':>7} {'Pages/s':>7}  Outcome")
+    for name in profiles:
+        hedged = hedge_stats()["hedged"]
+        results, dead_letters, schedule, elapsed = run_profile(name, load_fault_rules(name), pages_dir, communities, verbose)
+        hedged = hedge_stats()["hedged"] - hedged
+        outcome = assess(results, dead_letters, schedule, baseline)
+        passed = not outcome["wrong"] and not outcome["lost"]
+        all_passed = all_passed and passed
+        rate = sum(record is not None for record in results.values()) / elapsed if elapsed else 0
+        summary = ", ".join(f"{key} {outcome[key]}" for key in ("correct", "degraded", "dead_lettered", "wrong", "lost") if outcome[key])
+        print(
+            f"{name:<16} {'PASS' if passed else 'FAIL':<6} {schedule.requests:>5} "
+            f"{sum(schedule.injected.values()):>6} {hedged:>6} {elapsed:>6.1f}s {rate:>7.2f}  {summary}"
+        )
+    return all_passed
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Fault-injecting local stand-in for whop.com")
+    parser.add_argument("command", choices=["serve", "check"])
+    parser.add_argument("port", nargs="?", type=int, default=DEFAULT_PORT, help="serve: port to listen on")
+    parser.add_argument("--profile", action="append", choices=list(FAULT_PROFILES), help="fault profile (check: repeatable, default all)")
+    parser.add_argument("--faults", help="serve: JSON file with a list of fault rules")
+    parser.add_argument("--pages", help="directory of stored pages to replay instead of the generated site")
+    parser.add_argument("--communities", type=int, default=DEFAULT_COMMUNITIES, help="size of the generated site")
+    parser.add_argument("--verbose", action="store_true", help="check: show the scraper's log output")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        rules = load_fault_rules((args.profile or ["none"])[0], args.faults)
+        server = StandinServer(args.port, StandinSite(args.pages, args.communities), FaultSchedule(rules))
+        print(f"Stand-in whop.com listening on http://127.0.0.1:{args.port} ({len(rules)} fault rules)")
+        print(f"Try: http://127.0.0.1:{args.port}/sitemaps/discover/1.xml")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        print(f"Served {server.schedule.requests} requests, faults: {dict(server.schedule.injected)}")
+
+    else:
+        profiles = args.profile or [name for name in FAULT_PROFILES if name != "none"]
+        if not run_check(profiles, args.pages, args.communities, args.verbose):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
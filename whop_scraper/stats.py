@@ -0,0 +1,229 @@
+"""
+Single-pass online statistics for merge and rank summaries
+An OnlineStats is configured with the numeric summaries (count, mean,
+min/max, approximate quantiles), value counts and top-k lists a summary
+needs, then fed each record once - usually inside a loop that already walks
+the data (dedupe, scoring). report() returns plain JSON-ready dicts, so the
+printed summary and the saved report come from the same numbers.
+
+Quantiles come from a merging t-digest: memory stays at a few hundred
+centroids however many records are added, with the best accuracy at the
+tails (p99) where it matters most.
+"""
+
+import heapq
+import math
+
+# Configuration
+TDIGEST_COMPRESSION = 100  # Higher is more accurate and uses more centroids
+REPORT_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+class TDigest:
+    """Merging t-digest (Dunning) with the arcsine scale function"""
+
+    def __init__(self, compression=TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.centroids = []  # (mean, weight), sorted by mean
+        self.buffer = []
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.buffer.append(value)
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self.buffer) >= 5 * self.compression:
+            self._compress()
+
+    def _scale(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _compress(self):
+        if not self.buffer:
+            return
+        items = sorted(self.centroids + [(value, 1) for value in self.buffer])
+        self.buffer = []
+
+        merged = []
+        weight_before = 0
+        mean, weight = items[0]
+        k_lower = self._scale(0)
+        for next_mean, next_weight in items[1:]:
+            # Merge while the combined centroid spans at most one unit of scale
+            if self._scale((weight_before + weight + next_weight) / self.count) - k_lower <= 1:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                merged.append((mean, weight))
+                weight_before += weight
+                k_lower = self._scale(weight_before / self.count)
+                mean, weight = next_mean, next_weight
+        merged.append((mean, weight))
+        self.centroids = merged
+
+    def quantile(self, q):
+        """Approximate value at quantile q (0..1), or None when empty"""
+        self._compress()
+        if not self.centroids:
+            return None
+        target = q * self.count
+        cumulative = 0
+        previous_center, previous_mean = 0, self.min
+        for mean, weight in self.centroids:
+            center = cumulative + weight / 2
+            if target < center:
+                if center == previous_center:
+                    return mean
+                return previous_mean + (mean - previous_mean) * (target - previous_center) / (center - previous_center)
+            previous_center, previous_mean = center, mean
+            cumulative += weight
+        if self.count == previous_center:
+            return self.max
+        return previous_mean + (self.max - previous_mean) * (target - previous_center) / (self.count - previous_center)
+
+
+def value_getter(source, default=None):
+    """record -> value for a field name, or the callable itself"""
+    if callable(source):
+        return source
+    return lambda record: record.get(source, default)
+
+
+class NumericSummary:
+    """Count, sum, mean, min/max and quantiles of one numeric value"""
+
+    def __init__(self, source, where=None, default=None, quantiles=REPORT_QUANTILES):
+        self.source = source
+        self.value = value_getter(source, default)
+        self.where = where
+        self.quantiles = quantiles
+        self.count = 0
+        self.missing = 0
+        self.total = 0
+        self.digest = TDigest()
+
+    def add(self, record):
+        if self.where is not None and not self.where(record):
+            return
+        value = self.value(record)
+        if value is None or value == "" or isinstance(value, bool):
+            self.missing += 1
+            return
+        self.count += 1
+        self.total += value
+        self.digest.add(value)
+
+    def report(self):
+        return {
+            "field": self.source if isinstance(self.source, str) else None,
+            "count": self.count,
+            "missing": self.missing,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.digest.min if self.count else None,
+            "max": self.digest.max if self.count else None,
+            "quantiles": {f"p{round(q * 100)}": self.digest.quantile(q) for q in self.quantiles},
+        }
+
+
+class ValueCounts:
+    """How many records have each value, most common first (ties in first-seen order)"""
+
+    def __init__(self, source, where=None, default=None):
+        self.value = value_getter(source, default)
+        self.where = where
+        self.counts = {}
+
+    def add(self, record):
+        if self.where is not None and not self.where(record):
+            return
+        value = self.value(record)
+        self.counts[value] = self.counts.get(value, 0) + 1
+
+    def report(self):
+        return dict(sorted(self.counts.items(), key=lambda item: item[1], reverse=True))
+
+
+class TopK:
+    """
+    The k records with the largest value, kept in a bounded min-heap
+
+    Ties go to the earlier record, matching a stable sort by the value
+    (descending). Only `fields` of each record are kept (those it has).
+    """
+
+    def __init__(self, source, k, fields=None, default=0):
+        self.value = value_getter(source, default)
+        self.k = k
+        self.fields = fields
+        self.heap = []  # (value, -position, record fields)
+        self.position = 0
+
+    def add(self, record):
+        self.position += 1
+        value = self.value(record)
+        if value is None:
+            return
+        key = (value, -self.position)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, key + (self.project(record),))
+        elif key > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, key + (self.project(record),))
+
+    def project(self, record):
+        if self.fields is None:
+            return dict(record)
+        return {field: record[field] for field in self.fields if field in record}
+
+    def report(self):
+        return [item[2] for item in sorted(self.heap, key=lambda item: item[:2], reverse=True)]
+
+
+class OnlineStats:
+    """A set of named summaries, all filled by one pass over the records"""
+
+    def __init__(self):
+        self.records = 0
+        self.numeric_summaries = {}
+        self.value_counts = {}
+        self.top_lists = {}
+
+    def numeric(self, name, source, where=None, default=None):
+        self.numeric_summaries[name] = NumericSummary(source, where, default)
+        return self
+
+    def counts(self, name, source, where=None, default=None):
+        self.value_counts[name] = ValueCounts(source, where, default)
+        return self
+
+    def top(self, name, source, k, fields=None, default=0):
+        self.top_lists[name] = TopK(source, k, fields, default)
+        return self
+
+    def add(self, record):
+        self.records += 1
+        for summary in self.numeric_summaries.values():
+            summary.add(record)
+        for counts in self.value_counts.values():
+            counts.add(record)
+        for top in self.top_lists.values():
+            top.add(record)
+
+    def add_all(self, records):
+        for record in records:
+            self.add(record)
+        return self
+
+    def report(self):
+        """Machine-readable results: {records, numeric, counts, top}"""
+        return {
+            "records": self.records,
+            "numeric": {name: summary.report() for name, summary in self.numeric_summaries.items()},
+            "counts": {name: counts.report() for name, counts in self.value_counts.items()},
+            "top": {name: top.report() for name, top in self.top_lists.items()},
+        }
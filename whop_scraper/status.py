@@ -0,0 +1,54 @@
+"""
+Offline status report: batch files, resume checkpoints and dead letters
+Reads only local files, so it never imports the HTTP or parsing stack.
+
+Usage: whop-scraper status
+"""
+
+import glob
+import os
+
+from .checkpoint import checkpoint_file_path, load_checkpoint
+from .common import DISCOVERY_FILE, count_discovery_urls
+from .dead_letter import load_dead_letters, show_status
+from .merge import MERGED_FILE, show_batch_status
+
+
+def show_checkpoint_status():
+    """Print per-batch progress from the resume checkpoints"""
+    print("\n=== CHECKPOINTS ===")
+
+    paths = glob.glob(checkpoint_file_path("*"))
+    if not paths:
+        print("No checkpoints found")
+        return
+
+    batch_numbers = sorted(int(path.split("_")[-1].replace(".json", "")) for path in paths)
+    for batch_number in batch_numbers:
+        checkpoint = load_checkpoint(batch_number) or {}
+        state = "complete" if checkpoint.get("complete") else "in progress"
+        print(
+            f"Batch {batch_number}: {checkpoint.get('processed', 0)}/{checkpoint.get('total_urls', '?')} sitemaps, "
+            f"{checkpoint.get('communities', 0)} communities ({state}, updated {checkpoint.get('updated_at', '?')})"
+        )
+
+
+def main():
+    """Command line entry point"""
+    print("=== WHOP SCRAPER STATUS ===")
+
+    if os.path.exists(DISCOVERY_FILE):
+        print(f"Discovered product sitemaps: {count_discovery_urls()} ({DISCOVERY_FILE})")
+    else:
+        print(f"No discovery file yet ({DISCOVERY_FILE}) - run 'whop-scraper discover'")
+
+    show_batch_status()
+    show_checkpoint_status()
+    show_status(load_dead_letters())
+
+    if os.path.exists(MERGED_FILE):
+        print(f"\nMerged file: {MERGED_FILE} ({os.path.getsize(MERGED_FILE) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Constant-memory JSON array streaming and external sorting
+iter_json_array reads one record at a time from a (possibly huge) top-level
+JSON array file; ExternalSorter spills sorted runs to temporary JSONL files
+and merges them back, so ranking can order more records than fit in RAM.
+"""
+
+import heapq
+import json
+import os
+import tempfile
+
+# Configuration
+READ_CHUNK_SIZE = 64 * 1024
+SPILL_RUN_SIZE = 5000  # Records held in memory before a sorted run is spilled
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+def iter_json_array(path, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yield the items of a top-level JSON array file one at a time
+
+    Only the current item (plus one read chunk) is held in memory.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        position = 0
+        started = False
+        eof = False
+
+        while True:
+            # Skip whitespace and the separators between items
+            while position < len(buffer) and buffer[position] in _WHITESPACE + ("," if started else ""):
+                position += 1
+
+            if position < len(buffer):
+                if not started:
+                    if buffer[position] != "[":
+                        raise ValueError(f"{path} is not a JSON array")
+                    started = True
+                    position += 1
+                    continue
+                if buffer[position] == "]":
+                    return
+                try:
+                    item, end = _decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    # A number cut off by the chunk boundary decodes as a shorter
+                    # number, so only accept an item once its delimiter is read
+                    if eof or (end < len(buffer) and buffer[end] in _WHITESPACE + ",]"):
+                        yield item
+                        position = end
+                        continue
+            elif eof:
+                raise ValueError(f"{path} ended before the JSON array was closed")
+
+            chunk = f.read(chunk_size)
+            buffer = buffer[position:] + chunk
+            position = 0
+            eof = not chunk
+
+
+class JsonArrayWriter:
+    """Write a JSON array one item at a time, in the json.dump(indent=2) layout"""
+
+    def __init__(self, path, default=None):
+        self.path = path
+        self.default = default
+        self.file = open(path, "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, item):
+        text = json.dumps(item, indent=2, default=self.default).replace("\n", "\n  ")
+        self.file.write(("[\n  " if self.count == 0 else ",\n  ") + text)
+        self.count += 1
+
+    def close(self):
+        self.file.write("\n]" if self.count else "[]")
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class ExternalSorter:
+    """
+    Sort records by a key without holding them all in memory
+
+    Records are buffered up to run_size, sorted and spilled to a temporary
+    JSONL file; sorted() merges the runs lazily. Equal keys keep insertion
+    order (runs are stable and merged in spill order). `default` is passed to
+    json.dumps for records that aren't plain JSON types.
+    """
+
+    def __init__(self, key, run_size=SPILL_RUN_SIZE, spill_dir=None, default=None):
+        self.key = key
+        self.default = default
+        self.run_size = run_size
+        self.spill_dir = spill_dir
+        self.buffer = []
+        self.runs = []
+
+    def add(self, record):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.run_size:
+            self._spill()
+
+    def _spill(self):
+        self.buffer.sort(key=self.key)
+        fd, path = tempfile.mkstemp(prefix="rank_run_", suffix=".jsonl", dir=self.spill_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for record in self.buffer:
+                f.write(json.dumps(record, ensure_ascii=False, default=self.default) + "\n")
+        self.runs.append(path)
+        self.buffer = []
+
+    @staticmethod
+    def _read_run(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def sorted(self):
+        """Yield every record in key order, then delete the spill files"""
+        self.buffer.sort(key=self.key)
+        try:
+            if not self.runs:
+                yield from self.buffer
+                return
+            runs = [self._read_run(path) for path in self.runs]
+            yield from heapq.merge(*runs, iter(self.buffer), key=self.key)
+        finally:
+            self.cleanup()
+
+    def cleanup(self):
+        for path in self.runs:
+            if os.path.exists(path):
+                os.remove(path)
+        self.runs = []
+        self.buffer = []
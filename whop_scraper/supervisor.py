@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Batch Supervisor for Whop Scraper
+Runs several scrape batches in parallel worker processes, restarts
+crashed workers from their last checkpoint and shares one request rate
+budget and one circuit breaker across all of them. Ctrl+C stops every worker after its current URL.
+
+Usage: whop-scraper supervise <workers> [--batches 1-5] [--rate 2.0] [--max-restarts 3] [--bounded-memory] [--tiered]
+Example: whop-scraper supervise 4  (runs every batch in sample_discovery.txt, 4 at a time)
+"""
+
+import argparse
+import multiprocessing
+import signal
+import sys
+import time
+from datetime import datetime
+
+from .checkpoint import load_checkpoint
+from .circuit_breaker import CircuitBreaker
+from .common import BATCH_SIZE_URLS, count_discovery_urls
+
+# Configuration
+DEFAULT_RATE = 2.0  # Requests per second across all workers
+DEFAULT_MAX_RESTARTS = 3
+STATUS_INTERVAL = 60  # Seconds between progress reports
+POLL_INTERVAL = 1.0
+
+
+class SharedRateLimiter:
+    """
+    Cross-process request pacer
+
+    Holds the next free request slot in shared memory, so all workers together
+    stay under `rate` requests per second.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_slot = multiprocessing.Value("d", 0.0)
+
+    def acquire(self):
+        with self.next_slot.get_lock():
+            now = time.time()
+            slot = max(now, self.next_slot.value)
+            self.next_slot.value = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def run_batch_worker(batch_number, rate_limiter, circuit_breaker, stop_event, bounded_memory=False, tiered=False):
+    """Worker process: scrape one batch through the shared rate limiter and circuit breaker"""
+    # The supervisor handles Ctrl+C and asks workers to stop via stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Imported in the worker so the supervisor itself never loads the HTTP stack
+    from . import fetch
+    from .scrape import read_and_process_urls_batch
+
+    fetch.set_rate_limiter(rate_limiter)
+    fetch.set_circuit_breaker(circuit_breaker)
+
+    result = read_and_process_urls_batch(batch_number, stop_event, bounded_memory, tiered)
+    sys.exit(0 if result is not None else 1)
+
+
+def count_batches():
+    """Number of batches needed to cover sample_discovery.txt"""
+    url_count = count_discovery_urls()
+    return (url_count + BATCH_SIZE_URLS - 1) // BATCH_SIZE_URLS
+
+
+def parse_batch_range(text):
+    """Parse '3' or '1-5' into a list of batch numbers"""
+    if "-" in text:
+        first, last = text.split("-", 1)
+        return list(range(int(first), int(last) + 1))
+    return [int(text)]
+
+
+def print_status(running, pending, finished, failed):
+    """Print per-batch progress from the worker checkpoints"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"\n[{timestamp}] === SUPERVISOR STATUS ===")
+    for batch_number in sorted(running):
+        checkpoint = load_checkpoint(batch_number) or {}
+        processed = checkpoint.get("processed", 0)
+        total = checkpoint.get("total_urls", "?")
+        communities = checkpoint.get("communities", 0)
+        restarts = running[batch_number]["restarts"]
+        print(f"Batch {batch_number}: {processed}/{total} sitemaps, {communities} communities, {restarts} restarts")
+    print(f"Pending: {len(pending)} | Finished: {len(finished)} | Failed: {len(failed)}")
+
+
+def supervise(batches, workers, rate, max_restarts, bounded_memory=False, tiered=False):
+    """Run batches with at most `workers` processes alive at once"""
+    rate_limiter = SharedRateLimiter(rate)
+    # One breaker for every worker, so an outage pauses the whole machine
+    circuit_breaker = CircuitBreaker(shared=True)
+    stop_event = multiprocessing.Event()
+
+    pending = list(batches)
+    running = {}  # batch_number -> {"process": Process, "restarts": int}
+    restarts = {batch_number: 0 for batch_number in batches}
+    finished = []
+    failed = []
+
+    def start(batch_number):
+        process = multiprocessing.Process(
+            target=run_batch_worker,
+            args=(batch_number, rate_limiter, circuit_breaker, stop_event, bounded_memory, tiered),
+            name=f"batch-{batch_number}",
+        )
+        process.start()
+        running[batch_number] = {"process": process, "restarts": restarts[batch_number]}
+        print(f"Started batch {batch_number} (pid {process.pid})")
+
+    print(f"Supervising {len(batches)} batches with {workers} workers at {rate:g} requests/second")
+    last_status = time.time()
+
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                start(pending.pop(0))
+
+            for batch_number in list(running):
+                process = running[batch_number]["process"]
+                if process.is_alive():
+                    continue
+
+                process.join()
+                del running[batch_number]
+                if process.exitcode == 0:
+                    print(f"Batch {batch_number} finished")
+                    finished.append(batch_number)
+                elif restarts[batch_number] < max_restarts:
+                    restarts[batch_number] += 1
+                    print(
+                        f"Batch {batch_number} crashed (exit code {process.exitcode}), "
+                        f"restarting from checkpoint ({restarts[batch_number]}/{max_restarts})"
+                    )
+                    start(batch_number)
+                else:
+                    print(f"Batch {batch_number} failed after {max_restarts} restarts")
+                    failed.append(batch_number)
+
+            if time.time() - last_status >= STATUS_INTERVAL:
+                print_status(running, pending, finished, failed)
+                last_status = time.time()
+
+            time.sleep(POLL_INTERVAL)
+
+    except KeyboardInterrupt:
+        print("\nInterrupted - asking workers to save and stop...")
+        stop_event.set()
+        for batch_number, worker in running.items():
+            worker["process"].join()
+            print(f"Batch {batch_number} stopped")
+        print("Stopped. Re-run the supervisor to resume from the checkpoints.")
+        return finished, failed
+
+    print("\n=== SUPERVISOR COMPLETE ===")
+    print(f"Finished batches: {sorted(finished)}")
+    if failed:
+        print(f"Failed batches: {sorted(failed)}")
+    print("\nTo merge all batches, run: whop-scraper merge --yes")
+    if tiered:
+        print("Then fully scrape the leaderboard contenders: whop-scraper deep-pass")
+    return finished, failed
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Run scrape batches in parallel worker processes")
+    parser.add_argument("workers", type=int, help="number of batch worker processes")
+    parser.add_argument("--batches", help="batch number or range, e.g. 3 or 1-5 (default: all)")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="requests per second across all workers")
+    parser.add_argument("--max-restarts", type=int, default=DEFAULT_MAX_RESTARTS, help="restarts per crashed batch")
+    parser.add_argument("--bounded-memory", action="store_true", help="workers append saves instead of holding whole batches")
+    parser.add_argument("--tiered", action="store_true", help="scrape head fields only; run deep-pass after merging")
+    args = parser.parse_args()
+
+    if args.batches:
+        batches = parse_batch_range(args.batches)
+    else:
+        try:
+            batches = list(range(1, count_batches() + 1))
+        except FileNotFoundError:
+            print("Error: output/sample_discovery.txt not found!")
+            print("Please run 'whop-scraper discover' first to generate the URLs file.")
+            sys.exit(1)
+
+    if not batches:
+        print("No batches to run")
+        return
+
+    finished, failed = supervise(
+        batches, max(args.workers, 1), args.rate, args.max_restarts, args.bounded_memory, args.tiered
+    )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
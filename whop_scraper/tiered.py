@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Two-tier crawl: head fields for every product, full scrape for contenders
+Tier 1 (`whop-scraper scrape <batch> --tiered`) keeps only the JSON-LD
+Product fields. Price enters the engagement score only through the size
+multiplier and the revenue term, so each tier-1 record's final score lies
+between bounds taken over prices from 0 to PRICE_CEILING. A record can only
+reach the TOP_N leaderboard if its upper bound reaches the TOP_N-th best
+lower bound; only those get the full scrape with price extraction (tier 2).
+The leaderboard matches a full crawl as long as no price exceeds the ceiling.
+
+Usage: whop-scraper deep-pass [input.json] [--price-ceiling USD]
+Then:  whop-scraper rank
+"""
+
+import argparse
+import heapq
+import json
+import os
+
+from .common import log_message
+from .community import json_default, load_communities
+from .merge import MERGED_FILE
+from .rank import TOP_N, attach_review_velocity, score_community
+from .snapshot_store import SnapshotStore
+
+# Configuration
+PRICE_CEILING = 5000.0  # Highest monthly price assumed for unpriced records
+# Prices where estimate_community_size changes its price multiplier. Within
+# each band the member estimate is fixed and the score rises with price, so
+# the band edges give the extremes.
+PRICE_BREAKS = (50, 100, 250)
+LOWEST_PAID_PRICE = 0.01
+BAND_EDGE = 1e-6
+
+
+def score_with_price(community, price):
+    """Engagement score the community would have at a given monthly price"""
+    trial = community.copy()
+    trial["price_monthly_usd"] = price
+    return score_community(trial)["engagement_score"]
+
+
+def bound_prices(price_ceiling=PRICE_CEILING):
+    """Prices at which the score reaches its extremes within each price band"""
+    prices = [0, LOWEST_PAID_PRICE]
+    for price_break in PRICE_BREAKS:
+        if price_break < price_ceiling:
+            prices += [price_break - BAND_EDGE, price_break]
+    prices.append(price_ceiling)
+    return prices
+
+
+def score_bounds(community, prices):
+    """(lowest, highest) engagement score the community can end up with"""
+    if community.get("tier") != 1:
+        score = score_with_price(community, community.get("price_monthly_usd", 0))
+        return score, score
+    scores = [score_with_price(community, price) for price in prices]
+    return min(scores), max(scores)
+
+
+def select_contenders(communities, top_n=TOP_N, price_ceiling=PRICE_CEILING):
+    """Tier-1 records whose best possible score could place them in the top N"""
+    prices = bound_prices(price_ceiling)
+    bounds = [score_bounds(community, prices) for community in communities]
+    head_only = [community.get("tier") == 1 for community in communities]
+
+    if len(communities) <= top_n:
+        return [community for community, is_head in zip(communities, head_only) if is_head]
+
+    cutoff = heapq.nlargest(top_n, (low for low, _ in bounds))[-1]
+    return [
+        community
+        for community, is_head, (_, high) in zip(communities, head_only, bounds)
+        if is_head and high >= cutoff
+    ]
+
+
+def deep_pass(communities, top_n=TOP_N, price_ceiling=PRICE_CEILING, store=None):
+    """
+    Fully scrape the leaderboard contenders and replace their tier-1 records
+
+    Review velocity is attached first, since it is part of the score.
+    Returns the list of upgraded (full) records.
+    """
+    # Imported here so selecting contenders doesn't pay for the HTTP/parsing stack
+    from . import scrape
+    from .fetch import pause_between_requests
+
+    attach_review_velocity(communities, store)
+    contenders = select_contenders(communities, top_n, price_ceiling)
+    head_count = sum(1 for community in communities if community.get("tier") == 1)
+    log_message(
+        f"Deep pass: {len(contenders)} of {head_count} head-only records could reach the top {top_n}"
+    )
+
+    positions = {community.get("url"): i for i, community in enumerate(communities)}
+    upgraded = []
+    for i, contender in enumerate(contenders, 1):
+        url = contender["url"]
+        log_message(f"Deep scrape {i}/{len(contenders)}: {url}")
+        community_data = scrape.scrape_community_page(url)
+        if community_data and community_data.get("community_name", "Unknown") != "Unknown":
+            communities[positions[url]] = community_data
+            upgraded.append(community_data)
+        else:
+            log_message(f"Deep scrape failed, keeping head fields: {url}")
+        pause_between_requests()
+
+    attach_review_velocity(upgraded, store)
+    log_message(f"Deep pass complete: {len(upgraded)}/{len(contenders)} contenders fully scraped")
+    return upgraded
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Fully scrape the tier-1 records that could reach the leaderboard")
+    parser.add_argument("input_file", nargs="?", default=MERGED_FILE)
+    parser.add_argument("--price-ceiling", type=float, default=PRICE_CEILING, help="highest monthly price assumed")
+    parser.add_argument("--top", type=int, default=TOP_N, help="leaderboard size")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input_file):
+        print(f"Error: {args.input_file} not found!")
+        print("Please run 'whop-scraper merge' first.")
+        return
+
+    communities = load_communities(args.input_file)
+
+    store = SnapshotStore()
+    upgraded = deep_pass(communities, args.top, args.price_ceiling, store)
+
+    with open(args.input_file + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(communities, f, indent=2, ensure_ascii=False, default=json_default)
+    os.replace(args.input_file + ".tmp", args.input_file)
+
+    changed = store.record(upgraded)
+    print(f"Updated {len(upgraded)} records in {args.input_file} ({changed} snapshot changes)")
+    print("Next: whop-scraper rank")
+
+
+if __name__ == "__main__":
+    main()